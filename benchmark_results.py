@@ -0,0 +1,294 @@
+# Copyright (c) 2026, NVIDIA CORPORATION.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Structured ingestion of a night's benchmark results.
+
+record-benchmarks.py reads every results file of a run type directory
+(eg. latest/benchmarks/2-GPU) with read_run_dir():
+
+- pytest-results.txt: "<file> <PASSED|FAILED|SKIPPED> <name> <value>" lines.
+- *.jsonl: one JSON record per line, such as the files written by
+  client_bandwidth.py and worker_bandwidth.py:
+
+  {"name": "bench_bfs[scale_20]",      required
+   "status": "PASSED",                 PASSED (default), FAILED or SKIPPED
+   "unit": "s",                        default "s"
+   "params": {"scale": 20},            optional
+   "stats": {"median": ...,            required unless FAILED/SKIPPED, or
+             "min": ..., "mean": ...,  give a plain "value" instead
+             "stddev": ..., "rounds": ..., ...},
+   "durations_ns": [...]}              optional, every round
+
+- *benchmark*.json: pytest-benchmark --benchmark-json output, whose
+  per-test stats (and every round, with --benchmark-save-data) are kept.
+
+Files are read record by record, and pytest-benchmark files are streamed
+with ijson when it is installed, so large files are never held in memory
+as text. Malformed lines and records are reported and skipped instead of
+failing the whole night.
+
+Each test then gives one value for the results history (its median, or the
+FAILED/SKIPPED marker) and one row of statistics for the results store
+(results_store.append_stats()), from which the variance bands of the plots
+and the noise used by the regression detection are derived.
+"""
+
+import json
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+
+try:
+    import ijson
+    JSON_ERRORS = (ValueError, AttributeError, ijson.JSONError)
+except ImportError:
+    ijson = None
+    JSON_ERRORS = (ValueError, AttributeError)
+
+
+PYTEST_RESULTS_FILE_NAME = "pytest-results.txt"
+JSONL_GLOB = "*.jsonl"
+PYTEST_BENCHMARK_GLOB = "*benchmark*.json"
+
+STATUSES = ("PASSED", "FAILED", "SKIPPED")
+# numeric statistics kept in the results store, when a file provides them
+STATS_KEYS = ("min", "max", "median", "mean", "stddev", "q1", "q3", "iqr",
+              "p95", "p99", "ci_low", "ci_high", "rounds", "outliers")
+STATS_COLUMNS = ["date", "name", "status", "unit", "params"] + list(STATS_KEYS) + ["durations"]
+
+# the standard error of the median of normally distributed rounds is
+# sqrt(pi / 2) times the one of their mean
+MEDIAN_SE_FACTOR = 1.2533
+
+
+class MalformedRecord(ValueError):
+    pass
+
+
+def _report_malformed(path, lineno, error):
+    where = f"{path}:{lineno}" if lineno else str(path)
+    print(f"{where}: skipping malformed result ({error})", file=sys.stderr)
+
+
+def _to_float(value, key):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise MalformedRecord(f"{key} is not a number: {value!r}")
+    if not np.isfinite(value):
+        raise MalformedRecord(f"{key} is not finite: {value!r}")
+    return value
+
+
+def normalize_record(record):
+    """
+    Validate a result record and return it as
+    {"name", "status", "unit", "params", "stats", "durations"}, where stats
+    only holds the numeric STATS_KEYS and durations, if any, are the
+    duration of every round.
+
+    Raises MalformedRecord if the record is not usable.
+    """
+    if not isinstance(record, dict):
+        raise MalformedRecord("not a JSON object")
+    name = record.get("name")
+    if not isinstance(name, str) or not name:
+        raise MalformedRecord("missing name")
+    status = record.get("status", "PASSED")
+    if status not in STATUSES:
+        raise MalformedRecord(f"unknown status {status!r}")
+    params = record.get("params") or {}
+    if not isinstance(params, dict):
+        raise MalformedRecord("params is not an object")
+
+    stats = {}
+    durations = None
+    if status == "PASSED":
+        raw_stats = record.get("stats")
+        if raw_stats is None and "value" in record:
+            raw_stats = {"median": record["value"]}
+        if not isinstance(raw_stats, dict) or "median" not in raw_stats:
+            raise MalformedRecord("missing stats median")
+        # other keys are kept only when numeric, eg. pytest-benchmark
+        # "outliers" is a "<mild>;<severe>" string
+        stats = {key: _to_float(raw_stats[key], key) for key in STATS_KEYS
+                 if isinstance(raw_stats.get(key), (int, float))
+                 and not isinstance(raw_stats[key], bool)}
+        stats["median"] = _to_float(raw_stats["median"], "median")
+        if "durations_ns" in record:
+            durations = [_to_float(d, "durations_ns") * 1e-9 for d in record["durations_ns"]]
+        elif isinstance(raw_stats.get("data"), list):
+            durations = [_to_float(d, "data") for d in raw_stats["data"]]
+    return {
+        "name": name,
+        "status": status,
+        "unit": str(record.get("unit", "s")),
+        "params": params,
+        "stats": stats,
+        "durations": durations,
+    }
+
+
+def read_pytest_results(path):
+    """
+    Yield the records of a pytest-results.txt file.
+    """
+    with open(path) as results_file:
+        for (lineno, line) in enumerate(results_file, 1):
+            fields = line.split()
+            if not fields:
+                continue
+            try:
+                # FAILED and SKIPPED lines have no value
+                if len(fields) >= 3 and fields[1] in ("FAILED", "SKIPPED"):
+                    yield normalize_record({"name": fields[2], "status": fields[1]})
+                    continue
+                if len(fields) < 4:
+                    raise MalformedRecord(f"expected 4 fields, got {len(fields)}")
+                (name, value) = fields[2:4]
+                yield normalize_record({"name": name, "value": value})
+            except MalformedRecord as e:
+                _report_malformed(path, lineno, e)
+
+
+def read_jsonl(path):
+    """
+    Yield the records of a JSONL results file.
+    """
+    with open(path) as jsonl_file:
+        for (lineno, line) in enumerate(jsonl_file, 1):
+            if not line.strip():
+                continue
+            try:
+                yield normalize_record(json.loads(line))
+            except (json.JSONDecodeError, MalformedRecord) as e:
+                _report_malformed(path, lineno, e)
+
+
+def _pytest_benchmark_items(path):
+    with open(path, "rb") as json_file:
+        if ijson is not None:
+            yield from ijson.items(json_file, "benchmarks.item", use_float=True)
+        else:
+            yield from json.load(json_file).get("benchmarks", [])
+
+
+def read_pytest_benchmark_json(path):
+    """
+    Yield the records of a pytest-benchmark JSON file.
+    """
+    try:
+        for (index, item) in enumerate(_pytest_benchmark_items(path)):
+            try:
+                if not isinstance(item, dict):
+                    raise MalformedRecord("not a JSON object")
+                yield normalize_record({"name": item.get("name"),
+                                        "params": item.get("params"),
+                                        "stats": item.get("stats")})
+            except MalformedRecord as e:
+                _report_malformed(path, None, f"benchmark {index}: {e}")
+    except JSON_ERRORS as e:
+        # a truncated or invalid file, keep the benchmarks read so far
+        _report_malformed(path, None, e)
+
+
+def read_run_dir(run_dir):
+    """
+    Yield the records of every results file in a run type directory.
+    """
+    run_dir = Path(run_dir)
+    if (run_dir / PYTEST_RESULTS_FILE_NAME).exists():
+        yield from read_pytest_results(run_dir / PYTEST_RESULTS_FILE_NAME)
+    for path in sorted(run_dir.glob(JSONL_GLOB)):
+        yield from read_jsonl(path)
+    for path in sorted(run_dir.glob(PYTEST_BENCHMARK_GLOB)):
+        yield from read_pytest_benchmark_json(path)
+
+
+def records_to_dfs(records, run_date):
+    """
+    Convert records into a night's results.
+
+    Parameters:
+    - records (iterable): normalized records, eg. from read_run_dir(). A
+      name recorded more than once keeps its last record.
+    - run_date (str): the UTC formatted date of the benchmark run.
+
+    Returns:
+    tuple: (a DataFrame with one row holding the date and each benchmark's
+    median or FAILED/SKIPPED marker, in the layout of the results history,
+    a DataFrame with one row of statistics per benchmark, with
+    STATS_COLUMNS), or (None, None) without records.
+    """
+    by_name = {record["name"]: record for record in records}
+    if not by_name:
+        return None, None
+    row = {"date": run_date}
+    stats_rows = []
+    for (name, record) in by_name.items():
+        if record["status"] == "PASSED":
+            row[name] = record["stats"]["median"]
+        else:
+            row[name] = record["status"]
+        stats_rows.append({
+            "date": run_date,
+            "name": name,
+            "status": record["status"],
+            "unit": record["unit"],
+            "params": json.dumps(record["params"], sort_keys=True, default=str),
+            **record["stats"],
+            "durations": record["durations"],
+        })
+    stats_df = pd.DataFrame(stats_rows).reindex(columns=STATS_COLUMNS)
+    # keep the column types stable across nights for the results store
+    stats_df[list(STATS_KEYS)] = stats_df[list(STATS_KEYS)].astype(float)
+    return pd.DataFrame([row]), stats_df
+
+
+def _stat_table(stats_df, key):
+    if stats_df.empty or key not in stats_df.columns:
+        return pd.DataFrame()
+    table = stats_df.pivot_table(index="date", columns="name", values=key,
+                                 aggfunc="last", dropna=False)
+    table.columns.name = None
+    return table.astype(float)
+
+
+def standard_errors(stats_df):
+    """
+    Return the standard error of each night's median, as a DataFrame indexed
+    by date with one column per benchmark. Results without a stddev or with
+    fewer than two rounds are NaN.
+    """
+    stddev = _stat_table(stats_df, "stddev")
+    rounds = _stat_table(stats_df, "rounds")
+    if stddev.empty or rounds.empty:
+        return pd.DataFrame()
+    rounds = rounds.reindex_like(stddev)
+    return MEDIAN_SE_FACTOR * stddev / np.sqrt(rounds.where(rounds > 1))
+
+
+def variance_band(stats_df):
+    """
+    Return the (low, high) band of each night's result, median -/+ stddev
+    with low bounded by the fastest round, as two DataFrames indexed by
+    date with one column per benchmark.
+    """
+    median = _stat_table(stats_df, "median")
+    stddev = _stat_table(stats_df, "stddev").reindex_like(median)
+    low = median - stddev
+    fastest = _stat_table(stats_df, "min").reindex_like(median)
+    low = low.where(~(fastest > low), fastest)
+    return low, median + stddev
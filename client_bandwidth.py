@@ -0,0 +1,316 @@
+# Copyright (c) 2022-2026, NVIDIA CORPORATION.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Client bandwidth benchmark suite.
+
+Measures how fast data persisted on the workers can be pulled back to the
+client, with head(n) for partial fetches and compute() for whole frames,
+over a sweep of row counts, dtypes, column counts, partition counts and
+protocols.
+
+The "cudf" backend uses dask_cuda.LocalCUDACluster and cudf partitions, the
+"pandas" backend uses a distributed.LocalCluster and pandas partitions so
+the suite can run on machines without GPUs. Dataframes are generated on the
+workers by synthetic_data.py.
+
+Results are written to <output-dir>/client-bandwidth.jsonl, one JSON record
+per configuration:
+
+{"name": "client_bandwidth[tcp-pandas-rows=1000000-...]", "status": "PASSED",
+ "unit": "s", "params": {...},
+ "stats": {"min": ..., "median": ..., "mean": ..., "stddev": ...,
+           "p95": ..., "p99": ..., "ci_low": ..., "ci_high": ...,
+           "rounds": ..., "outliers": ...},
+ "durations_ns": [...], "outliers": [...], "bytes": ..., "gb_per_s": ...}
+
+which record-benchmarks.py ingests alongside pytest-results.txt, and to
+<output-dir>/client-bandwidth.csv with the same information flattened.
+With --telemetry-interval, cluster telemetry is also recorded in
+<output-dir> while the suite runs, with each test marked, see telemetry.py.
+
+Timings come from timing.time_function(), so each configuration is
+repeated until the confidence interval of its median is tight enough.
+
+Example usage:
+
+python client_bandwidth.py --backend=pandas --protocols=tcp --n-workers=2 \
+                           --rows=1000000,4000000 --fetch-rows=100000,-1 \
+                           --output-dir=latest/benchmarks/2-GPU
+"""
+
+from contextlib import nullcontext
+import itertools
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from dask.distributed import Client, LocalCluster, wait
+
+import synthetic_data
+import telemetry
+import timing
+
+try:
+    from dask_cuda import LocalCUDACluster
+    import rmm
+except ImportError:
+    LocalCUDACluster = None
+
+
+BACKENDS = ("cudf", "pandas")
+RESULTS_FILE_NAME = "client-bandwidth"
+
+
+def create_cluster(backend, protocol, n_workers=None, devices=None,
+                   rmm_pool_size=None):
+    """
+    Start a local cluster for backend using protocol, returning the cluster.
+    """
+    if backend == "cudf":
+        if LocalCUDACluster is None:
+            raise RuntimeError("the cudf backend requires dask_cuda and rmm")
+        return LocalCUDACluster(protocol=protocol, n_workers=n_workers,
+                                CUDA_VISIBLE_DEVICES=devices,
+                                rmm_pool_size=rmm_pool_size)
+    return LocalCluster(protocol=protocol, n_workers=n_workers,
+                        threads_per_worker=1, dashboard_address=":0")
+
+
+def create_dataframe(client, backend, n_rows, n_cols=3, dtype="int32",
+                     npartitions=None):
+    """
+    Create a dask dataframe of n_rows rows and n_cols columns of dtype,
+    generated and persisted directly on the workers of client.
+    """
+    n_workers = len(client.scheduler_info(n_workers=-1)["workers"])
+    partitions_per_worker = max((npartitions or n_workers) // n_workers, 1)
+    schema = {f"c{i}": dtype for i in range(n_cols)}
+    ddf = synthetic_data.make_dataset(client, n_rows, schema,
+                                      partitions_per_worker=partitions_per_worker,
+                                      backend=backend).persist()
+    _ = wait(ddf)
+    return ddf
+
+
+def get_n_rows(ddf, n):
+    """
+    Pull n rows of ddf to the client, or all of them if n is -1.
+    """
+    if n == -1:
+        return ddf.compute()
+    return ddf.head(n, npartitions=-1)
+
+
+def run_bandwidth_test(ddf, n, **timing_options):
+    """
+    Time fetching n rows of ddf to the client with timing.time_function(),
+    passing it timing_options.
+
+    Returns:
+    dict: timing statistics in seconds, the per-round timing record, the
+    number of rows and bytes fetched, and the bandwidth in GB/s based on the
+    median time.
+    """
+    timing_result = timing.time_function(get_n_rows, ddf, n, **timing_options)
+    df = timing_result.result
+    record = timing_result.to_record()
+    size_bytes = int(df.memory_usage().sum())
+    return {
+        "rows": len(df),
+        "bytes": size_bytes,
+        "stats": record.pop("stats"),
+        "timing": record,
+        "gb_per_s": size_bytes / pow(1024, 3) / timing_result.stats()["median"],
+    }
+
+
+def run_suite(client, backend, protocol, rows=(25_000_000,), dtypes=("int32",),
+              columns=(3,), partitions_per_worker=(1,),
+              fetch_rows=(1_000_000, -1), sampler=None, **timing_options):
+    """
+    Run the client bandwidth benchmark over every combination of rows,
+    dtypes, columns and partitions_per_worker, fetching each of fetch_rows
+    from every dataframe.
+
+    Parameters:
+    - client (Client): client connected to the cluster to benchmark.
+    - backend (str): "cudf" or "pandas", must match the cluster workers.
+    - protocol (str): the protocol of the cluster, recorded with the results.
+    - rows, dtypes, columns, partitions_per_worker (iterables): the sweep.
+    - fetch_rows (iterable): rows to fetch per test, -1 fetches everything.
+    - sampler (TelemetrySampler): if given, each test is marked in its
+      telemetry under the test's record name.
+    - timing_options: passed to timing.time_function(), eg. warmup, max_rounds.
+
+    Returns:
+    list: one result record per configuration.
+    """
+    n_workers = len(client.scheduler_info()["workers"])
+    records = []
+    for (n_rows, dtype, n_cols, n_parts) in itertools.product(
+            rows, dtypes, columns, partitions_per_worker):
+        ddf = create_dataframe(client, backend, n_rows, n_cols, dtype,
+                               npartitions=n_parts * n_workers)
+        for n in fetch_rows:
+            if n > n_rows:
+                continue
+            params = {
+                "protocol": protocol,
+                "backend": backend,
+                "rows": n_rows,
+                "dtype": dtype,
+                "columns": n_cols,
+                "partitions": n_parts * n_workers,
+                "fetch_rows": n,
+            }
+            param_id = "-".join([protocol, backend] +
+                                [f"{key}={params[key]}" for key in
+                                 ("rows", "dtype", "columns", "partitions", "fetch_rows")])
+            name = f"client_bandwidth[{param_id}]"
+            with sampler.mark(name) if sampler else nullcontext():
+                result = run_bandwidth_test(ddf, n, **timing_options)
+            records.append({
+                "name": name,
+                "status": "PASSED",
+                "unit": "s",
+                "params": params,
+                "stats": result["stats"],
+                "durations_ns": result["timing"]["durations_ns"],
+                "outliers": result["timing"]["outliers"],
+                "bytes": result["bytes"],
+                "gb_per_s": result["gb_per_s"],
+            })
+            print(f"{param_id}: {result['rows']:,} rows of "
+                  f"{round(result['bytes'] / pow(1024, 3), 4)} GB, "
+                  f"p50={result['stats']['median'] * 1e3:.3f} ms "
+                  f"p99={result['stats']['p99'] * 1e3:.3f} ms, "
+                  f"{round(result['gb_per_s'], 4)} GB/s", flush=True)
+        del ddf
+    return records
+
+
+def write_results(records, output_dir):
+    """
+    Write result records as client-bandwidth.jsonl and client-bandwidth.csv
+    in output_dir.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with open(output_dir / (RESULTS_FILE_NAME + ".jsonl"), "w") as jsonl_file:
+        for record in records:
+            jsonl_file.write(json.dumps(record) + "\n")
+    rows = [{"name": r["name"], **r["params"], **r["stats"],
+             "bytes": r["bytes"], "gb_per_s": r["gb_per_s"]} for r in records]
+    pd.DataFrame(rows).to_csv(output_dir / (RESULTS_FILE_NAME + ".csv"), index=False)
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(",")]
+
+
+def _str_list(value):
+    return value.split(",")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--backend", choices=BACKENDS, default="cudf",
+                    help="Dataframe library used on the workers.")
+    ap.add_argument("--protocols", type=_str_list, default=["tcp"],
+                    help="Comma-separated protocols to sweep, eg. tcp,ucx. A "
+                    "local cluster is started for each one.")
+    ap.add_argument("--scheduler-file", default=None,
+                    help="Benchmark an existing cluster instead of starting "
+                    "local ones. Only the first of --protocols is used, to "
+                    "label the results.")
+    ap.add_argument("--n-workers", type=int, default=None,
+                    help="Workers per local cluster, defaults to one per GPU "
+                    "or CPU core.")
+    ap.add_argument("--devices", default=None,
+                    help="CUDA_VISIBLE_DEVICES for the cudf backend, eg. 1,2,3.")
+    ap.add_argument("--rmm-pool-size", default=None,
+                    help="RMM pool size per worker for the cudf backend, eg. 15GB.")
+    ap.add_argument("--rows", type=_int_list, default=[25_000_000],
+                    help="Comma-separated row counts to sweep.")
+    ap.add_argument("--dtypes", type=_str_list, default=["int32"],
+                    help="Comma-separated column dtypes to sweep.")
+    ap.add_argument("--columns", type=_int_list, default=[3],
+                    help="Comma-separated column counts to sweep.")
+    ap.add_argument("--partitions-per-worker", type=_int_list, default=[1],
+                    help="Comma-separated partitions per worker to sweep.")
+    ap.add_argument("--fetch-rows", type=_int_list,
+                    default=[1_000_000, 2_000_000, 4_000_000, -1],
+                    help="Comma-separated rows to fetch per test, -1 fetches "
+                    "the whole dataframe.")
+    ap.add_argument("--warmup", type=int, default=1,
+                    help="Untimed rounds per test.")
+    ap.add_argument("--min-rounds", type=int, default=5,
+                    help="Minimum timed rounds per test.")
+    ap.add_argument("--max-rounds", type=int, default=50,
+                    help="Maximum timed rounds per test.")
+    ap.add_argument("--max-time", type=float, default=30.0,
+                    help="Time budget in seconds per test.")
+    ap.add_argument("--rel-ci-width", type=float, default=0.05,
+                    help="Stop repeating a test once the confidence interval "
+                    "of its median is at most this fraction of the median.")
+    ap.add_argument("--output-dir", default=None,
+                    help="Directory to write the results files to. Results "
+                    "are only printed if not specified.")
+    ap.add_argument("--telemetry-interval", type=float, default=None,
+                    help="Record cluster telemetry in --output-dir, sampled "
+                    "every this many seconds, see telemetry.py.")
+    args = ap.parse_args()
+
+    timing_options = {
+        "warmup": args.warmup,
+        "min_rounds": args.min_rounds,
+        "max_rounds": args.max_rounds,
+        "max_time": args.max_time,
+        "rel_ci_width": args.rel_ci_width,
+    }
+    if args.telemetry_interval and not args.output_dir:
+        ap.error("--telemetry-interval requires --output-dir")
+
+    def start_sampler(client):
+        if not args.telemetry_interval:
+            return nullcontext()
+        return telemetry.TelemetrySampler(client, args.output_dir,
+                                          args.telemetry_interval)
+
+    records = []
+    if args.scheduler_file:
+        with Client(scheduler_file=args.scheduler_file) as client, \
+             start_sampler(client) as sampler:
+            records += run_suite(client, args.backend, args.protocols[0],
+                                 args.rows, args.dtypes, args.columns,
+                                 args.partitions_per_worker, args.fetch_rows,
+                                 sampler=sampler, **timing_options)
+    else:
+        for protocol in args.protocols:
+            with create_cluster(args.backend, protocol, args.n_workers,
+                                args.devices, args.rmm_pool_size) as cluster, \
+                 Client(cluster) as client, \
+                 start_sampler(client) as sampler:
+                if args.backend == "cudf":
+                    rmm.reinitialize(pool_allocator=True)
+                records += run_suite(client, args.backend, protocol,
+                                     args.rows, args.dtypes, args.columns,
+                                     args.partitions_per_worker, args.fetch_rows,
+                                     sampler=sampler, **timing_options)
+
+    if args.output_dir:
+        write_results(records, args.output_dir)
+    print("--"*20+"Completed Test"+"--"*20, flush=True)
@@ -0,0 +1,509 @@
+# Copyright (c) 2026, NVIDIA CORPORATION.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Start and stop the dask scheduler and workers of a cluster.
+
+This is what run-dask-process.sh runs. Instead of sleeping a fixed amount
+of time between checks, the scheduler is considered started as soon as its
+scheduler file has been written and its port accepts connections, and a
+scheduler process that exits early is restarted right away.
+
+The scheduler file is usually on a filesystem shared by all nodes, where
+inotify does not see writes made by other nodes, so it is watched by
+stat'ing it at a short interval instead.
+
+Example usage from python:
+
+launcher = ClusterLauncher("UCX", scheduler_file="/shared/scheduler.json",
+                           logs_dir="/shared/logs")
+launcher.start_scheduler()
+launcher.start_workers()
+print(launcher.status())
+launcher.stop()
+"""
+
+import json
+import os
+from pathlib import Path
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+import topology
+
+
+CLUSTER_CONFIG_TYPES = ("TCP", "UCX", "UCXIB")
+FILE_POLL_INTERVAL = 0.05
+
+
+def _settings_from_env(environ=None):
+    """
+    Return the cluster settings from the environment (os.environ unless
+    environ is given), with the same defaults as default-config.sh.
+    """
+    environ = os.environ if environ is None else environ
+    return {
+        "scheduler_port": environ.get("DASK_SCHEDULER_PORT", "8792"),
+        "rmm_pool_size": environ.get("WORKER_RMM_POOL_SIZE", "12G"),
+        "interface": environ.get("DASK_CUDA_INTERFACE", "auto"),
+        "host_memory_limit": environ.get("DASK_HOST_MEMORY_LIMIT", "auto"),
+        "device_memory_limit": environ.get("DASK_DEVICE_MEMORY_LIMIT", "auto"),
+        "local_directory": f"/tmp/{environ.get('LOGNAME', '')}",
+    }
+
+
+def build_tcp_args(scheduler_file, settings):
+    """
+    Return the (env, scheduler args, worker args) of a TCP cluster.
+    """
+    env = {
+        "DASK_DISTRIBUTED__COMM__TIMEOUTS__CONNECT": "100s",
+        "DASK_DISTRIBUTED__COMM__TIMEOUTS__TCP": "600s",
+        "DASK_DISTRIBUTED__COMM__RETRY__DELAY__MIN": "1s",
+        "DASK_DISTRIBUTED__COMM__RETRY__DELAY__MAX": "60s",
+        "DASK_DISTRIBUTED__WORKER__MEMORY__Terminate": "False",
+    }
+    scheduler_args = [
+        "--protocol=tcp",
+        f"--port={settings['scheduler_port']}",
+        "--scheduler-file", scheduler_file,
+    ]
+    worker_args = [
+        f"--rmm-pool-size={settings['rmm_pool_size']}",
+        f"--local-directory={settings['local_directory']}",
+        f"--scheduler-file={scheduler_file}",
+        f"--memory-limit={settings['host_memory_limit']}",
+        f"--device-memory-limit={settings['device_memory_limit']}",
+    ]
+    return env, scheduler_args, worker_args
+
+
+def _interface_args(settings):
+    return [f"--interface={settings['interface']}"] if settings["interface"] else []
+
+
+def build_ucx_with_infiniband_args(scheduler_file, settings):
+    """
+    Return the (env, scheduler args, worker args) of a UCX cluster using
+    Infiniband and NVLink.
+    """
+    env = {
+        "DASK_RMM__POOL_SIZE": "0.5GB",
+        "DASK_DISTRIBUTED__COMM__UCX__CREATE_CUDA_CONTEXT": "True",
+    }
+    scheduler_args = [
+        "--protocol=ucx",
+        f"--port={settings['scheduler_port']}",
+        *_interface_args(settings),
+        "--scheduler-file", scheduler_file,
+    ]
+    worker_args = [
+        *_interface_args(settings),
+        f"--rmm-pool-size={settings['rmm_pool_size']}",
+        "--rmm-async",
+        f"--local-directory={settings['local_directory']}",
+        f"--scheduler-file={scheduler_file}",
+        f"--memory-limit={settings['host_memory_limit']}",
+        f"--device-memory-limit={settings['device_memory_limit']}",
+    ]
+    return env, scheduler_args, worker_args
+
+
+def build_ucx_without_infiniband_args(scheduler_file, settings):
+    """
+    Return the (env, scheduler args, worker args) of a UCX cluster using
+    NVLink and TCP over UCX.
+    """
+    env = {
+        "UCX_TCP_CM_REUSEADDR": "y",
+        "UCX_MAX_RNDV_RAILS": "1",
+        "UCX_TCP_TX_SEG_SIZE": "8M",
+        "UCX_TCP_RX_SEG_SIZE": "8M",
+        "DASK_DISTRIBUTED__COMM__UCX__CUDA_COPY": "True",
+        "DASK_DISTRIBUTED__COMM__UCX__TCP": "True",
+        "DASK_DISTRIBUTED__COMM__UCX__NVLINK": "True",
+        "DASK_DISTRIBUTED__COMM__UCX__INFINIBAND": "False",
+        "DASK_DISTRIBUTED__COMM__UCX__RDMACM": "False",
+        "DASK_RMM__POOL_SIZE": "0.5GB",
+    }
+    scheduler_args = [
+        "--protocol=ucx",
+        f"--port={settings['scheduler_port']}",
+        "--scheduler-file", scheduler_file,
+    ]
+    worker_args = [
+        "--enable-tcp-over-ucx",
+        "--enable-nvlink",
+        "--disable-infiniband",
+        "--disable-rdmacm",
+        f"--rmm-pool-size={settings['rmm_pool_size']}",
+        f"--local-directory={settings['local_directory']}",
+        f"--scheduler-file={scheduler_file}",
+        f"--memory-limit={settings['host_memory_limit']}",
+        f"--device-memory-limit={settings['device_memory_limit']}",
+    ]
+    return env, scheduler_args, worker_args
+
+
+PROFILE_BUILDERS = {
+    "TCP": build_tcp_args,
+    "UCX": build_ucx_without_infiniband_args,
+    "UCXIB": build_ucx_with_infiniband_args,
+}
+# the protocol the network interface is chosen for, see topology.py
+PROFILE_PROTOCOLS = {"TCP": "tcp", "UCX": "ucx", "UCXIB": "ucxib"}
+
+
+class LauncherStopped(RuntimeError):
+    """
+    Raised when a launcher is asked to stop while it starts the cluster.
+    """
+
+
+def wait_for_file(file_name, timeout=None, proc=None, stop_event=None):
+    """
+    Wait until file_name exists, returning True, or return False if timeout
+    seconds pass, proc (a Popen object) exits or stop_event (a
+    threading.Event) is set first.
+    """
+    deadline = (time.monotonic() + timeout) if timeout else None
+    while not os.path.exists(file_name):
+        if (proc is not None) and (proc.poll() is not None):
+            return False
+        if (stop_event is not None) and stop_event.is_set():
+            return False
+        if deadline and time.monotonic() >= deadline:
+            return False
+        time.sleep(FILE_POLL_INTERVAL)
+    return True
+
+
+def read_scheduler_address(scheduler_file):
+    """
+    Return the scheduler address in scheduler_file, or None if the file is
+    not (yet) completely written.
+    """
+    try:
+        with open(scheduler_file) as f:
+            return json.load(f)["address"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def port_accepts_connections(address, timeout=1.0):
+    """
+    Return True if a TCP connection can be made to the host and port of
+    address, eg. "tcp://10.0.0.1:8792" or "ucx://10.0.0.1:8792".
+    """
+    parts = urlsplit(address)
+    try:
+        with socket.create_connection((parts.hostname, parts.port), timeout=timeout):
+            return True
+    except (OSError, ValueError):
+        return False
+
+
+class ClusterLauncher:
+    """
+    Starts, monitors and stops the scheduler and worker processes of a
+    cluster on this node.
+
+    The cluster settings (scheduler port, RMM pool size, interface, memory
+    limits) are read from the environment variables set by
+    default-config.sh unless given in settings. The environment variables
+    of a profile (UCX_*, DASK_*) are defaults: the same variables set in the
+    environment, eg. by a config.sh fragment written by
+    transport_tuning.py, take precedence, and those in env over both.
+
+    An interface of "auto" is chosen from the topology of the node read in
+    sysfs_root (see topology.py): the interface closest to most GPUs is
+    used by the scheduler and the workers. If GPUs are closer to different
+    interfaces, and the profile uses one, each GPU gets a worker command of
+    its own, with its interface and pinned to its local CPUs with taskset.
+    dask-cuda-worker otherwise pins each worker to the CPUs of its GPU
+    itself. Only the GPUs of an inherited CUDA_VISIBLE_DEVICES, eg. set by
+    Slurm, are placed. The placement is reported in topology-<host>.json in the logs
+    directory.
+    """
+    def __init__(self, cluster_config_type="TCP", scheduler_file=None,
+                 logs_dir=None, settings=None, env=None,
+                 scheduler_command=("dask", "scheduler"),
+                 worker_command=("dask-cuda-worker",), sysfs_root="/sys",
+                 procfs_root="/proc"):
+        cluster_config_type = cluster_config_type.upper()
+        if cluster_config_type not in PROFILE_BUILDERS:
+            raise ValueError(f"invalid cluster config type: {cluster_config_type}, "
+                             f"must be one of {CLUSTER_CONFIG_TYPES}")
+        self.cluster_config_type = cluster_config_type
+        self.scheduler_file = scheduler_file or os.environ["SCHEDULER_FILE"]
+        self.logs_dir = Path(logs_dir or os.environ.get("LOGS_DIR", f"dask_logs-{os.getpid()}"))
+        environ = {**os.environ, **(env or {})}
+        self.settings = {**_settings_from_env(environ), **(settings or {})}
+        self.scheduler_command = list(scheduler_command)
+        self.worker_command = list(worker_command)
+
+        self.topology = self.placement = None
+        if self.settings["interface"] == "auto":
+            self.topology = topology.discover(sysfs_root, procfs_root)
+            self.placement = topology.place_workers(
+                self.topology, PROFILE_PROTOCOLS[cluster_config_type],
+                environ.get("CUDA_VISIBLE_DEVICES"))
+            self.settings["interface"] = self.placement["interface"]
+
+        (profile_env, self.scheduler_args, self.worker_args) = \
+            PROFILE_BUILDERS[cluster_config_type](self.scheduler_file, self.settings)
+        self.env = {**profile_env, **environ}
+
+        self.scheduler_log = self.logs_dir / "scheduler_log.txt"
+        self.workers_log = self.logs_dir / f"worker-{socket.gethostname()}_log.txt"
+        self.scheduler_proc = None
+        self.worker_procs = []
+        self.num_scheduler_tries = 0
+        # set by request_stop(), eg. from a signal handler
+        self.stopping = threading.Event()
+
+    def _popen(self, cmd, log_file, env=None):
+        with open(log_file, "a") as log:
+            log.write(f"RUNNING: \"{' '.join(cmd)}\"\n")
+            log.flush()
+            return subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT,
+                                    env=env or self.env)
+
+    def start_scheduler(self, max_tries=30, timeout=None):
+        """
+        Start the scheduler and return once it is ready to accept
+        connections. A scheduler that exits before it is ready (eg. because
+        a prior run left its port in TIME_WAIT) is restarted, up to
+        max_tries times in total. Raises RuntimeError if it cannot be
+        started, or LauncherStopped if request_stop() is called meanwhile.
+        """
+        self.logs_dir.mkdir(parents=True, exist_ok=True)
+        Path(self.scheduler_file).parent.mkdir(parents=True, exist_ok=True)
+        for path in (self.scheduler_file, self.scheduler_log):
+            if os.path.exists(path):
+                os.unlink(path)
+
+        deadline = (time.monotonic() + timeout) if timeout else None
+        retry_delay = FILE_POLL_INTERVAL
+        while self.num_scheduler_tries < max_tries:
+            if self.stopping.is_set():
+                break
+            self.num_scheduler_tries += 1
+            self.scheduler_proc = self._popen(
+                self.scheduler_command + self.scheduler_args, self.scheduler_log)
+            if self._wait_for_scheduler(deadline):
+                return
+            if self.stopping.is_set() or self.scheduler_proc.poll() is None:
+                # still running but not ready before the deadline
+                break
+            print(f"scheduler failed to start, retry #{self.num_scheduler_tries}",
+                  flush=True)
+            time.sleep(retry_delay)
+            retry_delay = min(retry_delay * 2, 5)
+        self.stop()
+        if self.stopping.is_set():
+            raise LauncherStopped("stopped while starting the scheduler")
+        raise RuntimeError("could not start scheduler")
+
+    def _wait_for_scheduler(self, deadline):
+        while self.scheduler_proc.poll() is None and not self.stopping.is_set():
+            address = read_scheduler_address(self.scheduler_file)
+            if address and port_accepts_connections(address):
+                return True
+            if deadline and time.monotonic() >= deadline:
+                return False
+            time.sleep(FILE_POLL_INTERVAL)
+        return False
+
+    def start_workers(self, timeout=None, worker_envs=None):
+        """
+        Start the workers once the scheduler file exists, which may be
+        written by a scheduler on another node. By default a single worker
+        command is run, which starts one worker per GPU, or one command per
+        GPU when their interfaces differ (see the class docstring). worker_envs, a
+        list of dicts of extra environment variables, starts one worker
+        command per dict instead, all at once. Raises RuntimeError if the
+        scheduler file does not appear within timeout seconds, or
+        LauncherStopped if request_stop() is called meanwhile.
+        """
+        self.logs_dir.mkdir(parents=True, exist_ok=True)
+        if os.path.exists(self.workers_log):
+            os.unlink(self.workers_log)
+        if self.placement is not None:
+            topology.write_report(self.logs_dir / f"topology-{socket.gethostname()}.json",
+                                  self.topology, self.placement)
+        found = wait_for_file(self.scheduler_file, timeout=timeout, stop_event=self.stopping)
+        if self.stopping.is_set():
+            raise LauncherStopped("stopped before starting the workers")
+        if not found:
+            raise RuntimeError(f"{self.scheduler_file} not present after {timeout} seconds")
+
+        if worker_envs is None:
+            commands = self._placed_worker_commands()
+        else:
+            commands = [(self.worker_command + self.worker_args, extra_env)
+                        for extra_env in worker_envs]
+        for (cmd, extra_env) in commands:
+            self.worker_procs.append(
+                self._popen(cmd, self.workers_log, env={**self.env, **extra_env}))
+
+    def _placed_worker_commands(self):
+        """
+        Return the (command, extra env) of each worker command: a single
+        one, unless the GPUs of the placement use different interfaces.
+        """
+        single = [(self.worker_command + self.worker_args, {})]
+        if self.placement is None:
+            return single
+        interface_arg = _interface_args(self.settings)
+        workers = self.placement["workers"]
+        if (not interface_arg or interface_arg[0] not in self.worker_args or
+                len({w["interface"] for w in workers}) < 2):
+            return single
+        taskset = shutil.which("taskset")
+        commands = []
+        for worker in workers:
+            args = [f"--interface={worker['interface']}" if arg == interface_arg[0] else arg
+                    for arg in self.worker_args]
+            prefix = [taskset, "-c", worker["cpus"]] if (taskset and worker["cpus"]) else []
+            commands.append((prefix + self.worker_command + args,
+                             {"CUDA_VISIBLE_DEVICES": worker["device"],
+                              "CUDA_DEVICE_ORDER": "PCI_BUS_ID"}))
+        return commands
+
+    def status(self):
+        """
+        Return a dict describing the scheduler and worker processes started
+        by this launcher. Exit codes are None for running processes.
+        """
+        def proc_status(proc):
+            return {"pid": proc.pid, "running": proc.poll() is None,
+                    "exit_code": proc.poll()}
+
+        return {
+            "cluster_config_type": self.cluster_config_type,
+            "scheduler_file": self.scheduler_file,
+            "scheduler_address": read_scheduler_address(self.scheduler_file),
+            "scheduler": (proc_status(self.scheduler_proc)
+                          if self.scheduler_proc else None),
+            "workers": [proc_status(proc) for proc in self.worker_procs],
+        }
+
+    def _procs(self):
+        return self.worker_procs + ([self.scheduler_proc] if self.scheduler_proc else [])
+
+    def terminate(self):
+        """
+        Send SIGTERM to the workers, then the scheduler, without waiting for
+        them to exit.
+        """
+        for proc in self._procs():
+            if proc.poll() is None:
+                proc.terminate()
+
+    def request_stop(self):
+        """
+        Stop starting the cluster and terminate the processes started so
+        far, without waiting for them to exit. Safe to call from a signal
+        handler.
+        """
+        self.stopping.set()
+        self.terminate()
+
+    def stop(self, timeout=30):
+        """
+        Stop the workers, then the scheduler, with SIGTERM, killing any that
+        have not exited after timeout seconds.
+        """
+        procs = self._procs()
+        self.terminate()
+        deadline = time.monotonic() + timeout
+        for proc in procs:
+            try:
+                proc.wait(timeout=max(0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+
+    def wait(self):
+        """
+        Wait for the workers, then the scheduler, to exit. Returns the first
+        non-zero exit code, or 0.
+        """
+        exit_codes = [proc.wait() for proc in self.worker_procs]
+        if self.scheduler_proc:
+            exit_codes.append(self.scheduler_proc.wait())
+        return next((code for code in exit_codes if code), 0)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scheduler", action="store_true",
+                    help="Start the scheduler.")
+    ap.add_argument("--workers", action="store_true",
+                    help="Start the workers.")
+    ap.add_argument("--cluster-config-type", default="TCP",
+                    choices=CLUSTER_CONFIG_TYPES,
+                    help="Cluster configuration to use.")
+    ap.add_argument("--scheduler-file", default=None,
+                    help="Scheduler file to write or read. Defaults to the "
+                    "SCHEDULER_FILE env var.")
+    ap.add_argument("--logs-dir", default=None,
+                    help="Directory for the scheduler and worker logs. "
+                    "Defaults to the LOGS_DIR env var.")
+    ap.add_argument("--scheduler-tries", type=int, default=30,
+                    help="Number of times to try starting the scheduler.")
+    ap.add_argument("--worker-command", default="dask-cuda-worker",
+                    help="Command used to start workers, eg. \"dask worker\" "
+                    "for CPU-only workers.")
+    args = ap.parse_args()
+
+    launcher = ClusterLauncher(args.cluster_config_type,
+                               scheduler_file=args.scheduler_file,
+                               logs_dir=args.logs_dir,
+                               worker_command=args.worker_command.split())
+    print(f"Logs written to: {launcher.logs_dir}", flush=True)
+
+    # Stop the cluster if this process is asked to stop, eg. by
+    # handle_timeout in functions.sh, including while it is still starting.
+    # The processes are reaped by launcher.wait() below, or launcher.stop().
+    def handle_signal(signum, frame):
+        launcher.request_stop()
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+
+    try:
+        if args.scheduler:
+            launcher.start_scheduler(max_tries=args.scheduler_tries)
+            print("scheduler started.", flush=True)
+        if args.workers:
+            if not os.path.exists(launcher.scheduler_file):
+                print(f"cluster_launcher.py: {launcher.scheduler_file} not "
+                      "present - waiting to start workers...", flush=True)
+            launcher.start_workers()
+            print("worker(s) started.", flush=True)
+    except RuntimeError as err:
+        print(f"{err}, exiting.", flush=True)
+        launcher.stop()
+        sys.exit(1)
+
+    # Like run-dask-process.sh always has, do not return until the
+    # processes started here have exited.
+    sys.exit(launcher.wait())
@@ -0,0 +1,504 @@
+# Copyright (c) 2026, NVIDIA CORPORATION.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Warm cluster pool.
+
+Starting a cluster for every test session means waiting for the scheduler
+and workers, allocating the RMM pools and creating the CUDA contexts again,
+which for short suites often takes longer than the tests. The pool daemon
+starts a cluster on this node once, with ClusterLauncher, and hands it out
+to one session at a time through its scheduler file:
+
+python cluster_pool.py serve --pool-dir=$POOL_DIR --cluster-config-type=UCX &
+read LEASE_ID SCHEDULER_FILE < <(python cluster_pool.py acquire --pool-dir=$POOL_DIR --holder-pid=$$)
+... run the session against $SCHEDULER_FILE ...
+python cluster_pool.py release --pool-dir=$POOL_DIR --lease-id=$LEASE_ID
+
+(or acquire_warm_cluster/release_warm_cluster in functions.sh). Sessions
+must close their clients but not shut the cluster down.
+
+The pool directory holds two small JSON files:
+
+- pool.json, written by the daemon: its state (starting, ready, leased,
+  resetting or stopped), pid, scheduler file and workers.
+- lease.json, created (exclusively) by the session acquiring the cluster
+  and removed when it releases it. A session only gets the scheduler file
+  once the daemon has acknowledged its lease, so a lease never overlaps a
+  reset or a health check.
+
+After each session the cluster is reset before the next one gets it:
+published datasets are removed, the tasks left by the session are waited
+for, and every worker is garbage collected and checked to hold no data and
+to be back near the host and device memory it used when the cluster was
+started. Workers failing the checks are restarted, and if workers are still
+missing, or the scheduler died, the whole cluster is restarted. A session
+whose process exits without releasing the cluster has its lease reclaimed.
+While the cluster is not leased it is health checked every
+--check-interval seconds, and the daemon stops the cluster and exits after
+--idle-timeout seconds without a session.
+"""
+
+import gc
+import json
+import os
+from pathlib import Path
+import socket
+import sys
+import threading
+import time
+import uuid
+
+from cluster_launcher import ClusterLauncher, CLUSTER_CONFIG_TYPES
+
+
+POOL_STATE_FILE_NAME = "pool.json"
+LEASE_FILE_NAME = "lease.json"
+POLL_INTERVAL = 0.5
+# seconds acquire() waits for a pool daemon that was just started to write
+# its state
+STARTUP_GRACE = 30
+# growth of a worker's host or device memory, over its usage when the
+# cluster was started, tolerated between sessions
+MIN_MEMORY_SLACK = 256 * 2**20
+
+
+def _write_json(path, data):
+    """
+    Replace the JSON file at path, so readers never see a partial file.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as tmp_file:
+        json.dump(data, tmp_file, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path):
+    try:
+        with open(path) as json_file:
+            return json.load(json_file)
+    except (OSError, ValueError):
+        return None
+
+
+def read_state(pool_dir):
+    """
+    Return the state of the pool in pool_dir, or None if there is none.
+    """
+    return _read_json(Path(pool_dir) / POOL_STATE_FILE_NAME)
+
+
+def read_lease(pool_dir):
+    """
+    Return the lease of the pool in pool_dir, or None if it is not leased.
+    """
+    return _read_json(Path(pool_dir) / LEASE_FILE_NAME)
+
+
+def pid_exists(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _daemon_running(state):
+    return (state is not None and state["state"] != "stopped"
+            and (state["host"] != socket.gethostname() or pid_exists(state["pid"])))
+
+
+def acquire(pool_dir, holder_pid=None, timeout=None):
+    """
+    Lease the cluster of the pool in pool_dir, waiting until it is free.
+
+    Parameters:
+    - pool_dir (str): the pool directory of the daemon.
+    - holder_pid (int): the process of the session, whose exit releases the
+      lease if it was not released. Defaults to the calling process.
+    - timeout (float): seconds to wait for the cluster, or None to wait
+      until it is free.
+
+    Returns:
+    tuple: (the lease id, the scheduler file of the cluster).
+
+    Raises RuntimeError if no pool daemon is running, or TimeoutError if the
+    cluster is not free within timeout seconds.
+    """
+    lease_file = Path(pool_dir) / LEASE_FILE_NAME
+    lease = {
+        "id": uuid.uuid4().hex,
+        "pid": holder_pid or os.getpid(),
+        "host": socket.gethostname(),
+        "time": time.time(),
+    }
+    deadline = (time.monotonic() + timeout) if timeout else None
+    startup_deadline = time.monotonic() + STARTUP_GRACE
+    leased = False
+    while True:
+        state = read_state(pool_dir)
+        if state is None and time.monotonic() < startup_deadline:
+            time.sleep(POLL_INTERVAL)
+            continue
+        if not _daemon_running(state):
+            if leased:
+                lease_file.unlink(missing_ok=True)
+            raise RuntimeError(f"no cluster pool running in {pool_dir}")
+        if leased and state["lease"] == lease["id"]:
+            return lease["id"], state["scheduler_file"]
+        if not leased and state["state"] == "ready":
+            try:
+                fd = os.open(lease_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL)
+            except FileExistsError:
+                pass  # another session got it first
+            else:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(lease, f)
+                leased = True
+                continue
+        if deadline and time.monotonic() >= deadline:
+            if leased:
+                lease_file.unlink(missing_ok=True)
+            raise TimeoutError(f"cluster pool in {pool_dir} not free after {timeout} seconds")
+        time.sleep(POLL_INTERVAL)
+
+
+def release(pool_dir, lease_id=None):
+    """
+    Release the lease of the pool in pool_dir, only if its id is lease_id
+    when given. Returns True if a lease was released.
+    """
+    lease = read_lease(pool_dir)
+    if lease is None or (lease_id and lease.get("id") != lease_id):
+        return False
+    (Path(pool_dir) / LEASE_FILE_NAME).unlink(missing_ok=True)
+    return True
+
+
+def _worker_usage(dask_worker):
+    """
+    Runs on each worker, after a garbage collection, to report the number
+    of keys it holds and the host and device memory it uses.
+    """
+    import psutil
+
+    gc.collect()
+    usage = {
+        "name": str(dask_worker.name),
+        "keys": len(dask_worker.data),
+        "host_memory": psutil.Process().memory_info().rss,
+        "device_memory": None,
+    }
+    try:
+        from distributed.diagnostics import nvml
+        usage["device_memory"] = nvml.real_time()["memory-used"]
+    except Exception:
+        pass  # no GPU, or no NVML
+    return usage
+
+
+def _scheduler_tasks(dask_scheduler):
+    return len(dask_scheduler.tasks)
+
+
+class ClusterPool:
+    """
+    Keeps a warm cluster on this node and hands it out to one session at a
+    time, through the files of pool_dir. The cluster is started with
+    ClusterLauncher(cluster_config_type, **launcher_kwargs).
+    """
+    def __init__(self, pool_dir, cluster_config_type="TCP", num_workers=None,
+                 idle_timeout=3600, check_interval=60, reset_timeout=60,
+                 start_timeout=600, memory_tolerance=0.1, **launcher_kwargs):
+        self.pool_dir = Path(pool_dir)
+        self.cluster_config_type = cluster_config_type
+        self.launcher_kwargs = launcher_kwargs
+        self.num_workers = num_workers or int(os.environ.get("NUM_WORKERS", 1))
+        self.idle_timeout = idle_timeout
+        self.check_interval = check_interval
+        self.reset_timeout = reset_timeout
+        self.start_timeout = start_timeout
+        self.memory_tolerance = memory_tolerance
+        self.launcher = None
+        self.client = None
+        self.baseline = {}
+        self.state = {
+            "state": "starting",
+            "pid": os.getpid(),
+            "host": socket.gethostname(),
+            "scheduler_file": None,
+            "workers": 0,
+            "lease": None,
+            "sessions": 0,
+            "restarts": 0,
+            "updated": time.time(),
+        }
+
+    def _set_state(self, state, **fields):
+        self.state.update(state=state, updated=time.time(), **fields)
+        _write_json(self.pool_dir / POOL_STATE_FILE_NAME, self.state)
+
+    def _log(self, message):
+        print(f"cluster_pool.py - {message}", flush=True)
+
+    def start(self):
+        """
+        Start the cluster and wait for its workers, then record the memory
+        each worker uses as the baseline of the checks between sessions.
+        """
+        from dask.distributed import Client
+
+        self.pool_dir.mkdir(parents=True, exist_ok=True)
+        self._set_state("starting")
+        self.launcher = ClusterLauncher(self.cluster_config_type, **self.launcher_kwargs)
+        self.launcher.start_scheduler(timeout=self.start_timeout)
+        self.launcher.start_workers(timeout=self.start_timeout)
+        self.client = Client(scheduler_file=self.launcher.scheduler_file,
+                             timeout=f"{self.start_timeout}s")
+        self.client.wait_for_workers(self.num_workers, timeout=self.start_timeout)
+        self.baseline = {usage["name"]: usage for usage in self._usage().values()}
+        self._set_state("ready", scheduler_file=self.launcher.scheduler_file,
+                        workers=len(self.baseline))
+        self._log(f"cluster of {len(self.baseline)} workers ready, "
+                  f"scheduler file {self.launcher.scheduler_file}")
+
+    def stop(self):
+        if self.client is not None:
+            self.client.close()
+            self.client = None
+        if self.launcher is not None:
+            self.launcher.stop()
+            self.launcher = None
+
+    def restart(self):
+        """
+        Restart the whole cluster.
+        """
+        self._log("restarting the cluster")
+        self.stop()
+        self.state["restarts"] += 1
+        self.start()
+
+    def _usage(self):
+        return self.client.run(_worker_usage, on_error="return")
+
+    def _unhealthy_workers(self, usages):
+        """
+        Return the addresses of the workers that failed to report, hold data
+        or use more memory than when the cluster was started.
+        """
+        unhealthy = []
+        for (address, usage) in usages.items():
+            if not isinstance(usage, dict):
+                self._log(f"{address} did not respond: {usage}")
+                unhealthy.append(address)
+                continue
+            if usage["keys"]:
+                self._log(f"{address} still holds {usage['keys']} keys")
+                unhealthy.append(address)
+                continue
+            baseline = self.baseline.get(usage["name"])
+            if baseline is None:
+                continue
+            for key in ("host_memory", "device_memory"):
+                if usage[key] is None or baseline[key] is None:
+                    continue
+                limit = baseline[key] + max(baseline[key] * self.memory_tolerance,
+                                            MIN_MEMORY_SLACK)
+                if usage[key] > limit:
+                    self._log(f"{address} uses {usage[key]} bytes of {key}, "
+                              f"{baseline[key]} after startup")
+                    unhealthy.append(address)
+                    break
+        return unhealthy
+
+    def _cluster_alive(self):
+        status = self.launcher.status()
+        return status["scheduler"]["running"] and all(w["running"] for w in status["workers"])
+
+    def check(self, reset=False):
+        """
+        Check the health of the cluster, restarting the workers (or the
+        whole cluster) that are not healthy. With reset, first clear what
+        the last session left on the cluster.
+        """
+        try:
+            if not self._cluster_alive():
+                self.restart()
+                return
+            if reset:
+                for name in self.client.list_datasets():
+                    self.client.unpublish_dataset(name)
+                # the session's keys are released once its clients are gone
+                deadline = time.monotonic() + self.reset_timeout
+                while (self.client.run_on_scheduler(_scheduler_tasks)
+                       and time.monotonic() < deadline):
+                    time.sleep(POLL_INTERVAL)
+            unhealthy = self._unhealthy_workers(self._usage())
+            if unhealthy:
+                self._log(f"restarting {len(unhealthy)} worker(s)")
+                self.client.restart_workers(unhealthy, timeout=self.reset_timeout)
+                self.state["restarts"] += 1
+            self.client.wait_for_workers(self.num_workers, timeout=self.reset_timeout)
+            if unhealthy:
+                # what restarted workers use is their new baseline
+                for usage in self._usage().values():
+                    if isinstance(usage, dict):
+                        self.baseline[usage["name"]] = usage
+        except Exception as err:
+            self._log(f"cluster unhealthy ({err!r})")
+            self.restart()
+
+    def _lease_abandoned(self, lease):
+        return lease["host"] == socket.gethostname() and not pid_exists(lease["pid"])
+
+    def serve(self, stop_event):
+        """
+        Hand the cluster out to sessions until stop_event is set or the pool
+        has been idle for idle_timeout seconds.
+        """
+        idle_since = last_check = time.monotonic()
+        while not stop_event.wait(POLL_INTERVAL):
+            lease = read_lease(self.pool_dir)
+            now = time.monotonic()
+            if lease is not None:
+                if self.state["lease"] != lease["id"]:
+                    self._set_state("leased", lease=lease["id"],
+                                    sessions=self.state["sessions"] + 1)
+                    self._log(f"leased to pid {lease['pid']} on {lease['host']}")
+                elif self._lease_abandoned(lease):
+                    self._log(f"pid {lease['pid']} exited without releasing the cluster")
+                    release(self.pool_dir, lease["id"])
+                continue
+
+            if self.state["state"] == "leased":
+                self._set_state("resetting", lease=None)
+                self.check(reset=True)
+                self._set_state("ready", workers=len(self.client.scheduler_info()["workers"]))
+                idle_since = last_check = time.monotonic()
+            elif self.idle_timeout and now - idle_since >= self.idle_timeout:
+                self._log(f"idle for {self.idle_timeout} seconds, stopping")
+                break
+            elif self.check_interval and now - last_check >= self.check_interval:
+                self.check()
+                self._set_state("ready", workers=len(self.client.scheduler_info()["workers"]))
+                last_check = time.monotonic()
+
+
+if __name__ == "__main__":
+    import argparse
+    import signal
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("command", choices=("serve", "acquire", "release", "status", "stop"),
+                    help="serve: start the cluster and hand it out until idle. "
+                    "acquire: wait for the cluster and print its scheduler "
+                    "file. release: hand the cluster back. status: print the "
+                    "pool state. stop: stop the pool daemon.")
+    ap.add_argument("--pool-dir", default=os.environ.get("CLUSTER_POOL_DIR"),
+                    help="Directory of the pool state and lease files. "
+                    "Defaults to the CLUSTER_POOL_DIR env var.")
+    ap.add_argument("--cluster-config-type", default="TCP",
+                    choices=CLUSTER_CONFIG_TYPES,
+                    help="serve: cluster configuration to use.")
+    ap.add_argument("--scheduler-file", default=None,
+                    help="serve: scheduler file to write. Defaults to the "
+                    "SCHEDULER_FILE env var.")
+    ap.add_argument("--logs-dir", default=None,
+                    help="serve: directory for the scheduler and worker "
+                    "logs. Defaults to the LOGS_DIR env var.")
+    ap.add_argument("--worker-command", default="dask-cuda-worker",
+                    help="serve: command used to start workers.")
+    ap.add_argument("--num-workers", type=int, default=None,
+                    help="serve: number of workers of the cluster. Defaults "
+                    "to the NUM_WORKERS env var, or 1.")
+    ap.add_argument("--idle-timeout", type=float, default=3600,
+                    help="serve: stop after this many seconds without a "
+                    "session, 0 to never stop.")
+    ap.add_argument("--check-interval", type=float, default=60,
+                    help="serve: seconds between health checks of an idle "
+                    "cluster, 0 to only check it between sessions.")
+    ap.add_argument("--reset-timeout", type=float, default=60,
+                    help="serve: seconds to wait for a session's tasks to be "
+                    "released and restarted workers to come back.")
+    ap.add_argument("--holder-pid", type=int, default=None,
+                    help="acquire: the session process, whose exit releases "
+                    "the cluster. Defaults to the parent of this process.")
+    ap.add_argument("--lease-id", default=None,
+                    help="release: only release this lease.")
+    ap.add_argument("--timeout", type=float, default=None,
+                    help="acquire: seconds to wait for the cluster.")
+    args = ap.parse_args()
+
+    if not args.pool_dir:
+        ap.error("--pool-dir or CLUSTER_POOL_DIR is required")
+
+    if args.command == "acquire":
+        try:
+            (lease_id, scheduler_file) = acquire(args.pool_dir,
+                                                 holder_pid=args.holder_pid or os.getppid(),
+                                                 timeout=args.timeout)
+        except (RuntimeError, TimeoutError) as err:
+            print(f"cluster_pool.py: {err}", file=sys.stderr)
+            sys.exit(1)
+        print(lease_id, scheduler_file)
+        sys.exit(0)
+
+    if args.command == "release":
+        sys.exit(0 if release(args.pool_dir, args.lease_id) else 1)
+
+    if args.command == "status":
+        print(json.dumps({"pool": read_state(args.pool_dir),
+                          "lease": read_lease(args.pool_dir)}, indent=2))
+        sys.exit(0)
+
+    if args.command == "stop":
+        state = read_state(args.pool_dir)
+        if not _daemon_running(state):
+            print(f"cluster_pool.py: no cluster pool running in {args.pool_dir}",
+                  file=sys.stderr)
+            sys.exit(1)
+        os.kill(state["pid"], signal.SIGTERM)
+        sys.exit(0)
+
+    state = read_state(args.pool_dir)
+    if _daemon_running(state):
+        print(f"cluster_pool.py: a cluster pool is already running in {args.pool_dir} "
+              f"(pid {state['pid']})", file=sys.stderr)
+        sys.exit(1)
+    Path(args.pool_dir, LEASE_FILE_NAME).unlink(missing_ok=True)
+
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stop_event.set())
+
+    pool = ClusterPool(args.pool_dir, args.cluster_config_type,
+                       num_workers=args.num_workers,
+                       idle_timeout=args.idle_timeout,
+                       check_interval=args.check_interval,
+                       reset_timeout=args.reset_timeout,
+                       scheduler_file=args.scheduler_file,
+                       logs_dir=args.logs_dir,
+                       worker_command=args.worker_command.split())
+    exit_code = 0
+    try:
+        pool.start()
+        pool.serve(stop_event)
+    except (RuntimeError, TimeoutError, OSError) as err:
+        print(f"cluster_pool.py: {err}, exiting.", flush=True)
+        exit_code = 1
+    finally:
+        pool.stop()
+        pool._set_state("stopped", lease=None)
+    sys.exit(exit_code)
@@ -0,0 +1,416 @@
+# Copyright (c) 2026, NVIDIA CORPORATION.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+A/B comparison of two sets of benchmark results.
+
+Each side of a comparison is a set of samples per benchmark, read from
+either:
+
+- a results directory written by record-benchmarks.py (or its store
+  directory), with an optional date range: the samples are the nightly
+  results of the range, eg. two weeks before and after a change.
+- a benchmark run directory (eg. latest/benchmarks/2-GPU), read with
+  benchmark_results.read_run_dir(): the samples are the duration of every
+  round when they were recorded, or else the single result of the night.
+
+So two branches, two date ranges or two cluster configs (eg. the tcp and
+ucx profiles of run-dask-process.sh, run into their own results
+directories) can be compared.
+
+For every benchmark at once, the ratio of the candidate median to the
+baseline median is computed with a bootstrap confidence interval. A change
+is significant when the interval excludes 1, or with --method=mannwhitney
+when the Mann-Whitney U test rejects that both sides come from the same
+distribution (which requires scipy). Changes smaller than --min-change are
+not reported as significant, however confident.
+
+Example usage, comparing the nights of a ucx run to those of a tcp run
+since March 1st:
+
+python compare_results.py --baseline=tcp/results --candidate=ucx/results \\
+                          --run-type=8-GPU --baseline-dates=20260301: \\
+                          --candidate-dates=20260301: --format=html
+
+or the rounds of two runs of the same benchmarks:
+
+python compare_results.py --baseline=main/benchmarks/2-GPU \\
+                          --candidate=branch/benchmarks/2-GPU
+"""
+
+import json
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+
+try:
+    from scipy import stats as scipy_stats
+except ImportError:
+    scipy_stats = None
+
+import benchmark_results
+import results_store
+
+
+METHODS = ("bootstrap", "mannwhitney")
+MIN_SAMPLES = 3
+# bootstrap resamples are drawn for this many values at a time at most
+MAX_RESAMPLED_VALUES = 2**24
+
+
+def _strip_prefix(name):
+    return name[2:] if name.startswith("./") else name
+
+
+def _in_range(dates, date_range):
+    """
+    Return a mask of the dates within date_range, a "START:END" string of
+    inclusive date prefixes, either of which can be omitted.
+    """
+    (since, _, until) = (date_range or ":").partition(":")
+    mask = pd.Series(True, index=dates.index)
+    if since:
+        mask &= dates.str[:len(since)] >= since
+    if until:
+        mask &= dates.str[:len(until)] <= until
+    return mask
+
+
+def _is_run_dir(path):
+    path = Path(path)
+    return ((path / benchmark_results.PYTEST_RESULTS_FILE_NAME).exists()
+            or any(path.glob(benchmark_results.JSONL_GLOB))
+            or any(path.glob(benchmark_results.PYTEST_BENCHMARK_GLOB)))
+
+
+def _store_dir(results_dir):
+    results_dir = Path(results_dir)
+    return results_dir / "store" if (results_dir / "store").is_dir() else results_dir
+
+
+def store_samples(results_dir, run_type, date_range=None):
+    """
+    Return the nightly results of run_type within date_range as samples.
+
+    Parameters:
+    - results_dir (str or Path): a results directory written by
+      record-benchmarks.py, or its store directory.
+    - run_type (str): the run type to read, eg. "2-GPU".
+    - date_range (str): "START:END" inclusive run date prefixes, eg.
+      "20260301:20260314" or "20260301:", or None for every night.
+
+    Returns:
+    dict: benchmark name to the array of its results, oldest first,
+    without FAILED/SKIPPED results.
+    """
+    df = results_store.read_results(_store_dir(results_dir), run_type)
+    df = df[_in_range(df["date"].astype(str), date_range)]
+    values = df.drop(columns="date").apply(pd.to_numeric, errors="coerce").astype(float)
+    return {_strip_prefix(name): column.dropna().to_numpy()
+            for (name, column) in values.items()}
+
+
+def run_dir_samples(run_dir):
+    """
+    Return the samples of a benchmark run directory: the duration of every
+    round of each passed benchmark, or its single result when its rounds
+    were not recorded.
+    """
+    samples = {}
+    for record in benchmark_results.read_run_dir(run_dir):
+        if record["status"] != "PASSED":
+            continue
+        durations = record.get("durations")
+        if durations:
+            samples[_strip_prefix(record["name"])] = np.asarray(durations, dtype=float)
+        else:
+            samples[_strip_prefix(record["name"])] = np.array([record["stats"]["median"]],
+                                                              dtype=float)
+    return samples
+
+
+def load_samples(path, run_type=None, date_range=None):
+    """
+    Return the samples of path, a benchmark run directory or a results
+    directory (which then requires run_type).
+    """
+    if _is_run_dir(path):
+        return run_dir_samples(path)
+    if run_type is None:
+        raise ValueError(f"{path} is not a benchmark run directory, a run type is needed "
+                         "to read its results")
+    return store_samples(path, run_type, date_range)
+
+
+def _padded(samples, names):
+    """
+    Return the samples of names as a (benchmarks, max samples) array padded
+    with NaN, and the number of samples of each benchmark.
+    """
+    counts = np.array([len(samples.get(name, ())) for name in names], dtype=int)
+    values = np.full((len(names), max(counts.max(initial=0), 1)), np.nan)
+    for (i, name) in enumerate(names):
+        values[i, :counts[i]] = samples.get(name, ())
+    return values, counts
+
+
+def _bootstrap_medians(values, counts, num_resamples, rng):
+    """
+    Return the medians of num_resamples bootstrap resamples of each row of
+    values, as a (benchmarks, num_resamples) array.
+    """
+    (num_rows, width) = values.shape
+    medians = np.empty((num_rows, num_resamples))
+    # resample a few benchmarks at a time, to bound the memory used
+    step = max(1, MAX_RESAMPLED_VALUES // (num_resamples * width))
+    padding = np.arange(width) >= counts[:, None]
+    for start in range(0, num_rows, step):
+        rows = slice(start, start + step)
+        index = (rng.random((values[rows].shape[0], num_resamples, width))
+                 * counts[rows, None, None]).astype(int)
+        resampled = np.take_along_axis(values[rows, None, :], index, axis=2)
+        resampled[np.broadcast_to(padding[rows, None, :], resampled.shape)] = np.nan
+        medians[rows] = np.nanmedian(resampled, axis=2)
+    return medians
+
+
+def compare(baseline, candidate, method="bootstrap", confidence=0.95, alpha=0.05,
+            min_change=0.0, num_resamples=2000, higher_is_better=False, seed=0):
+    """
+    Compare the samples of every benchmark of candidate to baseline.
+
+    Parameters:
+    - baseline (dict): benchmark name to an array of samples, eg. from
+      load_samples().
+    - candidate (dict): the same for the results compared to baseline.
+    - method (str): "bootstrap", where a change is significant when the
+      confidence interval of the ratio excludes 1, or "mannwhitney", where
+      it is when the p-value of the Mann-Whitney U test is below alpha.
+    - confidence (float): level of the bootstrap confidence intervals.
+    - alpha (float): significance level of the Mann-Whitney U test.
+    - min_change (float): relative change below which a change is not
+      significant, eg. 0.02.
+    - num_resamples (int): number of bootstrap resamples.
+    - higher_is_better (bool): results are rates rather than times.
+    - seed (int): seed of the bootstrap resampling, for reproducible results.
+
+    Returns:
+    df: one row per benchmark of both sides, with the number of samples and
+    median of each side, the ratio of the candidate median to the baseline
+    one and its confidence interval, the speedup (the ratio for rates, its
+    inverse for times), the Mann-Whitney p-value (None without scipy), and
+    the verdict: "faster", "slower", "no change" or "not enough samples".
+    Sorted by verdict, then from the largest speedup to the largest
+    slowdown.
+    """
+    if method not in METHODS:
+        raise ValueError(f"unknown method {method}, expected one of {METHODS}")
+    if method == "mannwhitney" and scipy_stats is None:
+        raise RuntimeError("the mannwhitney method requires scipy")
+
+    names = sorted(set(baseline) | set(candidate))
+    (values_a, counts_a) = _padded(baseline, names)
+    (values_b, counts_b) = _padded(candidate, names)
+    enough = (counts_a >= MIN_SAMPLES) & (counts_b >= MIN_SAMPLES)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        median_a = np.array([np.median(row[:n]) if n else np.nan
+                             for (row, n) in zip(values_a, counts_a)])
+        median_b = np.array([np.median(row[:n]) if n else np.nan
+                             for (row, n) in zip(values_b, counts_b)])
+        ratio = median_b / median_a
+
+    ci_low = np.full(len(names), np.nan)
+    ci_high = np.full(len(names), np.nan)
+    if enough.any():
+        rng = np.random.default_rng(seed)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratios = (_bootstrap_medians(values_b[enough], counts_b[enough], num_resamples, rng)
+                      / _bootstrap_medians(values_a[enough], counts_a[enough], num_resamples, rng))
+        tail = 100 * (1 - confidence) / 2
+        (ci_low[enough], ci_high[enough]) = np.nanpercentile(ratios, [tail, 100 - tail], axis=1)
+
+    p_value = np.full(len(names), np.nan)
+    if scipy_stats is not None and enough.any():
+        p_value[enough] = scipy_stats.mannwhitneyu(
+            values_a[enough], values_b[enough], alternative="two-sided", axis=1,
+            nan_policy="omit").pvalue
+
+    if method == "bootstrap":
+        significant = enough & ((ci_low > 1) | (ci_high < 1))
+    else:
+        significant = enough & (p_value < alpha)
+    significant &= np.abs(ratio - 1) >= min_change
+    with np.errstate(divide="ignore", invalid="ignore"):
+        speedup = ratio if higher_is_better else 1 / ratio
+    verdict = np.where(~enough, "not enough samples",
+                       np.where(~significant, "no change",
+                                np.where(speedup > 1, "faster", "slower")))
+
+    df = pd.DataFrame({
+        "name": names,
+        "baseline_n": counts_a,
+        "candidate_n": counts_b,
+        "baseline_median": median_a,
+        "candidate_median": median_b,
+        "ratio": ratio,
+        "ci_low": ci_low,
+        "ci_high": ci_high,
+        "speedup": speedup,
+        "p_value": p_value,
+        "verdict": verdict,
+    })
+    order = {"faster": 0, "slower": 1, "no change": 2, "not enough samples": 3}
+    # speedups largest first, then slowdowns, largest last
+    df["_order"] = df["verdict"].map(order)
+    df = df.sort_values(["_order", "speedup", "name"], ascending=[True, False, True],
+                        kind="stable")
+    return df.drop(columns="_order").reset_index(drop=True)
+
+
+def _to_json_float(value):
+    # significant digits, not decimals: small p-values must not become 0
+    return None if pd.isna(value) else float(f"{float(value):.6g}")
+
+
+def to_records(comparison, significant_only=True):
+    """
+    Return the rows of a comparison as JSON serializable dicts.
+    """
+    if significant_only:
+        comparison = comparison[comparison["verdict"].isin(["faster", "slower"])]
+    records = []
+    for row in comparison.to_dict("records"):
+        records.append({key: (_to_json_float(value) if isinstance(value, float)
+                              else int(value) if isinstance(value, np.integer) else value)
+                        for (key, value) in row.items()})
+    return records
+
+
+def _format_row(row):
+    interval = ("" if pd.isna(row["ci_low"])
+                else f" [{row['ci_low']:.3f}, {row['ci_high']:.3f}]")
+    p_value = "" if pd.isna(row["p_value"]) else f" p={row['p_value']:.3g}"
+    return (f"{row['speedup']:.3f}x", f"ratio {row['ratio']:.3f}{interval}{p_value}",
+            f"n={row['baseline_n']}/{row['candidate_n']}")
+
+
+def to_text(comparison, significant_only=True):
+    """
+    Return a comparison as a plain text table.
+    """
+    rows = comparison
+    if significant_only:
+        rows = rows[rows["verdict"].isin(["faster", "slower"])]
+    if rows.empty:
+        return "no significant change"
+    width = max(len(name) for name in rows["name"])
+    lines = [f"{'benchmark':<{width}}  {'verdict':<18}  speedup  details"]
+    for row in rows.to_dict("records"):
+        (speedup, details, counts) = _format_row(row)
+        lines.append(f"{row['name']:<{width}}  {row['verdict']:<18}  {speedup:>7}  "
+                     f"{details}, {counts}")
+    return "\n".join(lines)
+
+
+def to_html(comparison, significant_only=True):
+    """
+    Return HTML table rows summarizing a comparison, in the style of the
+    benchmark results tables.
+    """
+    rows = comparison
+    if significant_only:
+        rows = rows[rows["verdict"].isin(["faster", "slower"])]
+    num_faster = int((rows["verdict"] == "faster").sum())
+    num_slower = int((rows["verdict"] == "slower").sum())
+    html = [f'<tr><td colspan="2"><b>{num_faster} significantly faster, {num_slower} '
+            f'significantly slower benchmark(s)</b></td></tr>\n']
+    styles = {"faster": 'style="background-color:#d4edda"',
+              "slower": 'style="background-color:#f8d7da"'}
+    for row in rows.to_dict("records"):
+        (speedup, details, counts) = _format_row(row)
+        style = styles.get(row["verdict"], "")
+        html.append(f'<tr {style}><td><text>{row["name"]}</text></td>'
+                    f'<td><text>{row["verdict"]} {speedup}<br>{details}, {counts}'
+                    f'</text></td></tr>\n')
+    return "".join(html)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--baseline", required=True,
+                    help="Results directory (or its store directory), or benchmark "
+                    "run directory, of the baseline results.")
+    ap.add_argument("--candidate", default=None,
+                    help="Results or run directory of the results compared to the "
+                    "baseline. Defaults to --baseline, eg. to compare two date "
+                    "ranges.")
+    ap.add_argument("--run-type", default=None,
+                    help="Run type read from results directories, eg. 2-GPU.")
+    ap.add_argument("--candidate-run-type", default=None,
+                    help="Run type read from the candidate results directory, "
+                    "defaults to --run-type.")
+    ap.add_argument("--baseline-dates", default=None,
+                    help="START:END inclusive run date prefixes of the baseline "
+                    "results, eg. 20260201:20260214.")
+    ap.add_argument("--candidate-dates", default=None,
+                    help="START:END inclusive run date prefixes of the candidate "
+                    "results.")
+    ap.add_argument("--method", default="bootstrap", choices=METHODS,
+                    help="How significance is decided.")
+    ap.add_argument("--confidence", type=float, default=0.95,
+                    help="Confidence level of the bootstrap intervals.")
+    ap.add_argument("--alpha", type=float, default=0.05,
+                    help="Significance level of the Mann-Whitney U test.")
+    ap.add_argument("--min-change", type=float, default=0.0,
+                    help="Smallest relative change reported, eg. 0.02.")
+    ap.add_argument("--resamples", type=int, default=2000,
+                    help="Number of bootstrap resamples.")
+    ap.add_argument("--higher-is-better", action="store_true",
+                    help="Results are rates rather than times.")
+    ap.add_argument("--all", action="store_true",
+                    help="Also list the benchmarks without a significant change.")
+    ap.add_argument("--format", default="text", choices=("text", "json", "html"),
+                    help="Output format.")
+    ap.add_argument("--output-file", default=None,
+                    help="Write the comparison here instead of stdout.")
+    args = ap.parse_args()
+
+    try:
+        baseline = load_samples(args.baseline, args.run_type, args.baseline_dates)
+        candidate = load_samples(args.candidate or args.baseline,
+                                 args.candidate_run_type or args.run_type,
+                                 args.candidate_dates)
+        comparison = compare(baseline, candidate, method=args.method,
+                             confidence=args.confidence, alpha=args.alpha,
+                             min_change=args.min_change, num_resamples=args.resamples,
+                             higher_is_better=args.higher_is_better)
+    except (ValueError, RuntimeError) as err:
+        print(f"compare_results.py: {err}", file=sys.stderr)
+        sys.exit(1)
+
+    significant_only = not args.all
+    if args.format == "json":
+        output = json.dumps(to_records(comparison, significant_only), indent=2)
+    elif args.format == "html":
+        output = to_html(comparison, significant_only)
+    else:
+        output = to_text(comparison, significant_only)
+    if args.output_file:
+        with open(args.output_file, "w") as out_file:
+            out_file.write(output + "\n")
+    else:
+        print(output)
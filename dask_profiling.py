@@ -0,0 +1,306 @@
+# Copyright (c) 2026, NVIDIA CORPORATION.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Opt-in Dask profiling of benchmarks.
+
+Captures the task stream of each benchmark (and its Dask performance report,
+when bokeh is installed) and reduces it to a compact breakdown of where the
+time went, so a regression can be attributed to compute, communication or
+scheduling:
+
+- wall: seconds between the start and the end of the benchmark.
+- tasks, workers: number of tasks run and of workers running them.
+- compute, transfer, deserialize, disk: worker seconds spent running
+  tasks, receiving their inputs from other workers, deserializing them and
+  reading/writing spilled data, summed over all workers.
+- idle: seconds of the benchmark during which no worker was doing any of
+  the above, ie. the time lost to the scheduler, the client and task
+  dispatch latency.
+
+Each breakdown is appended as one JSON line to dask-profiles.ndjson in the
+benchmark run directory, eg. latest/benchmarks/8-GPU, and performance
+reports are written to dask-reports/<benchmark>.html next to it. The
+breakdowns are not in a .jsonl file, which would be read as results.
+
+Example usage:
+
+with dask_profiling.profile(client, output_dir, "bench_bfs[scale_20]"):
+    run_bfs()
+
+or for every test of a pytest run, using the client of the test:
+
+pytest -p dask_profiling --dask-profile-dir=latest/benchmarks/8-GPU ...
+"""
+
+from contextlib import contextmanager, ExitStack
+import json
+from pathlib import Path
+import shutil
+import time
+
+try:
+    import pytest
+except ImportError:
+    pytest = None
+
+
+# outside of benchmark_results.JSONL_GLOB, the results of a run directory
+PROFILES_FILE_NAME = "dask-profiles.ndjson"
+REPORTS_DIR_NAME = "dask-reports"
+
+# task stream actions of each category
+ACTIONS = {
+    "compute": ("compute",),
+    "transfer": ("transfer",),
+    "deserialize": ("deserialize",),
+    "disk": ("disk-read", "disk-write"),
+}
+
+
+def _covered_time(intervals):
+    """
+    Return the total length of the union of (start, stop) intervals.
+    """
+    covered = 0.0
+    (current_start, current_stop) = (None, None)
+    for (start, stop) in sorted(intervals):
+        if current_stop is None or start > current_stop:
+            if current_stop is not None:
+                covered += current_stop - current_start
+            (current_start, current_stop) = (start, stop)
+        else:
+            current_stop = max(current_stop, stop)
+    if current_stop is not None:
+        covered += current_stop - current_start
+    return covered
+
+
+def summarize_task_stream(task_stream, start, end):
+    """
+    Reduce task stream records to a breakdown of the time between start and
+    end (time.time() values).
+
+    Parameters:
+    - task_stream (list): the records of distributed.get_task_stream(),
+      with the "startstops" of each task.
+    - start, end (float): the window of the benchmark.
+
+    Returns:
+    dict: the wall, tasks, workers, compute, transfer, deserialize, disk
+    and idle times described in the module docstring, in seconds.
+    """
+    totals = dict.fromkeys(ACTIONS, 0.0)
+    category = {action: key for (key, actions) in ACTIONS.items() for action in actions}
+    busy = []
+    workers = set()
+    for record in task_stream:
+        workers.add(record.get("worker"))
+        for startstop in record.get("startstops", ()):
+            key = category.get(startstop["action"])
+            if key is None:
+                continue
+            # only the part of the action within the window counts
+            (action_start, action_stop) = (max(startstop["start"], start),
+                                           min(startstop["stop"], end))
+            if action_stop <= action_start:
+                continue
+            totals[key] += action_stop - action_start
+            busy.append((action_start, action_stop))
+    wall = max(end - start, 0.0)
+    summary = {"wall": wall, "tasks": len(task_stream), "workers": len(workers - {None})}
+    summary.update(totals)
+    summary["idle"] = max(wall - _covered_time(busy), 0.0)
+    return {key: round(value, 6) if isinstance(value, float) else value
+            for (key, value) in summary.items()}
+
+
+def append_profile(output_dir, name, summary):
+    """
+    Append the breakdown of benchmark name to the profiles file of
+    output_dir.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with open(output_dir / PROFILES_FILE_NAME, "a") as profiles_file:
+        profiles_file.write(json.dumps({"name": name, **summary}) + "\n")
+
+
+def _performance_report(filename):
+    """
+    Return the performance_report() context manager writing to filename, or
+    None if reports cannot be generated here (they require bokeh).
+    """
+    from distributed import performance_report
+    try:
+        import bokeh  # noqa: F401
+    except ImportError:
+        return None
+    return performance_report(filename=str(filename))
+
+
+@contextmanager
+def profile(client, output_dir, name, report=True):
+    """
+    Context manager capturing the task stream of the cluster of client while
+    its body runs, and recording its breakdown as the profile of benchmark
+    name in output_dir.
+
+    Parameters:
+    - client (Client): the client of the cluster running the benchmark.
+    - output_dir (str): the benchmark run directory to write the profile to.
+    - name (str): the benchmark name.
+    - report (bool): also write the performance report of the benchmark to
+      output_dir/dask-reports/<name>.html, when bokeh is installed.
+
+    Yields:
+    dict: filled with the breakdown once the body has run.
+    """
+    from distributed import get_task_stream
+
+    summary = {}
+    with ExitStack() as stack:
+        if report:
+            reports_dir = Path(output_dir) / REPORTS_DIR_NAME
+            reports_dir.mkdir(parents=True, exist_ok=True)
+            performance_report = _performance_report(reports_dir / (name + ".html"))
+            if performance_report is not None:
+                stack.enter_context(performance_report)
+        task_stream = stack.enter_context(get_task_stream(client))
+        start = time.time()
+        try:
+            yield summary
+        finally:
+            end = time.time()
+            stack.close()
+            try:
+                summary.update(summarize_task_stream(task_stream.data, start, end))
+                append_profile(output_dir, name, summary)
+            except Exception as err:
+                # a missed profile must never fail the benchmark being observed
+                print(f"dask_profiling.py - profile of {name} failed: {err}", flush=True)
+
+
+def read_profiles(run_dir, name_prefix="./"):
+    """
+    Return the latest breakdown of each benchmark profiled in run_dir.
+
+    Parameters:
+    - run_dir (str): the benchmark run directory containing dask-profiles.ndjson.
+    - name_prefix (str): removed from the start of benchmark names, to match
+      the benchmark names shown in the reports.
+
+    Returns:
+    dict: benchmark name to its breakdown, empty if run_dir has no profiles.
+    """
+    profiles_file = Path(run_dir) / PROFILES_FILE_NAME
+    if not profiles_file.exists():
+        return {}
+    profiles = {}
+    with open(profiles_file) as lines:
+        for line in lines:
+            try:
+                record = json.loads(line)
+                name = record.pop("name")
+            except (ValueError, KeyError, AttributeError):
+                continue  # eg. a line truncated by a killed run
+            if name_prefix and name.startswith(name_prefix):
+                name = name[len(name_prefix):]
+            profiles[name] = record
+    return profiles
+
+
+def copy_reports(run_dir, dest, name_prefix="./"):
+    """
+    Copy the performance reports in run_dir to dest/<benchmark>.html,
+    replacing the reports of a previous run.
+
+    Returns:
+    set: the names of the benchmarks with a report.
+    """
+    dest = Path(dest)
+    if dest.exists():
+        for old_report in dest.glob("*.html"):
+            old_report.unlink()
+    reports = sorted((Path(run_dir) / REPORTS_DIR_NAME).glob("*.html"))
+    if not reports:
+        return set()
+    dest.mkdir(parents=True, exist_ok=True)
+    names = set()
+    for report in reports:
+        name = report.stem
+        if name_prefix and name.startswith(name_prefix):
+            name = name[len(name_prefix):]
+        shutil.copyfile(report, dest / (name + ".html"))
+        names.add(name)
+    return names
+
+
+def breakdown_fractions(summary):
+    """
+    Return the share of compute, transfer, deserialize, disk and idle time
+    in a breakdown, as fractions of their sum, or {} if it is empty.
+    """
+    keys = tuple(ACTIONS) + ("idle",)
+    total = sum(summary.get(key, 0.0) for key in keys)
+    if total <= 0:
+        return {}
+    return {key: summary.get(key, 0.0) / total for key in keys}
+
+
+################################################################################
+# pytest plugin, enabled with: pytest -p dask_profiling --dask-profile-dir=<run dir>
+
+if pytest is not None:
+    def pytest_addoption(parser):
+        parser.addoption("--dask-profile-dir", default=None,
+                         help="Profile the Dask tasks of each test that uses a "
+                         "client, writing the profiles to this directory.")
+        parser.addoption("--dask-profile-no-report", action="store_true",
+                         help="Do not write a Dask performance report per test.")
+
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(item):
+        output_dir = item.config.getoption("--dask-profile-dir")
+        client = None
+        if output_dir:
+            from distributed import default_client
+            try:
+                client = default_client()
+            except ValueError:
+                pass  # the test does not use dask
+        if client is None:
+            yield
+            return
+        report = not item.config.getoption("--dask-profile-no-report")
+        with profile(client, output_dir, item.name, report=report):
+            yield
+
+
+################################################################################
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--run-dir", required=True,
+                    help="Benchmark run directory to print the profiles of.")
+    args = ap.parse_args()
+
+    profiles = read_profiles(args.run_dir, name_prefix="")
+    if not profiles:
+        raise SystemExit(f"no Dask profiles in {args.run_dir}")
+    for (name, summary) in profiles.items():
+        shares = ", ".join(f"{key} {share:.0%}"
+                           for (key, share) in breakdown_fractions(summary).items())
+        print(f"{name}: {summary['wall']:.3f}s, {summary['tasks']} tasks ({shares})")
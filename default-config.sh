@@ -24,8 +24,22 @@ METADATA_FILE_NAME=metadata.sh
 # file that should not be overridded by a project, then they will
 # simply not use that syntax and override, since these variables are
 # read last.
+
+# A config fragment written by transport_tuning.py with the transport
+# settings found best for a cluster. It only sets variables that are still
+# unset, so the project config can override it, and it is read before the
+# defaults below so it overrides them.
+if [[ -n "${TUNED_CONFIG_FILE:-}" ]] && [[ -e "$TUNED_CONFIG_FILE" ]]; then
+    source $TUNED_CONFIG_FILE
+fi
+
 WORKER_RMM_POOL_SIZE=${WORKER_RMM_POOL_SIZE:-12G}
-DASK_CUDA_INTERFACE=${DASK_CUDA_INTERFACE:-ibp5s0f0}
+# auto: the interface closest to the GPUs of each node, see topology.py
+DASK_CUDA_INTERFACE=${DASK_CUDA_INTERFACE:-auto}
 DASK_SCHEDULER_PORT=${DASK_SCHEDULER_PORT:-8792}
 DASK_DEVICE_MEMORY_LIMIT=${DASK_DEVICE_MEMORY_LIMIT:-auto}
 DASK_HOST_MEMORY_LIMIT=${DASK_HOST_MEMORY_LIMIT:-auto}
+
+# The warm cluster pool, see start_cluster_pool in functions.sh
+CLUSTER_POOL_DIR=${CLUSTER_POOL_DIR:-/tmp/${USER:-$(id -un)}/cluster-pool}
+CLUSTER_POOL_IDLE_TIMEOUT=${CLUSTER_POOL_IDLE_TIMEOUT:-3600}
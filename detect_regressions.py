@@ -0,0 +1,296 @@
+# Copyright (c) 2026, NVIDIA CORPORATION.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Performance regression detection over a run type's nightly history.
+
+Every benchmark column is checked at once, with two complementary tests:
+
+- the latest result is compared against a rolling median/MAD baseline of
+  the preceding nights (robust z-score), which flags a slowdown the night
+  it lands.
+- a single mean-shift change point is located in each series, which
+  confirms a persistent shift and reports when it happened.
+
+FAILED/SKIPPED results and missing nights are treated as gaps, not zeros.
+
+When the statistics of each night are known (see benchmark_results.py),
+the measured noise of the results bounds the noise of the baseline from
+below, so a benchmark whose timings are noisy within a run is not flagged
+on a history too short or too stable to show it.
+
+Example usage:
+
+python detect_regressions.py --store-dir=results/store --run-type=2-GPU \
+                             --output-file=results/2-GPU-regressions.json
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+
+# MAD of normally distributed data is 0.6745 standard deviations.
+MAD_TO_STDDEV = 1.4826
+
+
+def history_to_values(df):
+    """
+    Convert a results history into a float DataFrame indexed by run date,
+    with FAILED/SKIPPED markers and missing results as NaN.
+    """
+    values = df.set_index("date").apply(pd.to_numeric, errors="coerce")
+    return values.astype(float)
+
+
+def robust_zscores(values, window=30, min_periods=5, min_rel_noise=0.01, noise=None):
+    """
+    Return the robust z-score of every result against a rolling median/MAD
+    baseline of the preceding window nights, along with the baseline.
+
+    The baseline never includes the result being scored. The noise estimate
+    is floored at min_rel_noise of the baseline so near-constant series do
+    not flag tiny changes, and by the measured noise when given: the
+    standard error of the difference between the result and the baseline,
+    from the result's own standard error and the median one of the baseline
+    nights.
+
+    Parameters:
+    - values (DataFrame): float results, one column per benchmark.
+    - window (int): number of prior nights in the baseline.
+    - min_periods (int): minimum number of non-gap nights for a baseline.
+    - min_rel_noise (float): lower bound on noise as a fraction of the baseline.
+    - noise (DataFrame): standard error of each result, indexed by date with
+      one column per benchmark, eg. benchmark_results.standard_errors().
+      Missing entries are ignored.
+
+    Returns:
+    tuple: (zscores DataFrame, baseline median DataFrame)
+    """
+    prior = values.shift(1)
+    median = prior.rolling(window, min_periods=min_periods).median()
+    abs_dev = (prior - median).abs()
+    mad = abs_dev.rolling(window, min_periods=min_periods).median()
+    scale = np.maximum(mad * MAD_TO_STDDEV, median.abs() * min_rel_noise)
+    if noise is not None:
+        noise = noise.reindex(index=values.index, columns=values.columns)
+        prior_noise = noise.shift(1).rolling(window, min_periods=1).median()
+        measured = np.sqrt(noise ** 2 + prior_noise ** 2)
+        scale = scale.where(~(measured > scale), measured)
+    return (values - median) / scale, median
+
+
+def change_points(values, min_size=3):
+    """
+    Locate the single most likely mean shift in every column.
+
+    Gaps are skipped by working on cumulative sums of the non-NaN results, so
+    all columns are scanned at once. Splits are placed between nights such
+    that both segments have at least min_size results.
+
+    Parameters:
+    - values (DataFrame): float results, one column per benchmark.
+    - min_size (int): minimum number of results on each side of a split.
+
+    Returns:
+    DataFrame: one row per benchmark with the date of the first night after
+    the shift, the segment means, and the Welch t-statistic of the shift
+    (NaN when there is no valid split).
+    """
+    arr = values.to_numpy()
+    valid = ~np.isnan(arr)
+    # center each column first to keep the sums of squares well conditioned
+    center = np.nanmedian(np.where(valid.any(axis=0), arr, 0.0), axis=0)
+    x = np.where(valid, arr - center, 0.0)
+
+    count = np.cumsum(valid, axis=0)
+    csum = np.cumsum(x, axis=0)
+    csq = np.cumsum(x * x, axis=0)
+    total_n, total_s, total_q = count[-1], csum[-1], csq[-1]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        n_l, n_r = count, total_n - count
+        mean_l = csum / n_l
+        mean_r = (total_s - csum) / n_r
+        var_l = (csq - n_l * mean_l ** 2) / (n_l - 1)
+        var_r = ((total_q - csq) - n_r * mean_r ** 2) / (n_r - 1)
+        t_stat = (mean_r - mean_l) / np.sqrt(var_l / n_l + var_r / n_r)
+
+    # a split after row i is only considered if row i is a result, so each
+    # split is counted once per gap
+    candidates = valid & (n_l >= min_size) & (n_r >= min_size)
+    score = np.where(candidates & np.isfinite(t_stat), np.abs(t_stat), -1.0)
+    best = score.argmax(axis=0)
+    cols = np.arange(arr.shape[1])
+    found = score[best, cols] >= 0
+
+    # the shift lands on the first result after the split
+    after = np.where(valid, np.arange(len(arr))[:, None], len(arr))
+    after = np.where(np.arange(len(arr))[:, None] > best, after, len(arr)).min(axis=0)
+
+    dates = np.asarray(values.index, dtype=object)
+    return pd.DataFrame(
+        {
+            "date": np.where(found, dates[np.minimum(after, len(arr) - 1)], None),
+            "before": np.where(found, mean_l[best, cols] + center, np.nan),
+            "after": np.where(found, mean_r[best, cols] + center, np.nan),
+            "t_stat": np.where(found, t_stat[best, cols], np.nan),
+        },
+        index=values.columns,
+    )
+
+
+def find_regressions(
+    df,
+    window=30,
+    z_threshold=4.0,
+    t_threshold=5.0,
+    min_rel_change=0.05,
+    recent_nights=7,
+    higher_is_better=False,
+    noise=None,
+):
+    """
+    Find the benchmarks that regressed in a run type's results history.
+
+    A benchmark is flagged when its latest result is more than z_threshold
+    robust standard deviations worse than its baseline, or when a change
+    point with a t-statistic above t_threshold made it worse within the last
+    recent_nights nights. Either way the change must also exceed
+    min_rel_change, so statistically significant but negligible shifts are
+    ignored.
+
+    Parameters:
+    - df (DataFrame): results history with a 'date' column, as read from the results store.
+    - window (int): number of prior nights in the rolling baseline.
+    - z_threshold (float): robust z-score above which the latest result is a regression.
+    - t_threshold (float): change point t-statistic above which a shift is significant.
+    - min_rel_change (float): minimum relative change to report.
+    - recent_nights (int): how far back a change point is still reported.
+    - higher_is_better (bool): results are rates rather than times.
+    - noise (DataFrame): measured standard error of the results, see
+      robust_zscores().
+
+    Returns:
+    list: one dict per regressed benchmark, worst first.
+    """
+    values = history_to_values(df)
+    if values.empty:
+        return []
+    sign = -1.0 if higher_is_better else 1.0
+
+    zscores, baseline = robust_zscores(values, window=window, noise=noise)
+    last_z = sign * zscores.iloc[-1]
+    last_value = values.iloc[-1]
+    last_baseline = baseline.iloc[-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        last_change = sign * (last_value - last_baseline) / last_baseline.abs()
+    latest_flag = (last_z > z_threshold) & (last_change > min_rel_change)
+
+    shifts = change_points(values)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shift_change = sign * (shifts["after"] - shifts["before"]) / shifts["before"].abs()
+    recent_dates = set(values.index[-recent_nights:])
+    shift_flag = (
+        (sign * shifts["t_stat"] > t_threshold)
+        & (shift_change > min_rel_change)
+        & shifts["date"].isin(recent_dates)
+    )
+
+    regressions = []
+    for name in values.columns[latest_flag.to_numpy() | shift_flag.to_numpy()]:
+        entry = {
+            "benchmark": name,
+            "date": values.index[-1],
+            "value": _to_json_float(last_value[name]),
+            "baseline": _to_json_float(last_baseline[name]),
+            "change_pct": _to_json_float(100 * last_change[name]),
+            "zscore": _to_json_float(sign * zscores.iloc[-1][name]),
+            "change_point": None,
+        }
+        if shift_flag[name]:
+            entry["change_point"] = {
+                "date": shifts.at[name, "date"],
+                "before": _to_json_float(shifts.at[name, "before"]),
+                "after": _to_json_float(shifts.at[name, "after"]),
+                "change_pct": _to_json_float(100 * shift_change[name]),
+                "t_stat": _to_json_float(shifts.at[name, "t_stat"]),
+            }
+        regressions.append(entry)
+
+    def severity(entry):
+        changes = [entry["change_pct"]]
+        if entry["change_point"]:
+            changes.append(entry["change_point"]["change_pct"])
+        return max((c for c in changes if c is not None), default=0)
+
+    return sorted(regressions, key=severity, reverse=True)
+
+
+def _to_json_float(value):
+    return None if pd.isna(value) else round(float(value), 6)
+
+
+def regressions_to_html(regressions):
+    """
+    Return highlighted HTML table rows summarizing regressions, meant to be
+    placed at the top of a benchmark results table.
+    """
+    if not regressions:
+        return ""
+    style = 'style="background-color:#f8d7da"'
+    rows = [f'<tr {style}><td colspan="2"><b>{len(regressions)} possible '
+            f'regression(s) detected</b></td></tr>\n']
+    for entry in regressions:
+        details = []
+        if entry["change_pct"] is not None and entry["zscore"] is not None:
+            details.append(f'latest {entry["value"]} vs baseline {entry["baseline"]} '
+                           f'({entry["change_pct"]:+.1f}%, z={entry["zscore"]:.1f})')
+        shift = entry["change_point"]
+        if shift is not None:
+            details.append(f'shift on {shift["date"]}: {shift["before"]:.4g} -> '
+                           f'{shift["after"]:.4g} ({shift["change_pct"]:+.1f}%)')
+        rows.append(f'<tr {style}><td><text>{entry["benchmark"]}</text></td>'
+                    f'<td><text>{"<br>".join(details)}</text></td></tr>\n')
+    return "".join(rows)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import benchmark_results
+    import results_store
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--store-dir", required=True,
+                    help="Results store directory written by record-benchmarks.py.")
+    ap.add_argument("--run-type", required=True, help="Run type to check, eg. 2-GPU.")
+    ap.add_argument("--output-file", default=None,
+                    help="Write the regressions as JSON here instead of stdout.")
+    ap.add_argument("--higher-is-better", action="store_true",
+                    help="Results are rates rather than times.")
+    args = ap.parse_args()
+
+    stats_df = results_store.read_stats(args.store_dir, args.run_type,
+                                        columns=["median", "stddev", "rounds"])
+    regressions = find_regressions(
+        results_store.read_results(args.store_dir, args.run_type),
+        higher_is_better=args.higher_is_better,
+        noise=benchmark_results.standard_errors(stats_df),
+    )
+    output = json.dumps(regressions, indent=2)
+    if args.output_file:
+        with open(args.output_file, "w") as out_file:
+            out_file.write(output)
+    else:
+        print(output)
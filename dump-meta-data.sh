@@ -18,7 +18,7 @@ set -eu -o pipefail
 RAPIDS_MG_TOOLS_DIR=${RAPIDS_MG_TOOLS_DIR:-$(cd $(dirname ${BASH_SOURCE[0]}) && pwd)}
 source ${RAPIDS_MG_TOOLS_DIR}/script-env.sh
 
-param_vals=$(python3 ${RAPIDS_MG_TOOLS_DIR}/getopt.py $0 "packages:str,from-conda,from-pip" "$@")
+param_vals=$(getopt_parse $0 "packages:str,from-conda,from-pip" "$@")
 eval $param_vals
 
 if (( ($from_conda || $from_pip) == 0 )); then
@@ -29,24 +29,12 @@ elif (( ($from_conda && $from_pip) == 1 )); then
     exit 1
 fi
 
-package_list=$(echo $packages | sed 's/,/ /g')
+# The packages are enumerated once (and cached) by env_metadata.py, instead
+# of running conda list or pip list for each package
 if (( $from_conda == 1 )); then
-    for package in $package_list; do
-        PACKAGE=$(echo $package | sed 's/[a-z]/\U&/g')
-        # output format is: name version build channel
-        conda_output=$(conda list | grep "^${package}")
-        echo "${PACKAGE}_VERSION=$(echo $conda_output | awk '{print $2}')"
-        echo "${PACKAGE}_BUILD=$(echo $conda_output | awk '{print $3}')"
-        echo "${PACKAGE}_CHANNEL=$(echo $conda_output | awk '{print $4}')"
-    done
+    python3 ${RAPIDS_MG_TOOLS_DIR}/env_metadata.py --packages=$packages --from-conda
 elif (( $from_pip == 1 )); then
-    for package in $package_list; do
-        pip_list_output=$(pip list | grep "^${package}" | head -n 1)
-        pip_pkg_name=$(echo $pip_list_output | awk '{print $1}')
-        pip_pkg_ver=$(echo $pip_list_output | awk '{print $2}')
-        PACKAGE=$(echo $pip_pkg_name | sed 's/[a-z]/\U&/g')
-        echo "${PACKAGE}_VERSION=${pip_pkg_ver}"
-    done
+    python3 ${RAPIDS_MG_TOOLS_DIR}/env_metadata.py --packages=$packages --from-pip
 # else
 # TODO: can add --from-source option here
 fi
@@ -0,0 +1,485 @@
+# Copyright (c) 2026, NVIDIA CORPORATION.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Environment metadata of a benchmark run.
+
+The installed packages of an environment are enumerated once, without
+running conda or pip: conda packages are read from the conda-meta directory
+of the environment prefix, and Python packages from their installed
+metadata. The list is cached in $XDG_CACHE_HOME/rapids-mg-tools, keyed by
+the prefix and the modification time of those directories, so it is only
+enumerated again after packages are installed or removed.
+
+The hardware and software fingerprint of every node of a cluster (OS,
+CPUs, GPUs, driver and CUDA versions, Python and installed packages) is
+collected in parallel with a single client.run() on one worker per node:
+
+{"collected": "2026-01-01T03:00:00+00:00",
+ "hash": <hash of the node fingerprints, without their host names>,
+ "summary": {"os": ..., "gpus": ..., "packages": {name: version}, ...},
+ "nodes": {host: fingerprint}}
+
+where summary joins the values that differ between nodes with " / ".
+record-benchmarks.py stores the fingerprint of each night with its results
+and reports the nights the environment changed.
+
+Example usage, after a benchmark run:
+
+python env_metadata.py --scheduler-file=$SCHEDULER_FILE \
+                       --output-file=$RESULTS_DIR/benchmarks/8-GPU/environment.json
+
+or, like dump-meta-data.sh always has, to print the version of packages as
+<PKG>_VERSION= lines (and <PKG>_BUILD=/<PKG>_CHANNEL= lines for conda):
+
+python env_metadata.py --packages=cudf,cugraph --from-conda
+"""
+
+from datetime import datetime, timezone
+import hashlib
+from importlib import metadata as importlib_metadata
+import json
+import os
+from pathlib import Path
+import platform
+import socket
+import sys
+
+try:
+    import pynvml
+except ImportError:
+    pynvml = None
+
+
+ENVIRONMENT_FILE_NAME = "environment.json"
+CACHE_VERSION = 1
+# fingerprint fields summarized for the report, in the order they are shown
+SUMMARY_KEYS = ("os", "cpu_model", "gpus", "driver_version", "cuda_driver_version",
+                "cuda_version", "python")
+MAX_CHANGES_SHOWN = 8
+
+
+def _cache_dir():
+    return Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "rapids-mg-tools"
+
+
+def env_prefix():
+    """
+    Return the prefix of the active environment, the conda one if any.
+    """
+    return os.environ.get("CONDA_PREFIX") or sys.prefix
+
+
+def _python_paths(prefix):
+    if Path(prefix).resolve() == Path(sys.prefix).resolve():
+        paths = [Path(p) for p in sys.path if p]
+    else:
+        paths = list(Path(prefix).glob("lib/python*/site-packages"))
+    return sorted({str(p) for p in paths
+                   if p.is_dir() and p.name in ("site-packages", "dist-packages")})
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _conda_channel(channel):
+    # eg. https://conda.anaconda.org/conda-forge/linux-64 is shown as conda-forge
+    channel = (channel or "").rstrip("/")
+    for prefix in ("https://conda.anaconda.org/", "https://repo.anaconda.com/pkgs/"):
+        if channel.startswith(prefix):
+            channel = channel[len(prefix):]
+    parts = channel.split("/")
+    if len(parts) > 1 and (parts[-1] == "noarch" or "-" in parts[-1]):
+        parts = parts[:-1]
+    return "/".join(parts)
+
+
+def _normalize(name):
+    return name.lower().replace("_", "-")
+
+
+def _read_packages(prefix):
+    conda = {}
+    for meta_file in sorted((Path(prefix) / "conda-meta").glob("*.json")):
+        try:
+            meta = json.loads(meta_file.read_text())
+            conda[meta["name"]] = {"name": meta["name"], "version": meta["version"],
+                                   "build": meta.get("build", ""),
+                                   "channel": _conda_channel(meta.get("channel"))}
+        except (OSError, ValueError, KeyError):
+            continue  # eg. a package being installed
+    python = {}
+    for dist in importlib_metadata.distributions(path=_python_paths(prefix)):
+        name = dist.metadata["Name"]
+        if name and _normalize(name) not in python:
+            python[_normalize(name)] = {"name": name, "version": dist.version}
+    # like conda list, packages installed by pip are listed with the conda ones
+    conda_names = {_normalize(name) for name in conda}
+    for (normalized, package) in python.items():
+        if normalized not in conda_names:
+            conda[package["name"]] = {**package, "build": "pypi_0", "channel": "pypi"}
+    return {
+        "conda": sorted(conda.values(), key=lambda p: p["name"]),
+        "python": sorted(python.values(), key=lambda p: p["name"].lower()),
+    }
+
+
+def installed_packages(prefix=None, use_cache=True):
+    """
+    Return the packages installed in the environment at prefix (the active
+    one by default).
+
+    Returns:
+    dict: {"conda": the packages conda list shows, as dicts of name,
+    version, build and channel sorted by name, "python": the packages pip
+    list shows, as dicts of name and version sorted by name}.
+    """
+    prefix = str(prefix or env_prefix())
+    key = [CACHE_VERSION, prefix, _mtime(Path(prefix) / "conda-meta")]
+    key += [(path, _mtime(path)) for path in _python_paths(prefix)]
+    cache_file = _cache_dir() / f"packages-{hashlib.sha1(prefix.encode()).hexdigest()[:16]}.json"
+    if use_cache:
+        try:
+            cached = json.loads(cache_file.read_text())
+            if cached["key"] == json.loads(json.dumps(key)):
+                return cached["packages"]
+        except (OSError, ValueError, KeyError):
+            pass
+    packages = _read_packages(prefix)
+    if use_cache:
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+            tmp_file.write_text(json.dumps({"key": key, "packages": packages}))
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            pass  # eg. a read-only home directory, the cache is optional
+    return packages
+
+
+def package_version_lines(package_names, from_conda, prefix=None):
+    """
+    Return the <PKG>_VERSION= lines printed by dump-meta-data.sh, and the
+    <PKG>_BUILD= and <PKG>_CHANNEL= lines with from_conda, for the first
+    package whose name starts with each of package_names.
+    """
+    packages = installed_packages(prefix)["conda" if from_conda else "python"]
+    lines = []
+    for package_name in package_names:
+        match = next((p for p in packages if p["name"].startswith(package_name)), None)
+        if from_conda:
+            upper = package_name.upper()
+            lines.append(f"{upper}_VERSION={match['version'] if match else ''}")
+            lines.append(f"{upper}_BUILD={match['build'] if match else ''}")
+            lines.append(f"{upper}_CHANNEL={match['channel'] if match else ''}")
+        else:
+            # named like pip list names the package
+            upper = match["name"].upper() if match else ""
+            lines.append(f"{upper}_VERSION={match['version'] if match else ''}")
+    return lines
+
+
+def _cpu_model():
+    try:
+        with open("/proc/cpuinfo") as cpuinfo:
+            for line in cpuinfo:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or None
+
+
+def _host_memory():
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def _gpu_info():
+    info = {"driver_version": None, "cuda_driver_version": None, "gpus": []}
+    if pynvml is None:
+        return info
+    try:
+        pynvml.nvmlInit()
+    except pynvml.NVMLError:
+        return info
+    try:
+        driver = pynvml.nvmlSystemGetDriverVersion()
+        info["driver_version"] = driver.decode() if isinstance(driver, bytes) else driver
+        cuda = pynvml.nvmlSystemGetCudaDriverVersion()
+        info["cuda_driver_version"] = f"{cuda // 1000}.{cuda % 1000 // 10}"
+        for i in range(pynvml.nvmlDeviceGetCount()):
+            handle = pynvml.nvmlDeviceGetHandleByIndex(i)
+            name = pynvml.nvmlDeviceGetName(handle)
+            info["gpus"].append({
+                "name": name.decode() if isinstance(name, bytes) else name,
+                "memory": pynvml.nvmlDeviceGetMemoryInfo(handle).total,
+            })
+    except pynvml.NVMLError:
+        pass
+    finally:
+        pynvml.nvmlShutdown()
+    return info
+
+
+def _cuda_version(packages):
+    """
+    Return the version of the CUDA toolkit of the environment, from its
+    cuda-version package or the version.json of the CUDA installation.
+    """
+    for package in packages["conda"]:
+        if package["name"] == "cuda-version":
+            return package["version"]
+    for cuda_home in (os.environ.get("CUDA_HOME"), os.environ.get("CUDA_PATH"), "/usr/local/cuda"):
+        if not cuda_home:
+            continue
+        try:
+            versions = json.loads((Path(cuda_home) / "version.json").read_text())
+            return versions["cuda"]["version"]
+        except (OSError, ValueError, KeyError):
+            continue
+    return None
+
+
+def node_fingerprint():
+    """
+    Return the hardware and software fingerprint of this node and of the
+    environment of this process.
+    """
+    uname = platform.uname()
+    packages = installed_packages()
+    package_versions = {p["name"]: p["version"] for p in packages["conda"]}
+    return {
+        "host": socket.gethostname(),
+        "os": f"{uname.system} {uname.release}",
+        "machine": uname.machine,
+        "cpu_model": _cpu_model(),
+        "cpus": os.cpu_count(),
+        "host_memory": _host_memory(),
+        **_gpu_info(),
+        "cuda_version": _cuda_version(packages),
+        "python": platform.python_version(),
+        "prefix": env_prefix(),
+        "packages": package_versions,
+        "packages_hash": hashlib.sha256(
+            json.dumps(package_versions, sort_keys=True).encode()).hexdigest()[:16],
+    }
+
+
+def _gpus_summary(gpus):
+    if not gpus:
+        return None
+    names = sorted({f"{gpu['name']} {round(gpu['memory'] / 2**30)}GiB" for gpu in gpus})
+    return f"{len(gpus)}x {', '.join(names)}"
+
+
+def _join(values):
+    values = sorted({str(v) for v in values if v is not None})
+    return " / ".join(values) if values else None
+
+
+def summarize(nodes):
+    """
+    Summarize node fingerprints, joining values that differ between nodes
+    with " / ".
+    """
+    fingerprints = list(nodes.values())
+    summary = {}
+    for key in SUMMARY_KEYS:
+        if key == "gpus":
+            summary[key] = _join(_gpus_summary(fp["gpus"]) for fp in fingerprints)
+        else:
+            summary[key] = _join(fp.get(key) for fp in fingerprints)
+    names = sorted({name for fp in fingerprints for name in fp["packages"]})
+    summary["packages"] = {name: _join(fp["packages"].get(name) for fp in fingerprints)
+                           for name in names}
+    return summary
+
+
+def fingerprint_hash(nodes):
+    """
+    Return a hash of node fingerprints which only changes with the hardware
+    and software of the nodes, not with which nodes were used.
+    """
+    distinct = sorted({json.dumps({k: v for (k, v) in fp.items() if k not in ("host", "prefix")},
+                                  sort_keys=True)
+                       for fp in nodes.values()})
+    return hashlib.sha256("\n".join(distinct).encode()).hexdigest()[:16]
+
+
+def _fingerprint(nodes):
+    return {
+        "collected": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "hash": fingerprint_hash(nodes),
+        "summary": summarize(nodes),
+        "nodes": nodes,
+    }
+
+
+def local_fingerprint():
+    """
+    Return the fingerprint of this node alone, as a cluster of one.
+    """
+    fp = node_fingerprint()
+    return _fingerprint({fp["host"]: fp})
+
+
+def cluster_fingerprint(client):
+    """
+    Return the fingerprint of the nodes of the cluster of client, collected
+    in parallel on one worker per node.
+    """
+    workers = client.scheduler_info(n_workers=-1)["workers"]
+    one_per_host = {}
+    for (address, info) in workers.items():
+        one_per_host.setdefault(info.get("host", address), address)
+    results = client.run(node_fingerprint, workers=list(one_per_host.values()),
+                         on_error="return")
+    nodes = {}
+    for (address, fp) in results.items():
+        if isinstance(fp, dict):
+            nodes[fp["host"]] = fp
+        else:
+            print(f"env_metadata.py - no fingerprint from {address}: {fp}", file=sys.stderr)
+    return _fingerprint(nodes)
+
+
+def read_fingerprint(run_dir):
+    """
+    Return the fingerprint written to run_dir, or None if there is none.
+    """
+    try:
+        return json.loads((Path(run_dir) / ENVIRONMENT_FILE_NAME).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def diff_summaries(old, new):
+    """
+    Return the differences between two fingerprint summaries, as a list of
+    strings like "cudf 24.10.00 -> 24.12.00".
+    """
+    changes = []
+    for key in SUMMARY_KEYS:
+        if old.get(key) != new.get(key):
+            changes.append(f"{key} {old.get(key)} -> {new.get(key)}")
+    (old_packages, new_packages) = (old.get("packages", {}), new.get("packages", {}))
+    for name in sorted(set(old_packages) | set(new_packages), key=str.lower):
+        (before, after) = (old_packages.get(name), new_packages.get(name))
+        if before == after:
+            continue
+        if before is None:
+            changes.append(f"{name} {after} added")
+        elif after is None:
+            changes.append(f"{name} {before} removed")
+        else:
+            changes.append(f"{name} {before} -> {after}")
+    return changes
+
+
+def environment_changes(history):
+    """
+    Return the nights the environment changed.
+
+    Parameters:
+    - history (list): (run date, fingerprint) tuples, oldest first.
+
+    Returns:
+    list: {"date", "hash", "changes"} dicts, oldest first.
+    """
+    changes = []
+    previous = None
+    for (run_date, fingerprint) in history:
+        if previous is not None and fingerprint["hash"] != previous["hash"]:
+            changes.append({
+                "date": run_date,
+                "hash": fingerprint["hash"],
+                "changes": diff_summaries(previous["summary"], fingerprint["summary"]),
+            })
+        previous = fingerprint
+    return changes
+
+
+def changes_to_html(changes, regressions=(), last_n=5):
+    """
+    Return HTML table rows listing the last_n environment changes, naming the
+    regressions (see detect_regressions.py) that shifted, or were flagged, the
+    same night, meant to be placed at the top of a benchmark results table.
+    """
+    if not changes:
+        return ""
+    style = 'style="background-color:#e2e3f8"'
+    rows = []
+    for change in changes[-last_n:][::-1]:
+        details = change["changes"][:MAX_CHANGES_SHOWN]
+        if len(change["changes"]) > MAX_CHANGES_SHOWN:
+            details.append(f'and {len(change["changes"]) - MAX_CHANGES_SHOWN} more')
+        # the night a regression shifted, or was first seen
+        coincident = [r["benchmark"] for r in regressions
+                      if (r["change_point"] or r)["date"] == change["date"]]
+        if coincident:
+            details.append(f'<b>coincides with the regression of {", ".join(coincident)}</b>')
+        rows.append(f'<tr {style}><td><text>environment changed on {change["date"]}</text></td>'
+                    f'<td><text>{"<br>".join(details) or "(no summarized change)"}</text></td></tr>\n')
+    return "".join(rows)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--packages", default=None,
+                    help="Comma separated package names (or name prefixes) to "
+                    "print the version of, as <PKG>_VERSION= lines.")
+    source = ap.add_mutually_exclusive_group()
+    source.add_argument("--from-conda", action="store_true",
+                        help="With --packages, print the conda version, build "
+                        "and channel of the packages.")
+    source.add_argument("--from-pip", action="store_true",
+                        help="With --packages, print the version of the Python "
+                        "packages, named like pip list names them.")
+    ap.add_argument("--prefix", default=None,
+                    help="Environment prefix to read the packages of, defaults "
+                    "to the active environment.")
+    ap.add_argument("--scheduler-file", default=None,
+                    help="Collect the fingerprint of every node of the cluster "
+                    "of this scheduler file, instead of this node only.")
+    ap.add_argument("--output-file", default=None,
+                    help="Write the fingerprint to this file instead of stdout.")
+    args = ap.parse_args()
+
+    if args.packages is not None:
+        if not (args.from_conda or args.from_pip):
+            ap.error("--packages requires one of --from-conda or --from-pip")
+        names = [name for name in args.packages.split(",") if name]
+        print("\n".join(package_version_lines(names, args.from_conda, args.prefix)))
+        sys.exit(0)
+
+    if args.scheduler_file:
+        from dask.distributed import Client
+        with Client(scheduler_file=args.scheduler_file) as client:
+            fingerprint = cluster_fingerprint(client)
+    else:
+        fingerprint = local_fingerprint()
+
+    contents = json.dumps(fingerprint, indent=2)
+    if args.output_file:
+        Path(args.output_file).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output_file).write_text(contents + "\n")
+    else:
+        print(contents)
@@ -94,27 +94,112 @@ unset_tee () {
 }
 
 # Function for running a command that gets killed after a specific timeout and
-# logs a timeout message.
+# logs a timeout message. The command is also stopped early, like on a
+# timeout, if start_log_watcher found a fatal error in the dask logs.
 LAST_EXITCODE=0
+HANDLE_TIMEOUT_PID=""
 handle_timeout () {
     _seconds=$1
-    eval "timeout --signal=2 --kill-after=60 $*"
+    # run in the background and wait, since a trapped signal (see
+    # start_log_watcher) interrupts wait but not a foreground command
+    HANDLE_TIMEOUT_INTERRUPTED=0
+    eval "timeout --signal=2 --kill-after=60 $* &"
+    HANDLE_TIMEOUT_PID=$!
+    wait $HANDLE_TIMEOUT_PID
     LAST_EXITCODE=$?
-    if (( $LAST_EXITCODE == 124 )); then
+    if (( $HANDLE_TIMEOUT_INTERRUPTED == 1 )); then
+        # wait again for the exit code of the command itself
+        wait $HANDLE_TIMEOUT_PID
+        _exitcode=$?
+        if (( $_exitcode != 127 )); then
+            LAST_EXITCODE=$_exitcode
+        fi
+    fi
+    HANDLE_TIMEOUT_PID=""
+    if (( $LOG_WATCHER_FATAL == 1 )); then
+        logger "ERROR: command stopped after a fatal error in the dask logs, see ${LOG_WATCHER_LOGS_DIR}/log-summary.json"
+    elif (( $LAST_EXITCODE == 124 )); then
         logger "ERROR: command timed out after ${_seconds} seconds"
     elif (( $LAST_EXITCODE == 137 )); then
         logger "ERROR: command timed out after ${_seconds} seconds, and had to be killed with signal 9"
     fi
 }
 
+# Start log_watcher.py in the background on the dask logs in $1 (defaults
+# to $LOGS_DIR). On the first fatal error (worker OOM, RMM or UCX failure,
+# ...) it sends SIGUSR1 to this script, which stops the command run by
+# handle_timeout, if any, and sets LOG_WATCHER_FATAL=1 for the script to
+# check. Call stop_log_watcher when the run is over to write the post-mortem
+# summary of each node to $1/log-summary.json.
+LOG_WATCHER_FATAL=0
+LOG_WATCHER_PID=""
+start_log_watcher () {
+    LOG_WATCHER_LOGS_DIR=${1:-$LOGS_DIR}
+    LOG_WATCHER_FATAL=0
+    mkdir -p $LOG_WATCHER_LOGS_DIR
+    trap 'LOG_WATCHER_FATAL=1
+          if [[ -n "$HANDLE_TIMEOUT_PID" ]]; then
+              HANDLE_TIMEOUT_INTERRUPTED=1
+              kill -INT $HANDLE_TIMEOUT_PID 2> /dev/null
+          fi' USR1
+    python3 ${RAPIDS_MG_TOOLS_DIR}/log_watcher.py --logs-dir=$LOG_WATCHER_LOGS_DIR \
+            --signal-pid=$$ --signal=USR1 --watch-pid=$$ \
+            >> ${LOG_WATCHER_LOGS_DIR}/log_watcher.txt 2>&1 &
+    LOG_WATCHER_PID=$!
+}
+
+stop_log_watcher () {
+    if [[ -n "$LOG_WATCHER_PID" ]]; then
+        kill -TERM $LOG_WATCHER_PID 2> /dev/null
+        wait $LOG_WATCHER_PID
+        LOG_WATCHER_PID=""
+    fi
+    trap - USR1
+}
+
+# Start the cluster_pool.py daemon in the background, keeping a warm
+# $CLUSTER_CONFIG_TYPE cluster on this node for successive sessions until it
+# has been idle for $CLUSTER_POOL_IDLE_TIMEOUT seconds. Its state, logs and
+# scheduler file are in $1 (defaults to $CLUSTER_POOL_DIR). Does nothing
+# if a pool is already running there.
+start_cluster_pool () {
+    _pool_dir=${1:-$CLUSTER_POOL_DIR}
+    mkdir -p $_pool_dir
+    nohup python3 ${RAPIDS_MG_TOOLS_DIR}/cluster_pool.py serve --pool-dir=$_pool_dir \
+          --cluster-config-type=${CLUSTER_CONFIG_TYPE:-TCP} \
+          --scheduler-file=${_pool_dir}/scheduler.json --logs-dir=${_pool_dir}/logs \
+          --idle-timeout=$CLUSTER_POOL_IDLE_TIMEOUT \
+          >> ${_pool_dir}/cluster_pool.txt 2>&1 &
+}
+
+# Lease the warm cluster of the pool in $1 (defaults to $CLUSTER_POOL_DIR),
+# waiting until it is free, and set SCHEDULER_FILE to its scheduler file.
+# Returns 1 if no pool is running. Call release_warm_cluster when done, the
+# cluster is otherwise only handed to the next session once this script
+# exits.
+CLUSTER_POOL_LEASE=""
+acquire_warm_cluster () {
+    CLUSTER_POOL_LEASE_DIR=${1:-$CLUSTER_POOL_DIR}
+    _lease=$(python3 ${RAPIDS_MG_TOOLS_DIR}/cluster_pool.py acquire \
+                     --pool-dir=$CLUSTER_POOL_LEASE_DIR --holder-pid=$$) || return 1
+    read CLUSTER_POOL_LEASE SCHEDULER_FILE <<< "$_lease"
+    export SCHEDULER_FILE
+}
+
+release_warm_cluster () {
+    if [[ -n "$CLUSTER_POOL_LEASE" ]]; then
+        python3 ${RAPIDS_MG_TOOLS_DIR}/cluster_pool.py release \
+                --pool-dir=$CLUSTER_POOL_LEASE_DIR --lease-id=$CLUSTER_POOL_LEASE
+        CLUSTER_POOL_LEASE=""
+    fi
+}
+
+# Wait for the Slurm jobs whose ids are given as arguments to leave the
+# queue, then print their final state and exit code. The queue is queried
+# for all the jobs at once, less often the longer they run (see
+# slurm_jobs.py).
 waitForSlurmJobsToComplete () {
-    ids=$*
-    jobs=$(python -c "print(\",\".join(\"$ids\".split()))") # make a comma-separated list
-    jobsInQueue=$(squeue --noheader --jobs=$jobs)
-    while [[ $jobsInQueue != "" ]]; do
-        sleep 2
-        jobsInQueue=$(squeue --noheader --jobs=$jobs)
-    done
+    python3 ${RAPIDS_MG_TOOLS_DIR}/slurm_jobs.py $*
 }
 
 # Clones repo from URL specified by $1 to directory $2
@@ -154,22 +239,75 @@ keep_last_n_files () {
     fi
 }
 
+# Make $2 a copy of directory $1 whose files are hardlinks to those in $1,
+# falling back to a real copy where hardlinks are not possible (eg. across
+# filesystems). Writers must replace files, not modify them in place, or
+# the change shows up in both trees (see results_store.atomic_write()).
+link_tree () {
+    src=$1
+    dest=$2
+    if ! cp -al $src $dest 2> /dev/null; then
+        rm -rf $dest
+        cp -r $src $dest
+    fi
+}
+
+# Compact the results store of the latest run in results root dir $1 and
+# keep only its $2 most recent dated run directories. Unlike
+# keep_last_n_files, the directory "latest" points to is never removed.
+compact_results_history () {
+    python3 ${RAPIDS_MG_TOOLS_DIR}/results_history.py --results-root-dir=$1 --keep-last=$2
+}
+
 wait_for_file () {
     timeout=$1
     file_name=$2
 
     logger "waiting for file: $file_name"
-    i=0
-    while (( i < $timeout )); do
+    deadline=$(( SECONDS + timeout ))
+    while (( SECONDS < deadline )); do
 	if [ -e $file_name ]; then
 	    logger "file $file_name exists"
 	    break
 	fi
-	sleep 1
-	((i++))
+	sleep 0.1
     done
     if [ ! -e $file_name ]; then
 	logger "timed out waiting for file: $file_name"
 	false
     fi
 }
+
+# Parse options like getopt.py, printing the same string to be eval'd:
+#   param_vals=$(getopt_parse $0 "packages:str,from-conda,from-pip" "$@")
+#   eval $param_vals
+# The bash parser getopt.py generates for the spec is cached in
+# $GETOPT_CACHE_DIR, keyed by a hash of the spec, so Python is only started
+# the first time a spec is seen (or after getopt.py changes). Specs that
+# cannot be compiled are parsed by getopt.py on every call.
+getopt_parse () {
+    local prog_name=$1
+    local opt_string=$2
+    shift 2
+    local getopt_py=${RAPIDS_MG_TOOLS_DIR}/getopt.py
+    local cache_dir=${GETOPT_CACHE_DIR:-${XDG_CACHE_HOME:-$HOME/.cache}/rapids-mg-tools/getopt}
+    local spec_hash=$(md5sum <<< "$opt_string")
+    local parser_file=${cache_dir}/${spec_hash%% *}.sh
+    local tmp_file
+
+    if [[ ! -s $parser_file || $getopt_py -nt $parser_file ]]; then
+        # write to a temp file first so concurrent callers never source a
+        # partially written parser
+        if mkdir -p $cache_dir 2> /dev/null \
+                && tmp_file=$(mktemp ${parser_file}.XXXXXX 2> /dev/null) \
+                && python3 $getopt_py --compile "$opt_string" > $tmp_file; then
+            mv -f $tmp_file $parser_file
+        else
+            [[ -n $tmp_file ]] && rm -f $tmp_file
+            python3 $getopt_py "$prog_name" "$opt_string" "$@"
+            return
+        fi
+    fi
+    source $parser_file
+    getopt_compiled "$prog_name" "$@"
+}
@@ -21,10 +21,21 @@ echo $foo_bar  # prints www
 echo $bar  # prints 0
 echo $boo  # prints 1
 echo $baz  # prints 33
+
+Scripts called many times should use getopt_parse from functions.sh instead,
+which takes the same arguments and gives the same output:
+
+param_vals=$(getopt_parse $0 "foo-bar:,boo,bar,baz:int" "$@")
+eval $param_vals
+
+The first time a spec is seen, getopt_parse runs "python getopt.py --compile
+<spec>" to generate a pure bash parser function for it, and caches it on disk
+keyed by a hash of the spec, so later calls do not start Python at all.
 """
 
 import builtins
 from argparse import ArgumentParser
+import shlex
 
 
 class StderrArgumentParser(ArgumentParser):
@@ -35,17 +46,12 @@ class StderrArgumentParser(ArgumentParser):
         super(StderrArgumentParser, self)._print_message(message)
 
 
-def getopt_to_argparse(prog_name, opt_parse_string, options_list):
+def parse_opt_string(opt_parse_string):
     """
-    Parse options_list using an ArgumentParser created with opt_parse_string,
-    in the style of getopts.
-
-    Return an argparse.Namespace object as normally returned by
-    parse_args(). Any errors or help output will be printed to stderr and None
-    is returned instead.
+    Parse opt_parse_string into a list of (name, kind, type name) tuples, in
+    order, where kind is "flag", "required" or "optional".
     """
-    arg_parser = StderrArgumentParser(prog=prog_name)
-
+    options = []
     for opt_desc in opt_parse_string.split(","):
         if opt_desc == "":
             raise RuntimeError(f"invalid option string: {opt_parse_string}")
@@ -54,31 +60,247 @@ def getopt_to_argparse(prog_name, opt_parse_string, options_list):
         opt_desc_len = len(opt_desc)
         # option with no arg: "name"
         if opt_desc_len == 1:
-            name = f"--{opt_desc[0]}"
-            arg_parser.add_argument(name, action="store_const", const=1, default=0)
+            options.append((opt_desc[0], "flag", None))
 
         # required arg: "name:type" or "name:"
         elif opt_desc_len == 2:
-            name = f"--{opt_desc[0]}"
-            opt_type = getattr(builtins, opt_desc[1] or "str")
-            arg_parser.add_argument(name, type=opt_type, required=True)
+            options.append((opt_desc[0], "required", opt_desc[1] or "str"))
 
         # optional arg: "name::type" or "name::"
         elif (opt_desc_len == 3) and (opt_desc[1] == ""):
-            name = f"--{opt_desc[0]}"
-            opt_type = getattr(builtins, opt_desc[2] or "str")
-            arg_parser.add_argument(name, type=opt_type, required=False)
+            options.append((opt_desc[0], "optional", opt_desc[2] or "str"))
 
         else:
             raise RuntimeError(f"invalid option string: {opt_parse_string}")
+    return options
+
+
+def _create_parser(prog_name, options):
+    arg_parser = StderrArgumentParser(prog=prog_name)
+    for (name, kind, type_name) in options:
+        if kind == "flag":
+            arg_parser.add_argument(f"--{name}", action="store_const", const=1, default=0)
+        else:
+            arg_parser.add_argument(f"--{name}", type=getattr(builtins, type_name),
+                                    required=(kind == "required"))
+    return arg_parser
+
+
+def getopt_to_argparse(prog_name, opt_parse_string, options_list):
+    """
+    Parse options_list using an ArgumentParser created with opt_parse_string,
+    in the style of getopts.
+
+    Return an argparse.Namespace object as normally returned by
+    parse_args(). Any errors or help output will be printed to stderr and None
+    is returned instead.
+    """
+    arg_parser = _create_parser(prog_name, parse_opt_string(opt_parse_string))
     try:
         return arg_parser.parse_args(options_list)
     except SystemExit as err:
         return None
 
 
+def format_options(argparse_obj):
+    """
+    Return the parsed options as a string to be eval'd by bash.
+    """
+    empty = '""'
+    output_strs = [f"{option}={empty if val is None else val}"
+                   for (option, val) in vars(argparse_obj).items()]
+    return ";".join(output_strs)
+
+
+# Placeholder for the program name in the generated usage and help text.
+_PROG_PLACEHOLDER = "@PROG@"
+
+# Generated parser for one spec. It follows the argparse rules used by
+# getopt_to_argparse(): unambiguous prefixes of option names are accepted,
+# values are given as "--name=value" or "--name value", where value must not
+# look like an option, the last of repeated options wins, ints are validated
+# and normalized like int() does, and anything that is not an option (or a
+# value) is an error. Errors and help go to stderr and return 1.
+_BASH_PARSER_TEMPLATE = r"""# Generated by getopt.py --compile for the spec: {opt_string}
+{function_name}_is_value () {{
+    # Mirrors ArgumentParser._parse_optional(): true if $1 is not an option.
+    local arg=$1 opt
+    case $arg in
+        ''|[!-]*|-) return 0 ;;
+        --) return 1 ;;
+        --*)
+            for opt in "${{opts[@]}}" --help; do
+                [[ $opt == "${{arg%%=*}}"* ]] && return 1
+            done ;;
+        -h*) return 1 ;;
+    esac
+    [[ $arg =~ ^-[0-9]+$ || $arg =~ ^-[0-9]*\.[0-9]+$ || $arg == *" "* ]]
+}}
+
+{function_name} () {{
+    local prog=$1
+    shift
+    local opts=({opts})
+    local -A kinds=({kinds})
+    local -A types=({types})
+    local -A values=()
+    local usage={usage}
+    local help={help}
+    local arg opt match matches has_val val sign digits name missing=() output=()
+    usage=${{usage//{placeholder}/$prog}}
+
+    while (( $# > 0 )); do
+        arg=$1
+        shift
+        if [[ $arg == -h ]]; then
+            printf '%s' "${{help//{placeholder}/$prog}}" >&2
+            return 1
+        elif [[ $arg != --?* ]]; then
+            printf '%s%s: error: unrecognized arguments: %s\n' "$usage" "$prog" "$arg" >&2
+            return 1
+        fi
+
+        # resolve exact option names, then unambiguous prefixes
+        has_val=0
+        [[ $arg == *=* ]] && has_val=1 && val=${{arg#*=}}
+        arg=${{arg%%=*}}
+        match=""
+        matches=()
+        for opt in "${{opts[@]}}" --help; do
+            if [[ $opt == "$arg" ]]; then
+                match=$opt
+                break
+            elif [[ $opt == "$arg"* ]]; then
+                matches+=("$opt")
+            fi
+        done
+        if [[ -z $match ]] && (( ${{#matches[@]}} == 1 )); then
+            match=${{matches[0]}}
+        elif [[ -z $match ]] && (( ${{#matches[@]}} > 1 )); then
+            local IFS=,
+            matches=${{matches[*]}}
+            printf '%s%s: error: ambiguous option: %s could match %s\n' "$usage" "$prog" \
+                   "$arg" "${{matches//,/, }}" >&2
+            return 1
+        elif [[ -z $match ]]; then
+            printf '%s%s: error: unrecognized arguments: %s\n' "$usage" "$prog" "$arg" >&2
+            return 1
+        fi
+
+        if [[ $match == --help ]] || [[ ${{kinds[$match]}} == flag ]]; then
+            if (( has_val )); then
+                printf "%s%s: error: argument %s: ignored explicit argument '%s'\n" \
+                       "$usage" "$prog" "$match" "$val" >&2
+                return 1
+            elif [[ $match == --help ]]; then
+                printf '%s' "${{help//{placeholder}/$prog}}" >&2
+                return 1
+            fi
+            values[$match]=1
+            continue
+        fi
+
+        if (( ! has_val )); then
+            if (( $# == 0 )) || ! {function_name}_is_value "$1"; then
+                printf '%s%s: error: argument %s: expected one argument\n' \
+                       "$usage" "$prog" "$match" >&2
+                return 1
+            fi
+            val=$1
+            shift
+        fi
+        if [[ ${{types[$match]}} == int ]]; then
+            if [[ ! $val =~ ^[[:space:]]*([+-]?)([0-9](_?[0-9])*)[[:space:]]*$ ]]; then
+                printf "%s%s: error: argument %s: invalid int value: '%s'\n" \
+                       "$usage" "$prog" "$match" "$val" >&2
+                return 1
+            fi
+            sign=${{BASH_REMATCH[1]}}
+            digits=${{BASH_REMATCH[2]//_/}}
+            while [[ $digits == 0?* ]]; do
+                digits=${{digits#0}}
+            done
+            [[ $sign == - && $digits != 0 ]] && digits=-$digits
+            val=$digits
+        fi
+        values[$match]=$val
+    done
+
+    for opt in "${{opts[@]}}"; do
+        if [[ ${{kinds[$opt]}} == required && -z ${{values[$opt]+set}} ]]; then
+            missing+=("$opt")
+        fi
+    done
+    if (( ${{#missing[@]}} > 0 )); then
+        local IFS=,
+        missing=${{missing[*]}}
+        printf '%s%s: error: the following arguments are required: %s\n' \
+               "$usage" "$prog" "${{missing//,/, }}" >&2
+        return 1
+    fi
+
+    for opt in "${{opts[@]}}"; do
+        name=${{opt#--}}
+        name=${{name//-/_}}
+        if [[ ${{kinds[$opt]}} == flag ]]; then
+            output+=("$name=${{values[$opt]:-0}}")
+        elif [[ -n ${{values[$opt]+set}} ]]; then
+            output+=("$name=${{values[$opt]}}")
+        else
+            output+=("$name=\"\"")
+        fi
+    done
+    local IFS=";"
+    printf '%s\n' "${{output[*]}}"
+}}
+"""
+
+
+def compile_to_bash(opt_parse_string, function_name="getopt_compiled"):
+    """
+    Generate the source of a bash function parsing options like
+    getopt_to_argparse() does with opt_parse_string. Calling it as
+    "function_name prog_name options..." prints the same string as
+    "python getopt.py prog_name opt_parse_string options..." and returns
+    the same exit code.
+
+    Only the int and str types can be compiled, a RuntimeError is raised for
+    other types.
+    """
+    options = parse_opt_string(opt_parse_string)
+    for (name, kind, type_name) in options:
+        if type_name not in (None, "int", "str"):
+            raise RuntimeError(f"cannot compile option type {type_name} of --{name}")
+    arg_parser = _create_parser(_PROG_PLACEHOLDER, options)
+
+    def bash_array(pairs):
+        return " ".join(f"[--{name}]={value}" for (name, value) in pairs)
+
+    return _BASH_PARSER_TEMPLATE.format(
+        opt_string=opt_parse_string,
+        function_name=function_name,
+        opts=" ".join(f"--{name}" for (name, kind, type_name) in options),
+        kinds=bash_array((name, kind) for (name, kind, type_name) in options),
+        types=bash_array((name, type_name or "flag")
+                         for (name, kind, type_name) in options),
+        usage=shlex.quote(arg_parser.format_usage()),
+        help=shlex.quote(arg_parser.format_help()),
+        placeholder=_PROG_PLACEHOLDER,
+    )
+
+
 if __name__ == "__main__":
     import sys
+
+    # Print the bash parser generated for a spec: getopt.py --compile <spec>
+    if sys.argv[1] == "--compile":
+        try:
+            print(compile_to_bash(sys.argv[2]), end="")
+        except RuntimeError as err:
+            print(f"getopt.py: {err}", file=sys.stderr)
+            sys.exit(1)
+        sys.exit(0)
+
     prog_name = sys.argv[1]
     opt_string = sys.argv[2]
     cli_input = sys.argv[3:]
@@ -88,10 +310,7 @@ if __name__ == "__main__":
 
     if argparse_obj is not None:
         # Print parsed options to be eval'd by bash
-        empty = '""'
-        output_strs = [f"{option}={empty if val is None else val}"
-                       for (option, val) in vars(argparse_obj).items()]
-        print(";".join(output_strs))
+        print(format_options(argparse_obj))
         exit_code = 0
 
     sys.exit(exit_code)
@@ -0,0 +1,309 @@
+# Copyright (c) 2026, NVIDIA CORPORATION.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Lightweight, single-page benchmark report.
+
+Instead of one 300-dpi image per benchmark, the report embeds every series
+as columnar JSON and draws the plots in the browser, on canvases that are
+only drawn once scrolled into view. Long histories are downsampled with
+Largest-Triangle-Three-Buckets (LTTB), which keeps the shape of a series,
+and the minimum and maximum of each series are always kept. FAILED/SKIPPED
+(and missing) nights are stored as index ranges over the full history, so
+their shading is exact whatever the downsampling. The variance band of the
+results, when their statistics are known, is drawn around the series.
+
+The page is generated with numpy and jinja2 only, in a fraction of the time
+matplotlib takes to render the plots. Used by record-benchmarks.py with
+--report-mode=light.
+
+Data layout, shared dates first, then one entry per benchmark:
+
+{"dates": ["20240101_...", ...],
+ "series": [{"name": ..., "last": ..., "avg": ..., "n": <nights plotted>,
+             "x": [date indices], "y": [values, null breaks the line],
+             "failed": [[first, last], ...], "skipped": [[first, last], ...],
+             "lo": [band low], "hi": [band high],  only with a band
+             "profile": <HTML>}]}
+"""
+
+import json
+
+from jinja2 import Environment
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_MAX_POINTS = 500
+
+
+def lttb(x, y, max_points):
+    """
+    Downsample the points (x, y) to at most max_points with the
+    Largest-Triangle-Three-Buckets algorithm, also keeping the points with
+    the minimum and maximum y. max_points must be at least 5 to downsample.
+
+    Returns:
+    ndarray: the sorted indices of the points kept.
+    """
+    n = len(x)
+    if n <= max_points:
+        return np.arange(n)
+    if max_points < 5:
+        raise ValueError(f"max_points must be at least 5, got {max_points}")
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    # first and last points are always kept, the others are split in
+    # buckets, leaving room for the minimum and maximum
+    edges = np.linspace(1, n - 1, max_points - 3).astype(int)
+    kept = [0]
+    for b in range(len(edges) - 1):
+        (start, end) = (edges[b], edges[b + 1])
+        if b + 2 < len(edges):
+            (next_start, next_end) = (edges[b + 1], edges[b + 2])
+            (avg_x, avg_y) = (x[next_start:next_end].mean(), y[next_start:next_end].mean())
+        else:
+            (avg_x, avg_y) = (x[-1], y[-1])
+        (prev_x, prev_y) = (x[kept[-1]], y[kept[-1]])
+        # keep the point forming the largest triangle with the previous kept
+        # point and the average of the next bucket
+        areas = np.abs((prev_x - avg_x) * (y[start:end] - prev_y)
+                       - (prev_x - x[start:end]) * (avg_y - prev_y))
+        kept.append(start + int(np.argmax(areas)))
+    kept.append(n - 1)
+    return np.unique(np.concatenate([kept, [np.argmin(y), np.argmax(y)]]))
+
+
+def _ranges(mask):
+    """
+    Return the [first, last] index ranges of the runs of True in mask.
+    """
+    indices = np.flatnonzero(mask)
+    if len(indices) == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(indices) > 1)
+    starts = np.concatenate([[indices[0]], indices[breaks + 1]])
+    ends = np.concatenate([indices[breaks], [indices[-1]]])
+    return [[int(s), int(e)] for (s, e) in zip(starts, ends)]
+
+
+def _compact(value):
+    return float(f"{value:.6g}")
+
+
+def series_data(values, name, last, avg, profile="", band=None,
+                max_points=DEFAULT_MAX_POINTS):
+    """
+    Return the embedded data of one benchmark.
+
+    Parameters:
+    - values (Series): the benchmark's results, one per date of the report,
+      as strings with the FAILED/SKIPPED markers, or NaN when not recorded.
+    - name (str): the benchmark name.
+    - last, avg: the last result and 30 run average shown next to the plot.
+    - profile (str): HTML shown below them, eg. the resource profile link.
+    - band (tuple): (low, high) lists of the variance band of each result,
+      with None where unknown, or None.
+    - max_points (int): maximum number of points plotted.
+
+    Returns:
+    dict: the series entry, or None if the benchmark was never recorded.
+    """
+    values = values.reset_index(drop=True)
+    if values.isna().all():
+        return None
+    # every night is kept, so the nights after the last recorded result are
+    # shaded as failed like any other missing night
+    failed = (values == "FAILED") | values.isna()
+    skipped = values == "SKIPPED"
+    numbers = pd.to_numeric(values.where(~(failed | skipped)), errors="coerce").to_numpy(dtype=float)
+
+    x = np.flatnonzero(~np.isnan(numbers))
+    kept = x[lttb(x, numbers[x], max_points)] if len(x) else x
+    points = {int(i): _compact(numbers[i]) for i in kept}
+    # break the line at gaps, as matplotlib does at NaN
+    gaps = np.flatnonzero(np.isnan(numbers))
+    for i in gaps[np.isin(gaps - 1, x)]:
+        points[int(i)] = None
+    xs = sorted(points)
+    data = {
+        "name": name,
+        "last": last,
+        "avg": avg,
+        "n": len(values),
+        "x": xs,
+        "y": [points[i] for i in xs],
+        "failed": _ranges(failed.to_numpy()),
+        "skipped": _ranges(skipped.to_numpy()),
+        "profile": profile,
+    }
+    if band is not None:
+        for (key, limits) in zip(("lo", "hi"), band):
+            data[key] = [None if (points[i] is None or limits[i] is None)
+                         else _compact(limits[i]) for i in xs]
+    return data
+
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{{ run_type }} benchmark results</title>
+<style>
+body { font-family: sans-serif; margin: 1em; }
+table { border-collapse: collapse; width: 100%; }
+td { padding: 4px; vertical-align: middle; }
+td.name { width: 22em; word-break: break-all; font-size: 0.9em; }
+canvas { width: 100%; height: 160px; display: block; }
+#tooltip { position: fixed; pointer-events: none; background: #333; color: #fff;
+           padding: 2px 6px; font-size: 0.8em; border-radius: 3px; display: none; }
+</style>
+</head>
+<body>
+<h2>{{ run_type }} benchmark results, {{ run_date }}</h2>
+<table>
+{{ header_rows }}
+</table>
+<table id="results"></table>
+<div id="tooltip"></div>
+<script type="application/json" id="series-data">{{ data_json }}</script>
+<script>
+const data = JSON.parse(document.getElementById("series-data").textContent);
+const table = document.getElementById("results");
+const tooltip = document.getElementById("tooltip");
+const PAD = 40;
+
+function scales(canvas, s) {
+  const w = canvas.width, h = canvas.height;
+  const ys = s.y.concat(s.lo || [], s.hi || []).filter(v => v !== null);
+  let lo = Math.min(...ys), hi = Math.max(...ys);
+  if (!(hi > lo)) { lo -= Math.abs(lo) * 0.05 || 1; hi += Math.abs(hi) * 0.05 || 1; }
+  const sx = i => PAD + (s.n > 1 ? i * (w - 1.5 * PAD) / (s.n - 1) : (w - 1.5 * PAD) / 2);
+  const sy = v => h - 10 - (v - lo) * (h - 20) / (hi - lo);
+  return {sx, sy, lo, hi};
+}
+
+function draw(canvas, s) {
+  const ratio = window.devicePixelRatio || 1;
+  canvas.width = canvas.clientWidth * ratio;
+  canvas.height = canvas.clientHeight * ratio;
+  const ctx = canvas.getContext("2d");
+  const {sx, sy, lo, hi} = scales(canvas, s);
+  const shade = (ranges, color) => {
+    ctx.fillStyle = color;
+    for (const [a, b] of ranges) {
+      ctx.fillRect(sx(a) - 1, 0, Math.max(sx(b) - sx(a), 2), canvas.height);
+    }
+  };
+  shade(s.failed, "rgba(224, 36, 58, 0.4)");
+  shade(s.skipped, "rgba(224, 155, 36, 0.4)");
+  if (s.lo) {
+    // variance band, one polygon per run of nights with a band
+    ctx.fillStyle = "rgba(31, 119, 180, 0.2)";
+    let run = [];
+    const fill = () => {
+      if (run.length > 1) {
+        ctx.beginPath();
+        run.forEach(k => ctx.lineTo(sx(s.x[k]), sy(s.hi[k])));
+        run.slice().reverse().forEach(k => ctx.lineTo(sx(s.x[k]), sy(s.lo[k])));
+        ctx.fill();
+      }
+      run = [];
+    };
+    s.x.forEach((i, k) => { if (s.lo[k] === null) { fill(); } else { run.push(k); } });
+    fill();
+  }
+  ctx.strokeStyle = "#1f77b4";
+  ctx.fillStyle = "#1f77b4";
+  ctx.lineWidth = 2 * ratio;
+  ctx.beginPath();
+  let drawing = false;
+  s.x.forEach((i, k) => {
+    const v = s.y[k];
+    if (v === null) { drawing = false; return; }
+    if (drawing) { ctx.lineTo(sx(i), sy(v)); } else { ctx.moveTo(sx(i), sy(v)); drawing = true; }
+  });
+  ctx.stroke();
+  s.x.forEach((i, k) => {
+    if (s.y[k] !== null) { ctx.beginPath(); ctx.arc(sx(i), sy(s.y[k]), 2.5 * ratio, 0, 2 * Math.PI); ctx.fill(); }
+  });
+  ctx.fillStyle = "#444";
+  ctx.font = (11 * ratio) + "px sans-serif";
+  ctx.fillText(hi.toPrecision(4), 2, 12 * ratio);
+  ctx.fillText(lo.toPrecision(4), 2, canvas.height - 4);
+}
+
+function showValue(event, canvas, s) {
+  const rect = canvas.getBoundingClientRect();
+  const ratio = canvas.width / rect.width;
+  const {sx} = scales(canvas, s);
+  const px = (event.clientX - rect.left) * ratio;
+  let best = -1, dist = Infinity;
+  s.x.forEach((i, k) => {
+    if (s.y[k] !== null && Math.abs(sx(i) - px) < dist) { dist = Math.abs(sx(i) - px); best = k; }
+  });
+  if (best < 0) { return; }
+  tooltip.textContent = data.dates[s.x[best]] + ": " + s.y[best];
+  tooltip.style.left = (event.clientX + 12) + "px";
+  tooltip.style.top = (event.clientY + 12) + "px";
+  tooltip.style.display = "block";
+}
+
+const observer = new IntersectionObserver(entries => {
+  for (const entry of entries) {
+    if (entry.isIntersecting) {
+      draw(entry.target, data.series[entry.target.dataset.index]);
+      observer.unobserve(entry.target);
+    }
+  }
+});
+
+data.series.forEach((s, index) => {
+  const row = table.insertRow();
+  const name = row.insertCell();
+  name.className = "name";
+  name.innerHTML = "<text></text>" + s.profile;
+  name.firstChild.innerText = s.name + "\\n" + s.last + "\\n" + s.avg;
+  const canvas = document.createElement("canvas");
+  canvas.dataset.index = index;
+  canvas.addEventListener("mousemove", event => showValue(event, canvas, s));
+  canvas.addEventListener("mouseleave", () => { tooltip.style.display = "none"; });
+  row.insertCell().appendChild(canvas);
+  observer.observe(canvas);
+});
+</script>
+</body>
+</html>
+"""
+
+
+def render_page(run_type, run_date, dates, series, header_rows=""):
+    """
+    Render the single-page report of a run type.
+
+    Parameters:
+    - run_type (str): the run type, eg. "8-GPU".
+    - run_date (str): the formatted date of the latest run.
+    - dates (list): the run date of each night in the history.
+    - series (list): the series_data() of each benchmark, None entries are skipped.
+    - header_rows (str): HTML table rows shown above the plots, eg. regressions.
+
+    Returns:
+    str: the HTML page.
+    """
+    data = {"dates": list(dates), "series": [s for s in series if s is not None]}
+    # "</" must not appear inside the <script> element
+    data_json = json.dumps(data, separators=(",", ":")).replace("</", "<\\/")
+    template = Environment(autoescape=False).from_string(PAGE_TEMPLATE)
+    return template.render(run_type=run_type, run_date=run_date, data_json=data_json,
+                           header_rows=header_rows)
@@ -0,0 +1,381 @@
+# Copyright (c) 2026, NVIDIA CORPORATION.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Watch the dask scheduler and worker logs of a run for fatal errors.
+
+Every *_log.txt file in the logs directory (scheduler_log.txt and the
+worker-<host>_log.txt files written by cluster_launcher.py) is tailed
+incrementally: only the bytes appended since the last poll are read, and a
+file that is truncated or replaced is read again from its start. The logs
+are usually on a filesystem shared by all nodes, where inotify does not see
+writes made by other nodes, so files are polled at --interval instead.
+
+Each line is matched against a set of patterns, either fatal (a worker
+killed by an OOM, an RMM allocation failure, a UCX endpoint error, ...) or
+warnings worth knowing about. Matches are appended to an event stream, one
+JSON record per line:
+
+{"time": ..., "node": "dgx01", "file": "worker-dgx01_log.txt", "line": 1234,
+ "pattern": "rmm_failure", "fatal": true, "text": "..."}
+
+On the first fatal event the processes given with --signal-pid are sent
+--signal, so the script driving the run can stop it right away instead of
+waiting for handle_timeout (see start_log_watcher in functions.sh). When the
+watcher stops, a post-mortem summary of each node (lines read, matches per
+pattern, the first fatal error and the lines leading to it) is printed and
+written to --summary-file.
+
+Patterns files replace or extend the defaults with one pattern per line,
+"<fatal|warning> <name> <regex>", ignoring blank lines and # comments.
+
+Example usage:
+
+python log_watcher.py --logs-dir=$LOGS_DIR --signal-pid=$$ --watch-pid=$$ &
+python log_watcher.py --logs-dir=$LOGS_DIR --once
+"""
+
+from collections import Counter, deque
+import json
+import os
+from pathlib import Path
+import re
+import signal
+import time
+
+
+LOG_GLOB = "*_log.txt"
+EVENTS_FILE_NAME = "log-events.jsonl"
+SUMMARY_FILE_NAME = "log-summary.json"
+READ_CHUNK_SIZE = 1 << 20
+
+# name: regex, matched anywhere in a line
+FATAL_PATTERNS = {
+    "out_of_memory": r"CUDA_ERROR_OUT_OF_MEMORY|cudaErrorMemoryAllocation|[Oo]ut of memory|MemoryError",
+    "rmm_failure": r"rmm::bad_alloc|rmm::out_of_memory|RMM failure|std::bad_alloc",
+    "ucx_error": r"UCX\s+ERROR|UCXError|UCXConnectionReset|Endpoint timeout",
+    "worker_killed": r"Worker process \d+ was killed by signal|Worker process died unexpectedly"
+                     r"|exceeded \d+% memory budget",
+    "cuda_error": r"CUDA error|cudaErrorIllegalAddress|CUDA_ERROR_\w+|NCCL error",
+    "crash": r"Segmentation fault|core dumped|Fatal Python error",
+}
+WARNING_PATTERNS = {
+    "memory_high": r"Unmanaged memory use is high|Memory use is high but worker has no data"
+                   r"|Worker is at \d+% memory usage",
+    "event_loop_unresponsive": r"Event loop was unresponsive",
+    "comm_closed": r"CommClosedError|StreamClosedError",
+}
+
+
+def read_patterns_file(path):
+    """
+    Return (fatal, warning) dicts of name: regex read from a patterns file.
+    Names may be any word without spaces, eg. gpu-oom. Raises ValueError on
+    a malformed line or a regex that does not compile.
+    """
+    patterns = {"fatal": {}, "warning": {}}
+    with open(path) as patterns_file:
+        for (lineno, line) in enumerate(patterns_file, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            fields = line.split(maxsplit=2)
+            if len(fields) != 3 or fields[0] not in patterns:
+                raise ValueError(f"{path}:{lineno}: expected \"<fatal|warning> <name> <regex>\"")
+            (kind, name, regex) = fields
+            try:
+                re.compile(regex)
+            except re.error as e:
+                raise ValueError(f"{path}:{lineno}: bad regex for {name!r}: {e}") from None
+            patterns[kind][name] = regex
+    return patterns["fatal"], patterns["warning"]
+
+
+def node_name(path):
+    """
+    Return the node a log file belongs to: "scheduler" for
+    scheduler_log.txt, the host name for worker-<host>_log.txt.
+    """
+    name = Path(path).name
+    if name.endswith("_log.txt"):
+        name = name[:-len("_log.txt")]
+    return name[len("worker-"):] if name.startswith("worker-") else name
+
+
+class LogFile:
+    """
+    A log file read incrementally, line by line.
+    """
+    def __init__(self, path):
+        self.path = Path(path)
+        self.inode = None
+        self.offset = 0
+        self.lineno = 0
+        self.partial = b""
+
+    def read_lines(self):
+        """
+        Return the (line number, text) of the complete lines appended since
+        the last call. A line still being written is returned once complete.
+        """
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return []
+        if (stat.st_ino != self.inode) or (stat.st_size < self.offset):
+            # replaced (eg. by a restarted launcher) or truncated
+            (self.inode, self.offset, self.lineno, self.partial) = (stat.st_ino, 0, 0, b"")
+        if stat.st_size == self.offset:
+            return []
+
+        lines = []
+        with open(self.path, "rb") as log:
+            log.seek(self.offset)
+            while True:
+                chunk = log.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                self.offset += len(chunk)
+                *complete, self.partial = (self.partial + chunk).split(b"\n")
+                for raw in complete:
+                    self.lineno += 1
+                    lines.append((self.lineno, raw.decode(errors="replace")))
+        return lines
+
+
+class LogWatcher:
+    """
+    Tails the logs in logs_dir and matches their lines against fatal and
+    warning patterns.
+
+    Parameters:
+    - logs_dir (str or Path): directory of the logs.
+    - fatal_patterns, warning_patterns (dict): name: regex.
+    - events_file (str or Path): JSONL file the events are appended to, or None.
+    - context_lines (int): number of lines kept before each node's first fatal error.
+    - max_events_per_pattern (int): events of a node and pattern written
+      out, further matches are only counted.
+    """
+    def __init__(self, logs_dir, fatal_patterns=FATAL_PATTERNS,
+                 warning_patterns=WARNING_PATTERNS, events_file=None,
+                 context_lines=20, max_events_per_pattern=100):
+        self.logs_dir = Path(logs_dir)
+        self.fatal = set(fatal_patterns)
+        # one alternation of named groups per kind, so each line is scanned
+        # at most twice, fatal patterns first. The groups get generated names,
+        # pattern names need not be valid group names.
+        self.groups = {}
+        self.regexes = []
+        for (fatal, patterns) in ((True, fatal_patterns), (False, warning_patterns)):
+            alternatives = []
+            for (name, regex) in patterns.items():
+                group = f"p{len(self.groups)}"
+                self.groups[group] = (name, fatal)
+                alternatives.append(f"(?P<{group}>{regex})")
+            if alternatives:
+                self.regexes.append(re.compile("|".join(alternatives)))
+        self.events_file = Path(events_file) if events_file else None
+        self.context_lines = context_lines
+        self.max_events_per_pattern = max_events_per_pattern
+        self.files = {}
+        self.nodes = {}
+        self.num_fatal = 0
+
+    def _node(self, name):
+        if name not in self.nodes:
+            self.nodes[name] = {
+                "files": [],
+                "lines": 0,
+                "matches": Counter(),
+                "first_fatal": None,
+                "last_fatal": None,
+                "context": deque(maxlen=self.context_lines),
+            }
+        return self.nodes[name]
+
+    def poll(self):
+        """
+        Read the lines appended to every log since the last poll.
+
+        Returns:
+        list: the events found, as dicts.
+        """
+        for path in sorted(self.logs_dir.glob(LOG_GLOB)):
+            if path not in self.files:
+                self.files[path] = LogFile(path)
+                self._node(node_name(path))["files"].append(path.name)
+
+        events = []
+        for (path, log_file) in self.files.items():
+            node = self._node(node_name(path))
+            for (lineno, text) in log_file.read_lines():
+                node["lines"] += 1
+                match = next(filter(None, (r.search(text) for r in self.regexes)), None)
+                if match is None:
+                    if node["first_fatal"] is None:
+                        node["context"].append(text)
+                    continue
+                (pattern, fatal) = self.groups[match.lastgroup]
+                node["matches"][pattern] += 1
+                event = {
+                    "time": time.time(),
+                    "node": node_name(path),
+                    "file": path.name,
+                    "line": lineno,
+                    "pattern": pattern,
+                    "fatal": fatal,
+                    "text": text.strip(),
+                }
+                if event["fatal"]:
+                    self.num_fatal += 1
+                    if node["first_fatal"] is None:
+                        node["first_fatal"] = {**event, "context": list(node["context"])}
+                    node["last_fatal"] = event
+                elif node["first_fatal"] is None:
+                    node["context"].append(text)
+                if node["matches"][pattern] <= self.max_events_per_pattern:
+                    events.append(event)
+
+        if events and self.events_file:
+            with open(self.events_file, "a") as out_file:
+                for event in events:
+                    out_file.write(json.dumps(event) + "\n")
+        return events
+
+    def summary(self):
+        """
+        Return the post-mortem summary of every node, as a dict.
+        """
+        return {
+            name: {
+                "files": node["files"],
+                "lines": node["lines"],
+                "fatal": {p: n for (p, n) in node["matches"].items() if p in self.fatal},
+                "warnings": {p: n for (p, n) in node["matches"].items() if p not in self.fatal},
+                "first_fatal": node["first_fatal"],
+                "last_fatal": node["last_fatal"],
+            }
+            for (name, node) in sorted(self.nodes.items())
+        }
+
+
+def format_summary(summary):
+    """
+    Return the summary as text, one paragraph per node.
+    """
+    paragraphs = []
+    for (name, node) in summary.items():
+        counts = ", ".join(f"{p} x{n}" for (p, n) in {**node["fatal"], **node["warnings"]}.items())
+        lines = [f"{name}: {node['lines']} lines" + (f", {counts}" if counts else "")]
+        first = node["first_fatal"]
+        if first:
+            lines.append(f"  first fatal error, {first['file']}:{first['line']}:")
+            lines += [f"  | {line.rstrip()}" for line in first["context"]]
+            lines.append(f"  > {first['text']}")
+        paragraphs.append("\n".join(lines))
+    return "\n\n".join(paragraphs)
+
+
+def pid_exists(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    import threading
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--logs-dir", default=os.environ.get("LOGS_DIR"),
+                    help="Directory of the logs to watch. Defaults to the "
+                    "LOGS_DIR env var.")
+    ap.add_argument("--patterns-file", default=None,
+                    help="File of additional \"<fatal|warning> <name> <regex>\" "
+                    "patterns, replacing defaults of the same name.")
+    ap.add_argument("--no-default-patterns", action="store_true",
+                    help="Only use the patterns of --patterns-file.")
+    ap.add_argument("--events-file", default=None,
+                    help=f"Event stream to append to. Defaults to "
+                    f"<logs-dir>/{EVENTS_FILE_NAME}.")
+    ap.add_argument("--summary-file", default=None,
+                    help=f"Post-mortem summary to write. Defaults to "
+                    f"<logs-dir>/{SUMMARY_FILE_NAME}.")
+    ap.add_argument("--interval", type=float, default=1.0,
+                    help="Seconds between polls of the logs.")
+    ap.add_argument("--once", action="store_true",
+                    help="Read the logs once and exit, eg. after a run.")
+    ap.add_argument("--signal-pid", type=int, action="append", default=[],
+                    help="Process to signal on the first fatal error. Can be "
+                    "given more than once.")
+    ap.add_argument("--signal", default="TERM",
+                    help="Signal sent to --signal-pid, eg. TERM or USR1.")
+    ap.add_argument("--max-fatal", type=int, default=1,
+                    help="Number of fatal events before signalling.")
+    ap.add_argument("--watch-pid", type=int, default=None,
+                    help="Stop once this process (eg. the driving script) exits.")
+    args = ap.parse_args()
+
+    if not args.logs_dir:
+        ap.error("--logs-dir is required when LOGS_DIR is not set")
+    logs_dir = Path(args.logs_dir)
+    fatal_patterns = {} if args.no_default_patterns else dict(FATAL_PATTERNS)
+    warning_patterns = {} if args.no_default_patterns else dict(WARNING_PATTERNS)
+    if args.patterns_file:
+        try:
+            (fatal, warning) = read_patterns_file(args.patterns_file)
+        except ValueError as e:
+            ap.error(str(e))
+        fatal_patterns.update(fatal)
+        warning_patterns.update(warning)
+    if not (fatal_patterns or warning_patterns):
+        ap.error("no patterns to match")
+    signum = getattr(signal, "SIG" + args.signal.upper().removeprefix("SIG"))
+
+    watcher = LogWatcher(logs_dir, fatal_patterns, warning_patterns,
+                         events_file=args.events_file or logs_dir / EVENTS_FILE_NAME)
+
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stop_event.set())
+
+    signalled = False
+    while True:
+        # poll once more after being asked to stop, to catch the last lines
+        last_poll = (args.once or stop_event.is_set()
+                     or ((args.watch_pid is not None) and not pid_exists(args.watch_pid)))
+        for event in watcher.poll():
+            if event["fatal"]:
+                print(f"FATAL {event['pattern']} on {event['node']}, "
+                      f"{event['file']}:{event['line']}: {event['text']}", flush=True)
+        if (watcher.num_fatal >= args.max_fatal) and not signalled:
+            signalled = True
+            for pid in args.signal_pid:
+                try:
+                    os.kill(pid, signum)
+                    print(f"sent {signum.name} to {pid}", flush=True)
+                except ProcessLookupError:
+                    pass
+        if last_poll:
+            break
+        stop_event.wait(args.interval)
+
+    summary = watcher.summary()
+    with open(args.summary_file or logs_dir / SUMMARY_FILE_NAME, "w") as out_file:
+        json.dump(summary, out_file, indent=2)
+    print(format_summary(summary), flush=True)
+    sys.exit(1 if watcher.num_fatal else 0)
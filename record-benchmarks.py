@@ -12,21 +12,30 @@
 # limitations under the License.
 
 import argparse
+from concurrent.futures import as_completed, ProcessPoolExecutor
 from datetime import datetime
 import glob
+import hashlib
 from itertools import groupby
+import json
 import math
-import os
 from pathlib import Path
+import time
 
 from jinja2 import Environment, FileSystemLoader
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-import platform
-from pynvml import smi
 import yaml
 
+import benchmark_results
+import dask_profiling
+import detect_regressions
+import env_metadata
+import light_report
+import results_store
+import scaling
+import telemetry
+
 
 def get_args():
     parser = argparse.ArgumentParser()
@@ -43,33 +52,29 @@ def get_args():
         help='Directory containing html templates'
     )
 
-    return parser.parse_args()
+    parser.add_argument(
+        '--export-csv',
+        action='store_true',
+        help='Also write each run type history to a legacy <run_type>.csv file'
+    )
 
-def pytest_results_to_df(path, run_date):
-    """
-    Reads the most recent pytest results file and stores them in a DataFrame.
+    parser.add_argument(
+        '--plot-workers',
+        type=int,
+        default=None,
+        help='Number of processes used to render plots, defaults to the number of CPUs'
+    )
 
-    Parameters:
-    - path (str): the path to the pytest-results.txt file.
-    - run_date (str): the UTC formatted date of the benchmark run.
+    parser.add_argument(
+        '--report-mode',
+        choices=['plots', 'light'],
+        default='plots',
+        help='plots: one image per benchmark, rendered with matplotlib. light: a '
+             'single page per run type with the downsampled series embedded and '
+             'plotted in the browser'
+    )
 
-    Returns:
-    df: a pandas DataFrame containing one row of all benchmark results from the last run.
-    """
-    df = pd.read_csv(path, sep=" ", header=None)
-    df[3] = df[3].astype('object')
-    # preserve failed/skipped statuses
-    df.loc[df[1] == 'FAILED', 3] = 'FAILED'
-    df.loc[df[1] == 'SKIPPED', 3] = 'SKIPPED'
-    df = df[[2, 3]]
-    # add the run date
-    date_row = {2: 'date', 3: run_date}
-    df.loc[1:] = df.loc[:]
-    df.loc[0] = date_row
-    df = df.T.reset_index(drop=True)
-    df.columns = df.iloc[0]
-    df = df.drop(df.index[0])
-    return df
+    return parser.parse_args()
 
 def _convert_size(size_bytes):
     """
@@ -99,89 +104,242 @@ def _group_integers_into_ranges(lst):
             ranges.append((group[0],group[-1]))
     return ranges
 
-def write_metadata():
-    """ Writes some metadata information to a metadata.yaml file. """
-    uname = platform.uname()
-    python_ver = 'python_ver: ' + platform.python_version()
-    cuda_version = os.system("nvcc --version | sed -n 's/^.*release \([0-9]\+\.[0-9]\+\).*$/\1/p'")
-    # get info for all gpu devices
-    smi.nvmlInit()
-    num_gpus = smi.nvmlDeviceGetCount()
-    gpu_info = []
-    for i in range(num_gpus):
-        gpuDeviceHandle = smi.nvmlDeviceGetHandleByIndex(i)
-        gpuType = smi.nvmlDeviceGetName(gpuDeviceHandle).decode()
-        gpuRam = smi.nvmlDeviceGetMemoryInfo(gpuDeviceHandle).total
-        gpu_info.append([gpuType, convert_size(gpuRam)])
+def write_metadata(fingerprint, meta_file):
+    """ Writes the environment of a run, from its env_metadata.py fingerprint, to a metadata.yaml file. """
+    nodes = list(fingerprint['nodes'].values())
     meta = {
-        'os_name': uname[0],
-        'node_name': uname[1],
-        'os_release': uname[2],
-        'os_version': uname[3],
-        'machine_hw': uname[4],
-        'python_version': platform.python_version(),
-        'cuda_version': cuda_version,
-        'num_gpus': num_gpus,
-        'gpu_info': gpu_info,
+        'os': fingerprint['summary']['os'],
+        'node_names': sorted(fingerprint['nodes']),
+        'machine_hw': sorted({node['machine'] for node in nodes}),
+        'python_version': fingerprint['summary']['python'],
+        'cuda_version': fingerprint['summary']['cuda_version'],
+        'driver_version': fingerprint['summary']['driver_version'],
+        'num_gpus': sum(len(node['gpus']) for node in nodes),
+        'gpu_info': [[gpu['name'], _convert_size(gpu['memory'])]
+                     for node in nodes for gpu in node['gpus']],
+        'environment_hash': fingerprint['hash'],
     }
-    with open(results_dir / 'meta.yaml', 'w+') as file:
-        yaml.dump(meta, file, sort_keys=False)
+    results_store.atomic_write(meta_file, yaml.dump(meta, sort_keys=False))
 
 def remove_path_prefix(df):
     """Remove the './' prefix from df columns"""
     y_cols = df.columns.drop(["date"])
     for col in y_cols:
+        if not col.startswith('./'):
+            continue # eg. results ingested from .jsonl files
         newname = col[2:]
         df.rename(columns={col: newname}, inplace=True)
     return df
 
 
-def plot_benchmark_results(path, dest):
+PLOT_CACHE_FILE_NAME = '.plot-cache.json'
+# Bump this whenever the plot style changes so cached plots are re-rendered.
+PLOT_STYLE_VERSION = 1
+
+
+def _series_hash(dates, values, band=None):
     """
-    Reads the results and processes them inside a DF for plotting purposes.
-    - Remove invalid dtypes
-    - Convert all columns except 'date' to floats
-    Then, generate individual plots of each nightly benchmark result and save them as an image.
+    Return a content hash of a benchmark series, used to decide whether its
+    plot needs to be re-rendered.
+    """
+    series = [PLOT_STYLE_VERSION, list(dates), list(values)]
+    if band is not None:
+        series.append(band)
+    contents = json.dumps(series)
+    return hashlib.sha256(contents.encode()).hexdigest()
+
+
+def _render_plot(dates, values, band, save_file):
+    """
+    Render a single benchmark series and save it as an image.
+
+    Parameters:
+    - dates (list): the run date of each result.
+    - values (list): the result of each run, as strings, with None for
+      missing results and the FAILED/SKIPPED markers preserved.
+    - band (tuple): (low, high) lists of the variance band of each result,
+      with None where unknown, or None.
+    - save_file (str): the image file to write.
+    """
+    # imported here so the pool workers, not the parent, pay for matplotlib
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    y = pd.Series(values, dtype=object)
+    failed_rows = y[y.isin(['FAILED']) | pd.isna(y)].index
+    skipped_rows = y[y.isin(['SKIPPED'])].index
+
+    red_ranges = _group_integers_into_ranges(failed_rows)
+    yellow_ranges = _group_integers_into_ranges(skipped_rows)
+
+    y = y.where(~y.isin(['SKIPPED', 'FAILED']), np.nan).astype(float)
+
+    plt_size = (30,4)
+    plt.figure(figsize=plt_size)
+    if band is not None:
+        low, high = (np.array(b, dtype=float) for b in band)
+        plt.fill_between(dates, low, high, color='#1f77b4', alpha=0.2, linewidth=0)
+    plt.plot(dates, y, marker='.', linewidth=3, markersize=14)
+
+    if red_ranges:
+        for start, end in red_ranges:
+            plt.axvspan(start, end, facecolor='#e0243a', alpha=0.4)
+    if yellow_ranges:
+        for start, end in yellow_ranges:
+            plt.axvspan(start, end, facecolor='#e09b24', alpha=0.4)
+
+    plt.xticks([])
+    plt.rc('ytick', labelsize=18)
+    plt.grid(True, linestyle='--', color='gray', alpha=0.1)
+    plt.tight_layout(pad=1.75)
+    # write to a temp file first so an interrupted run never leaves a
+    # truncated image that the cache would consider up to date
+    with results_store.atomic_output(save_file) as tmp_name:
+        plt.savefig(tmp_name, dpi=300, format='jpg')
+    plt.close()
+
+
+def _series_band(band, name, dates):
+    """
+    Return the (low, high) lists of the variance band of a benchmark over
+    dates, with None where unknown, or None if it has no band at all.
+    """
+    if band is None or name not in band[0].columns:
+        return None
+    low, high = (b[name].reindex(dates) for b in band)
+    if low.isna().all():
+        return None
+    return tuple([None if pd.isna(v) else float(v) for v in b] for b in (low, high))
+
+
+def plot_benchmark_results(df, dest, band=None):
+    """
+    Determine which benchmark plots in dest are out of date.
+
+    A plot is reused when the content hash of its series matches the one
+    recorded when it was last rendered. Every night is part of a series,
+    the ones without a result shaded as failed, so each new night changes
+    the hash and re-renders the plot, also of a benchmark that got no new
+    data.
 
     Parameters:
-    - path (str): the path to the .csv file to be plotted.
+    - df (DataFrame): the results history to be plotted, as read from the results store.
     - dest (str): the path to save the plots in
+    - band (tuple): (low, high) DataFrames of the variance band of the
+      results, indexed by date, from benchmark_results.variance_band().
+
+    Returns:
+    tuple: (list of plot tasks to pass to render_plots(), number of plots reused)
     """
-    df = pd.read_csv(path, sep=',')
+    df = remove_path_prefix(df.copy())
     x_col = 'date'
-    df = remove_path_prefix(df)
 
     save_path = Path(dest)
     if not save_path.exists():
         save_path.mkdir(parents=True)
 
+    cache_file = save_path / PLOT_CACHE_FILE_NAME
+    cache = json.loads(cache_file.read_text()) if cache_file.exists() else {}
+
+    tasks = []
+    num_reused = 0
     for y_col in df.columns.drop(x_col):
-        failed_rows = df[df[y_col].isin(['FAILED']) | pd.isna(df[y_col])].index
-        skipped_rows = df[df[y_col].isin(['SKIPPED'])].index
+        if df[y_col].isna().all():
+            continue
+        # every night is plotted, so the nights a benchmark stopped reporting
+        # are shaded as failed and change the hash of its plot
+        dates = df[x_col].tolist()
+        values = [None if pd.isna(v) else str(v) for v in df[y_col]]
+        series_band = _series_band(band, y_col, dates)
+
+        series_hash = _series_hash(dates, values, series_band)
+        save_file = save_path / (y_col + '.jpg')
+        if cache.get(y_col) == series_hash and save_file.exists():
+            num_reused += 1
+        else:
+            tasks.append((dates, values, series_band, str(save_file), series_hash))
+
+    return tasks, num_reused
+
+
+def render_plots(tasks, max_workers=None):
+    """
+    Render plot tasks from plot_benchmark_results() in a process pool and
+    record their hashes in each plot directory's cache.
+
+    Parameters:
+    - tasks (list): plot tasks, possibly from several run types.
+    - max_workers (int): number of worker processes, defaults to the number of CPUs.
+
+    Returns:
+    int: the number of plots rendered.
+    """
+    if not tasks:
+        return 0
+
+    new_hashes = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(_render_plot, dates, values, band, save_file):
+                   (Path(save_file), series_hash)
+                   for (dates, values, band, save_file, series_hash) in tasks}
+        for future in as_completed(futures):
+            save_file, series_hash = futures[future]
+            future.result()
+            new_hashes.setdefault(save_file.parent, {})[save_file.stem] = series_hash
+
+    for plot_dir, hashes in new_hashes.items():
+        cache_file = plot_dir / PLOT_CACHE_FILE_NAME
+        cache = json.loads(cache_file.read_text()) if cache_file.exists() else {}
+        cache.update(hashes)
+        results_store.atomic_write(cache_file, json.dumps(cache, indent=1, sort_keys=True))
+
+    return len(tasks)
+
+
+def resource_profile_html(profile, profile_path):
+    """
+    Summarize the resource profile of a benchmark as a link to its
+    telemetry, for the results table.
 
-        red_ranges = _group_integers_into_ranges(failed_rows)
-        yellow_ranges = _group_integers_into_ranges(skipped_rows)
+    Parameters:
+    - profile (dict): the telemetry.summarize_window() of the benchmark.
+    - profile_path (str): the path of its telemetry CSV, relative to the report.
+
+    Returns:
+    str: an HTML fragment, empty if no samples were taken during the benchmark.
+    """
+    if not profile['samples']:
+        return ''
+    peaks = []
+    for (key, label) in (('peak_host_memory', 'host'), ('peak_device_memory', 'device'),
+                         ('peak_spilled_bytes', 'spilled')):
+        if profile[key] is not None:
+            peaks.append(f'{label} {_convert_size(profile[key])}')
+    return f'<br><a href="{profile_path}">peak {", ".join(peaks)}</a>'
 
-        df[y_col] = df[y_col].where(~df[y_col].isin(['SKIPPED', 'FAILED']), np.nan)
-        df[y_col] = df[y_col].astype(float)
 
-        plt_size = (30,4)
-        plt.figure(figsize=plt_size)
-        plt.plot(df[x_col], df[y_col], marker='.', linewidth=3, markersize=14)
+def dask_profile_html(profile, report_path=None):
+    """
+    Summarize the Dask profile of a benchmark as the share of its time spent
+    in compute, transfer, deserialization, disk and scheduler idle, for the
+    results table.
 
-        if red_ranges:
-            for start, end in red_ranges:
-                plt.axvspan(start, end, facecolor='#e0243a', alpha=0.4)
-        if yellow_ranges:
-            for start, end in yellow_ranges:
-                plt.axvspan(start, end, facecolor='#e09b24', alpha=0.4)
+    Parameters:
+    - profile (dict): the dask_profiling breakdown of the benchmark.
+    - report_path (str): the path of its performance report, relative to the
+      report, or None if it has none.
 
-        plt.xticks([])
-        plt.rc('ytick', labelsize=18)
-        plt.grid(True, linestyle='--', color='gray', alpha=0.1)
-        plt.tight_layout(pad=1.75)
-        plt.savefig(save_path / (y_col + '.jpg'), dpi=300)
-        plt.close()
+    Returns:
+    str: an HTML fragment, empty if no time was recorded.
+    """
+    shares = dask_profiling.breakdown_fractions(profile)
+    if not shares:
+        return ''
+    text = ", ".join(f'{key} {share:.0%}' for (key, share) in shares.items() if share >= 0.005)
+    if report_path is not None:
+        text = f'<a href="{report_path}">{text}</a>'
+    return f'<br>dask: {text}'
 
 
 def render_template(template_dir, name, contents):
@@ -219,63 +377,131 @@ if __name__ == '__main__':
 
     # get each of the cugraph benchmark run directories
     # eg latest/benchmarks/2-GPU  latest/benchmarks/8-GPU  ... etc
+    # results_dir may share files with previous runs as hardlinks (see
+    # setup-latest-results-dir.sh), so files in it are replaced with
+    # results_store.atomic_write() and never modified in place
     results_dir = bench_dir / "results"
+    store_dir = results_dir / "store"
     all_benchmark_runs = glob.glob(str(bench_dir) + '/*-GPU')
 
     # RECORD NIGHTLY RESULTS
     for run in all_benchmark_runs:
         run_type = Path(run).name
-        results_file = bench_dir / run_type / 'pytest-results.txt'
         output_file = results_dir / (run_type + ".csv")
-        
-        # if previous csv files were generated, append tonight's results to the end
-        if output_file.exists():
-            existing_df = pd.read_csv(output_file)
-            tonight_df = pytest_results_to_df(results_file, run_date)
-            res = pd.concat([existing_df, tonight_df])
-            res.to_csv(output_file, index=False)
-
-        # otherwise, create new result file for each successful run
-        else:
-            if results_file.exists():
-                print(f"creating a new results file for {run_type} on {run_date}")
-                df = pytest_results_to_df(results_file, run_date)
-                df.to_csv(output_file, index=False)
 
-
-    csv_files = [file for file in results_dir.iterdir() if file.is_file() and file.suffix == ".csv"]
+        # one-time import of the history recorded before the results store existed
+        if output_file.exists() and run_type not in results_store.list_run_types(store_dir):
+            print(f"migrating {output_file} to the results store")
+            results_store.migrate_csv(output_file, store_dir, run_type)
+
+        # append tonight's results, from pytest-results.txt and the structured
+        # results files written by benchmark suites, as a new partition, and
+        # their statistics alongside
+        tonight_df, stats_df = benchmark_results.records_to_dfs(
+            benchmark_results.read_run_dir(bench_dir / run_type), run_date)
+        if tonight_df is not None:
+            results_store.append_results(store_dir, run_type, tonight_df)
+            results_store.append_stats(store_dir, run_type, stats_df)
+            # with the environment it ran in, as collected on the cluster by
+            # env_metadata.py, or else the environment of this node
+            fingerprint = (env_metadata.read_fingerprint(bench_dir / run_type)
+                           or env_metadata.local_fingerprint())
+            results_store.append_environment(store_dir, run_type, run_date, fingerprint)
+            write_metadata(fingerprint, results_dir / (run_type + '-meta.yaml'))
+
+    histories = {run_type: results_store.read_results(store_dir, run_type)
+                 for run_type in results_store.list_run_types(store_dir)}
+
+    # RELATE THE RUN TYPES: multi-GPU scaling of the benchmarks they share
+    scaling_df = scaling.scaling_history({run_type: remove_path_prefix(df.copy())
+                                          for (run_type, df) in histories.items()})
+    scaling_summary = scaling.summarize(scaling_df)
+    scaling_drops = scaling.find_efficiency_drops(scaling_df)
+    results_store.atomic_write(results_dir / 'scaling.json',
+                               json.dumps({'summary': scaling_summary,
+                                           'drops': scaling_drops}, indent=2))
+    if scaling_drops:
+        print(f"{len(scaling_drops)} scaling efficiency drop(s) detected")
 
     # GENERATE HTML PLOTS
-    for file in csv_files:
-        run_type = file.name[:-4]
+    plot_tasks = []
+    num_plots_reused = 0
+    for (run_type, history_df) in histories.items():
         plot_dir = results_dir / 'plots'  / run_type
 
-        df = pd.read_csv(file)
+        if args.export_csv:
+            results_store.export_csv(store_dir, run_type, results_dir / (run_type + ".csv"))
+
         date_format = '%Y%m%d_%H%M%S_UTC'
-        last_date = datetime.strptime(df.iloc[-1]['date'], date_format) 
+        last_date = datetime.strptime(history_df.iloc[-1]['date'], date_format) 
         contents = {
             'run_type': run_type,
             'run_date': last_date.strftime('%m-%d-%Y %H:%M:%S UTC'),
             'table_contents': ''
         }
 
-        df = remove_path_prefix(df)
-        df = df.drop('date', axis=1).apply(pd.to_numeric, errors='coerce')
+        raw_df = remove_path_prefix(history_df.copy())
+        df = raw_df.drop('date', axis=1).apply(pd.to_numeric, errors='coerce')
         
         last_row = df.iloc[-1]
         last_30_rows = df.tail(30)
         last_30_avg = last_30_rows.mean(numeric_only=True)
 
-        plot_benchmark_results(file, plot_dir)
-
-        # start filling in the HTML table with all the generated plots
-        for plot in plot_dir.iterdir():
-            file_name = plot.name
-            if not file_name.endswith('.jpg'):
-                continue # skip the .html file
-
-            benchmark_name = file_name[:-4]
-            image_path = f'plots/{run_type}/{file_name}'
+        # statistics of each night's results, without every round's duration
+        stats_df = results_store.read_stats(store_dir, run_type,
+                                            columns=['min', 'median', 'stddev', 'rounds'])
+        stats_df['name'] = stats_df['name'].str.removeprefix('./')
+        band = benchmark_results.variance_band(stats_df)
+
+        # flag regressions at the top of the report
+        regressions = detect_regressions.find_regressions(
+            raw_df, noise=benchmark_results.standard_errors(stats_df))
+        results_store.atomic_write(results_dir / (run_type + '-regressions.json'),
+                                   json.dumps(regressions, indent=2))
+        contents['table_contents'] += detect_regressions.regressions_to_html(regressions)
+        if regressions:
+            print(f"{run_type}: {len(regressions)} possible regression(s) detected")
+
+        # and the nights the environment changed, which may explain them
+        environment_changes = env_metadata.environment_changes(
+            results_store.read_environment(store_dir, run_type))
+        results_store.atomic_write(results_dir / (run_type + '-environment-changes.json'),
+                                   json.dumps(environment_changes, indent=2))
+        contents['table_contents'] += env_metadata.changes_to_html(environment_changes,
+                                                                   regressions)
+
+        # followed by how the benchmarks scale to this run type's GPU count
+        contents['table_contents'] += scaling.scaling_to_html(
+            scaling_summary, scaling_drops, gpus=scaling.gpu_count(run_type))
+
+        # link tonight's benchmarks to the cluster telemetry recorded while they ran
+        profiles = telemetry.write_profiles(bench_dir / run_type,
+                                            results_dir / 'telemetry' / run_type)
+        if profiles:
+            results_store.atomic_write(results_dir / (run_type + '-telemetry.json'),
+                                       json.dumps(profiles, indent=2))
+
+        # and to where the time of their Dask tasks went, when profiled
+        dask_profiles = dask_profiling.read_profiles(bench_dir / run_type)
+        dask_reports = dask_profiling.copy_reports(bench_dir / run_type,
+                                                   results_dir / 'dask-reports' / run_type)
+        if dask_profiles:
+            results_store.atomic_write(results_dir / (run_type + '-dask-profiles.json'),
+                                       json.dumps(dask_profiles, indent=2))
+
+        if args.report_mode == 'plots':
+            tasks, num_reused = plot_benchmark_results(history_df, plot_dir, band=band)
+            plot_tasks += tasks
+            num_plots_reused += num_reused
+        series = []
+
+        # start filling in the HTML table with all the plots, which are
+        # rendered for every run type at once below
+        for benchmark_name in df.columns:
+            if raw_df[benchmark_name].isna().all():
+                continue # never recorded, so there is no plot
+
+            image_path = f'plots/{run_type}/{benchmark_name}.jpg'
 
             # last recorded result
             last_res = last_row[benchmark_name]
@@ -291,9 +517,37 @@ if __name__ == '__main__':
             else:
                 last_30 = round(float(last_30), 4)
 
-            contents['table_contents'] += f'<tr><td><text>{benchmark_name}<br>{last_res}<br>{last_30}</text></td><td><img src="{image_path}" alt="{image_path}"></td></tr>\n'
-
-        # render results table with plots
-        rendered_template = render_template(template_dir, 'benchmark-results-plot.html', contents)
-        with open(results_dir / (run_type + '.html'), 'w') as html_file:
-            html_file.write(rendered_template)
+            profile = ''
+            if benchmark_name in profiles:
+                profile = resource_profile_html(profiles[benchmark_name],
+                                                f'telemetry/{run_type}/{benchmark_name}.csv')
+            if benchmark_name in dask_profiles:
+                report_path = None
+                if benchmark_name in dask_reports:
+                    report_path = f'dask-reports/{run_type}/{benchmark_name}.html'
+                profile += dask_profile_html(dask_profiles[benchmark_name], report_path)
+
+            if args.report_mode == 'light':
+                series_band = _series_band(band, benchmark_name, raw_df['date'].tolist())
+                series.append(light_report.series_data(raw_df[benchmark_name], benchmark_name,
+                                                       last_res, last_30, profile=profile,
+                                                       band=series_band))
+                continue
+
+            contents['table_contents'] += f'<tr><td><text>{benchmark_name}<br>{last_res}<br>{last_30}{profile}</text></td><td><img src="{image_path}" alt="{image_path}"></td></tr>\n'
+
+        if args.report_mode == 'light':
+            # the series are plotted by the page itself
+            rendered_template = light_report.render_page(
+                run_type, contents['run_date'], history_df['date'].tolist(), series,
+                header_rows=contents['table_contents'])
+        else:
+            # render results table with plots
+            rendered_template = render_template(template_dir, 'benchmark-results-plot.html', contents)
+        results_store.atomic_write(results_dir / (run_type + '.html'), rendered_template)
+
+    if args.report_mode == 'plots':
+        start_time = time.perf_counter()
+        num_plots_rendered = render_plots(plot_tasks, max_workers=args.plot_workers)
+        print(f"plots: {num_plots_reused} reused, {num_plots_rendered} regenerated "
+              f"in {time.perf_counter() - start_time:.2f} seconds")
@@ -0,0 +1,140 @@
+# Copyright (c) 2026, NVIDIA CORPORATION.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Retention and compaction of the dated results directories.
+
+setup-latest-results-dir.sh hardlinks the previous run's benchmarks/results
+directory into each new dated directory instead of copying it, so unchanged
+files (results store partitions, plots of benchmarks that got no new data,
+...) are stored once however many dated directories refer to them, and
+anything that changes is replaced, not modified (see
+results_store.atomic_write()). What is left to grow with the history is the
+number of files to link each night and the dated directories themselves,
+which this tool bounds:
+
+- the nightly partitions of the results store in the latest run are merged
+  into monthly partitions (results_store.compact()),
+- dated directories beyond the most recent --keep-last are removed, never
+  including the one "latest" points to. Removing a directory only frees the
+  files no other directory links to.
+
+Example usage, typically after record-benchmarks.py:
+
+python results_history.py --results-root-dir=/results --keep-last=30
+"""
+
+from pathlib import Path
+import re
+import shutil
+
+import results_store
+
+
+# Dated run directories created by setup-latest-results-dir.sh
+RUN_DIR_PATTERN = re.compile(r"^\d{8}_\d{6}_UTC$")
+RESULTS_SUBDIR = Path("benchmarks") / "results"
+
+
+def list_run_dirs(results_root_dir):
+    """
+    Return the dated run directories in results_root_dir, oldest first.
+    """
+    return sorted(p for p in Path(results_root_dir).iterdir()
+                  if p.is_dir() and not p.is_symlink() and RUN_DIR_PATTERN.match(p.name))
+
+
+def prune_runs(results_root_dir, keep_last, dry_run=False):
+    """
+    Remove all but the keep_last most recent dated run directories, and never
+    the one the "latest" link points to.
+
+    Returns:
+    list: the directories removed, or that would be with dry_run.
+    """
+    latest = Path(results_root_dir) / "latest"
+    latest = latest.resolve() if latest.exists() else None
+    run_dirs = list_run_dirs(results_root_dir)
+    old_dirs = run_dirs[:-keep_last] if keep_last > 0 else run_dirs
+    removed = []
+    for run_dir in old_dirs:
+        if run_dir.resolve() == latest:
+            continue
+        if not dry_run:
+            shutil.rmtree(run_dir)
+        removed.append(run_dir)
+    return removed
+
+
+def compact_store(results_dir, keep_nightly=90):
+    """
+    Compact every run type of the results store in results_dir (a
+    benchmarks/results directory).
+
+    Returns:
+    dict: run type to the number of nightly partitions merged.
+    """
+    store_dir = Path(results_dir) / "store"
+    return {run_type: results_store.compact(store_dir, run_type, keep_nightly)
+            for run_type in results_store.list_run_types(store_dir)}
+
+
+def disk_usage(paths):
+    """
+    Return (apparent, actual) bytes used by the files under paths, where
+    actual counts files hardlinked several times only once.
+    """
+    apparent = 0
+    inodes = {}
+    for path in paths:
+        for f in Path(path).rglob("*"):
+            if f.is_symlink() or not f.is_file():
+                continue
+            stat = f.stat()
+            apparent += stat.st_size
+            inodes[(stat.st_dev, stat.st_ino)] = stat.st_size
+    return apparent, sum(inodes.values())
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--results-root-dir", required=True,
+                    help="Directory containing the dated run directories "
+                    "and the latest link.")
+    ap.add_argument("--keep-last", type=int, default=0,
+                    help="Number of dated run directories to keep. All are "
+                    "kept if 0.")
+    ap.add_argument("--keep-nightly", type=int, default=90,
+                    help="Most recent nights left as nightly partitions in "
+                    "the results store, older months are compacted.")
+    ap.add_argument("--dry-run", action="store_true",
+                    help="Only print what would be removed and compacted.")
+    args = ap.parse_args()
+
+    results_root_dir = Path(args.results_root_dir)
+    latest_results_dir = results_root_dir / "latest" / RESULTS_SUBDIR
+    if latest_results_dir.exists() and not args.dry_run:
+        for (run_type, num_merged) in compact_store(latest_results_dir,
+                                                    args.keep_nightly).items():
+            if num_merged:
+                print(f"{run_type}: compacted {num_merged} nightly partitions")
+
+    if args.keep_last > 0:
+        removed = prune_runs(results_root_dir, args.keep_last, dry_run=args.dry_run)
+        for run_dir in removed:
+            print(f"{'would remove' if args.dry_run else 'removed'} {run_dir}")
+
+    apparent, actual = disk_usage(list_run_dirs(results_root_dir))
+    print(f"results history: {actual / pow(1024, 2):.1f} MB on disk, "
+          f"{apparent / pow(1024, 2):.1f} MB without hardlinks")
@@ -0,0 +1,458 @@
+# Copyright (c) 2026, NVIDIA CORPORATION.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Append-only, columnar store for nightly benchmark results.
+
+Each night's results for a run type (2-GPU, 8-GPU, ...) are written as a
+new, immutable Parquet partition instead of rewriting a single growing CSV:
+
+    <store_dir>/<run_type>/<run_date>.parquet
+
+Run dates use the '%Y%m%d_%H%M%S_UTC' format, so sorting partition names
+also sorts them chronologically. Benchmark values are stored as strings so
+the FAILED/SKIPPED markers recorded by record-benchmarks.py are preserved
+exactly as they were in the CSV files.
+
+compact() merges the nightly partitions of past months into one partition
+per month, so the number of files stays small as the history grows:
+
+    <store_dir>/<run_type>/compacted-<YYYYMM>.parquet
+
+The statistics of each benchmark (see benchmark_results.py) are stored next
+to the results, as one row per benchmark and night, in partitions laid out
+and compacted the same way:
+
+    <store_dir>/<run_type>/stats/<run_date>.parquet
+
+and so is the environment fingerprint of each night (see env_metadata.py),
+as one row of its date, hash and JSON fingerprint:
+
+    <store_dir>/<run_type>/environment/<run_date>.parquet
+
+Files in the store, and in the rest of the results directory, are never
+modified in place: they are written to a temporary file which then replaces
+the old one (see atomic_write()). Dated results directories can therefore
+share the unchanged files of previous runs as hardlinks.
+
+Example usage:
+
+python results_store.py migrate --store-dir=results/store results/2-GPU.csv
+python results_store.py export --store-dir=results/store --run-type=2-GPU \
+                               --output-file=results/2-GPU.csv
+"""
+
+from contextlib import contextmanager
+from itertools import groupby
+import json
+import os
+from pathlib import Path
+import tempfile
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+
+PARTITION_SUFFIX = ".parquet"
+COMPACTED_PREFIX = "compacted-"
+STATS_SUBDIR = "stats"
+ENVIRONMENT_SUBDIR = "environment"
+
+
+def _stats_run_type(run_type):
+    # the statistics are a store of their own under the run type directory
+    return f"{run_type}/{STATS_SUBDIR}"
+
+
+def _environment_run_type(run_type):
+    return f"{run_type}/{ENVIRONMENT_SUBDIR}"
+
+
+def _partition_path(store_dir, run_type, run_date):
+    return Path(store_dir) / run_type / (run_date + PARTITION_SUFFIX)
+
+
+def _compacted_path(store_dir, run_type, month):
+    return Path(store_dir) / run_type / (COMPACTED_PREFIX + month + PARTITION_SUFFIX)
+
+
+def _umask():
+    # the umask can only be read by setting it
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+
+@contextmanager
+def atomic_output(path):
+    """
+    Context manager yielding a temporary file name to write the contents of
+    path to, which then replaces path. Readers never see a partially written
+    file, and a file shared as a hardlink with other results directories is
+    replaced rather than modified.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    # mkstemp creates the file readable by its owner only, give it the mode
+    # of a file created with open() so the reports stay readable by others
+    os.fchmod(fd, 0o666 & ~_umask())
+    os.close(fd)
+    try:
+        yield tmp_name
+        os.replace(tmp_name, path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
+def atomic_write(path, contents):
+    """
+    Write contents (str) to path with atomic_output().
+    """
+    with atomic_output(path) as tmp_name:
+        with open(tmp_name, "w") as out_file:
+            out_file.write(contents)
+
+
+def _write_partition(table, path):
+    with atomic_output(path) as tmp_name:
+        pq.write_table(table, tmp_name)
+
+
+def _nightly_files(store_dir, run_type):
+    run_dir = Path(store_dir) / run_type
+    return sorted(p for p in run_dir.glob("*" + PARTITION_SUFFIX)
+                  if not p.name.startswith(COMPACTED_PREFIX))
+
+
+def _compacted_files(store_dir, run_type):
+    run_dir = Path(store_dir) / run_type
+    return sorted(run_dir.glob(COMPACTED_PREFIX + "*" + PARTITION_SUFFIX))
+
+
+def _read_files(files, columns=None):
+    """
+    Read partition files into a single table, unifying their schemas.
+    """
+    # Benchmarks are added and removed over time, so partitions do not share
+    # a single schema. Unifying only reads the Parquet footers.
+    schema = pa.unify_schemas([pq.read_schema(f) for f in files])
+    # Preserve the order benchmarks first appeared in, with 'date' first.
+    names = ["date"] + [n for n in schema.names if n != "date"]
+    if columns is not None:
+        names = ["date"] + [c for c in columns if c in schema.names and c != "date"]
+    dataset = ds.dataset([str(f) for f in files], schema=schema, format="parquet")
+    return dataset.to_table(columns=names)
+
+
+def list_run_types(store_dir):
+    """
+    Return the sorted list of run types that have at least one partition.
+    """
+    store_dir = Path(store_dir)
+    if not store_dir.exists():
+        return []
+    return sorted(d.name for d in store_dir.iterdir()
+                  if d.is_dir() and any(d.glob("*" + PARTITION_SUFFIX)))
+
+
+def list_dates(store_dir, run_type):
+    """
+    Return the sorted list of run dates recorded for run_type.
+    """
+    dates = [p.name[:-len(PARTITION_SUFFIX)] for p in _nightly_files(store_dir, run_type)]
+    for path in _compacted_files(store_dir, run_type):
+        dates += pq.read_table(path, columns=["date"]).column("date").to_pylist()
+    return sorted(set(dates))
+
+
+def append_results(store_dir, run_type, df, overwrite=False):
+    """
+    Append results to the store, one partition per row.
+
+    Parameters:
+    - store_dir (str or Path): root directory of the results store.
+    - run_type (str): the run type the results belong to, eg. "2-GPU".
+    - df (DataFrame): results with a 'date' column and one column per
+      benchmark, as returned by pytest_results_to_df().
+    - overwrite (bool): replace partitions for dates that already exist
+      instead of skipping them.
+
+    Returns:
+    list: the run dates that were written.
+    """
+    existing = set(list_dates(store_dir, run_type))
+    written = []
+    for _, row in df.iterrows():
+        run_date = str(row["date"])
+        if (run_date in existing) and not overwrite:
+            continue
+        values = {col: [None if pd.isna(val) else str(val)]
+                  for (col, val) in row.items()}
+        table = pa.table(values,
+                         schema=pa.schema([(col, pa.string()) for col in values]))
+        _write_partition(table, _partition_path(store_dir, run_type, run_date))
+        written.append(run_date)
+    return written
+
+
+def read_results(store_dir, run_type, last_n=None, columns=None):
+    """
+    Read the results history for run_type into a DataFrame.
+
+    Parameters:
+    - store_dir (str or Path): root directory of the results store.
+    - run_type (str): the run type to read, eg. "2-GPU".
+    - last_n (int): if specified, only read the last_n most recent nights.
+    - columns (list): if specified, only read these benchmark columns. The
+      'date' column is always included. Columns missing from every partition
+      are returned as all-null columns.
+
+    Returns:
+    df: a pandas DataFrame with one row per night, oldest first, in the same
+    layout as the legacy <run_type>.csv files.
+    """
+    files = _nightly_files(store_dir, run_type)
+    compacted = _compacted_files(store_dir, run_type)
+    if last_n is not None:
+        files = files[-last_n:] if last_n > 0 else []
+        # only read the most recent monthly partitions needed to fill last_n
+        num_rows = len(files)
+        while (num_rows < last_n) and compacted:
+            files.insert(0, compacted.pop())
+            num_rows += pq.ParquetFile(files[0]).metadata.num_rows
+    else:
+        files = compacted + files
+    if not files:
+        return pd.DataFrame(columns=["date"] + list(columns or []))
+
+    df = _read_files(files, columns).to_pandas()
+    if columns is not None:
+        for col in columns:
+            if col not in df.columns:
+                df[col] = None
+        df = df[["date"] + [c for c in columns if c != "date"]]
+
+    # a date can be in two partitions if compact() was interrupted
+    df = df.drop_duplicates("date", keep="last")
+    df = df.sort_values("date", kind="stable").reset_index(drop=True)
+    if last_n is not None:
+        df = df.tail(last_n).reset_index(drop=True)
+    return df
+
+
+def _compact(store_dir, run_type, keep_nightly, key):
+    nightly = _nightly_files(store_dir, run_type)
+    if not nightly:
+        return 0
+    current_month = nightly[-1].name[:6]
+    if keep_nightly > 0:
+        nightly = nightly[:-keep_nightly]
+    num_merged = 0
+    for (month, month_files) in groupby(nightly, key=lambda p: p.name[:6]):
+        month_files = list(month_files)
+        if month == current_month:
+            continue  # the month may not be over, wait for its last nights
+        compacted_path = _compacted_path(store_dir, run_type, month)
+        files = ([compacted_path] if compacted_path.exists() else []) + month_files
+        table = _read_files(files)
+        df = table.to_pandas()
+        df = df.drop_duplicates(key, keep="last").sort_values(key, kind="stable")
+        _write_partition(pa.Table.from_pandas(df, schema=table.schema, preserve_index=False),
+                         compacted_path)
+        for path in month_files:
+            path.unlink()
+        num_merged += len(month_files)
+    return num_merged
+
+
+def compact(store_dir, run_type, keep_nightly=90):
+    """
+    Merge the nightly partitions of run_type, and of its statistics and
+    environment fingerprints, into one partition per month, except for the
+    keep_nightly most recent nights and the current month.
+
+    Each monthly partition is written (or rewritten, to add late nights)
+    before the nightly partitions it replaces are removed, so readers always
+    see every night.
+
+    Returns:
+    int: the number of nightly result partitions merged.
+    """
+    _compact(store_dir, _stats_run_type(run_type), keep_nightly, ["date", "name"])
+    _compact(store_dir, _environment_run_type(run_type), keep_nightly, ["date"])
+    return _compact(store_dir, run_type, keep_nightly, ["date"])
+
+
+def migrate_csv(csv_path, store_dir, run_type=None):
+    """
+    One-time migration of a legacy <run_type>.csv results file into the store.
+    Dates already present in the store are left untouched, so this is safe to
+    run more than once.
+
+    Parameters:
+    - csv_path (str or Path): the legacy CSV results file.
+    - store_dir (str or Path): root directory of the results store.
+    - run_type (str): the run type to store the results under. Defaults to the
+      CSV file name without its suffix.
+
+    Returns:
+    list: the run dates that were migrated.
+    """
+    csv_path = Path(csv_path)
+    run_type = run_type or csv_path.stem
+    df = pd.read_csv(csv_path, dtype=str, keep_default_na=False, na_values=[""])
+    return append_results(store_dir, run_type, df)
+
+
+def append_stats(store_dir, run_type, stats_df, overwrite=False):
+    """
+    Append benchmark statistics to the store, one partition per night.
+
+    Parameters:
+    - store_dir (str or Path): root directory of the results store.
+    - run_type (str): the run type the statistics belong to, eg. "2-GPU".
+    - stats_df (DataFrame): one row per benchmark and night, with 'date' and
+      'name' columns, as returned by benchmark_results.records_to_dfs().
+    - overwrite (bool): replace partitions for dates that already exist
+      instead of skipping them.
+
+    Returns:
+    list: the run dates that were written.
+    """
+    stats_run_type = _stats_run_type(run_type)
+    existing = set(list_dates(store_dir, stats_run_type))
+    written = []
+    for (run_date, night_df) in stats_df.groupby("date", sort=True):
+        if (run_date in existing) and not overwrite:
+            continue
+        table = pa.Table.from_pandas(night_df, preserve_index=False)
+        _write_partition(table, _partition_path(store_dir, stats_run_type, run_date))
+        written.append(run_date)
+    return written
+
+
+def read_stats(store_dir, run_type, last_n=None, columns=None):
+    """
+    Read the benchmark statistics history for run_type into a DataFrame, with
+    one row per benchmark and night, oldest first.
+
+    Parameters:
+    - store_dir (str or Path): root directory of the results store.
+    - run_type (str): the run type to read, eg. "2-GPU".
+    - last_n (int): if specified, only read the last_n most recent nights.
+    - columns (list): if specified, only read these columns, eg. to leave
+      out the durations of every round. 'date' and 'name' are always
+      included.
+    """
+    stats_run_type = _stats_run_type(run_type)
+    dates = list_dates(store_dir, stats_run_type)
+    if last_n is not None:
+        dates = dates[-last_n:] if last_n > 0 else []
+    if not dates:
+        return pd.DataFrame(columns=["date", "name"] + [c for c in columns or []
+                                                        if c not in ("date", "name")])
+    files = _nightly_files(store_dir, stats_run_type)
+    files = [f for f in files if f.name[:-len(PARTITION_SUFFIX)] >= dates[0]]
+    compacted = [f for f in _compacted_files(store_dir, stats_run_type)
+                 if f.name[len(COMPACTED_PREFIX):][:6] >= dates[0][:6]]
+    if columns is not None:
+        columns = ["name"] + [c for c in columns if c not in ("date", "name")]
+    df = _read_files(compacted + files, columns).to_pandas()
+    df = df[df["date"] >= dates[0]]
+    df = df.drop_duplicates(["date", "name"], keep="last")
+    return df.sort_values("date", kind="stable").reset_index(drop=True)
+
+
+def append_environment(store_dir, run_type, run_date, fingerprint, overwrite=False):
+    """
+    Store the environment fingerprint of a night, as returned by
+    env_metadata.cluster_fingerprint().
+
+    Returns:
+    bool: whether the fingerprint was written.
+    """
+    environment_run_type = _environment_run_type(run_type)
+    if (run_date in list_dates(store_dir, environment_run_type)) and not overwrite:
+        return False
+    table = pa.table({"date": [run_date], "hash": [fingerprint["hash"]],
+                      "fingerprint": [json.dumps(fingerprint, sort_keys=True)]})
+    _write_partition(table, _partition_path(store_dir, environment_run_type, run_date))
+    return True
+
+
+def read_environment(store_dir, run_type, last_n=None):
+    """
+    Read the environment fingerprints stored for run_type.
+
+    Returns:
+    list: (run date, fingerprint) tuples, oldest first.
+    """
+    environment_run_type = _environment_run_type(run_type)
+    files = _compacted_files(store_dir, environment_run_type) + \
+        _nightly_files(store_dir, environment_run_type)
+    if not files:
+        return []
+    df = _read_files(files).to_pandas()
+    df = df.drop_duplicates("date", keep="last").sort_values("date", kind="stable")
+    if last_n is not None:
+        df = df.tail(last_n) if last_n > 0 else df.head(0)
+    return [(run_date, json.loads(fingerprint))
+            for (run_date, fingerprint) in zip(df["date"], df["fingerprint"])]
+
+
+def export_csv(store_dir, run_type, output_file, last_n=None):
+    """
+    Export the results history for run_type in the legacy CSV layout, for
+    tools that still read <run_type>.csv directly.
+    """
+    df = read_results(store_dir, run_type, last_n=last_n)
+    with atomic_output(output_file) as tmp_name:
+        df.to_csv(tmp_name, index=False)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser()
+    subparsers = ap.add_subparsers(dest="command", required=True)
+
+    migrate_parser = subparsers.add_parser(
+        "migrate", help="Import legacy <run_type>.csv files into the store."
+    )
+    migrate_parser.add_argument("--store-dir", required=True)
+    migrate_parser.add_argument("csv_files", nargs="+")
+
+    export_parser = subparsers.add_parser(
+        "export", help="Write a run type's history as a legacy CSV file."
+    )
+    export_parser.add_argument("--store-dir", required=True)
+    export_parser.add_argument("--run-type", required=True)
+    export_parser.add_argument("--output-file", required=True)
+    export_parser.add_argument(
+        "--last-n",
+        type=int,
+        default=None,
+        help="Only export the last N nights. Default is the full history.",
+    )
+    args = ap.parse_args()
+
+    if args.command == "migrate":
+        for csv_file in args.csv_files:
+            migrated = migrate_csv(csv_file, args.store_dir)
+            print(f"migrated {len(migrated)} nights from {csv_file}")
+    else:
+        export_csv(args.store_dir, args.run_type, args.output_file,
+                   last_n=args.last_n)
@@ -0,0 +1,268 @@
+# Copyright (c) 2026, NVIDIA CORPORATION.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Multi-GPU scaling analysis across the N-GPU run types.
+
+The results histories of the run types (2-GPU, 8-GPU, ...) are joined by
+benchmark name and run date, and for every night:
+
+- strong scaling: a benchmark run at several GPU counts is compared to its
+  run at the smallest GPU count it has ever run at (the base), with
+  speedup = t(base) / t(N) and efficiency = speedup / (N / base).
+- weak scaling: benchmarks whose name encodes their problem size, eg.
+  bench_bfs[scale_20] (RMAT scale, log2 of the size) or a size=/rows= value,
+  are compared to the same benchmark at the base GPU count with a problem
+  size N / base times smaller, with efficiency = t(base) / t(N).
+
+Efficiencies are times ratios, so 1.0 is perfect scaling. A benchmark is
+flagged when its efficiency drops, using the same detector as the nightly
+results (detect_regressions.find_regressions()).
+
+Example usage:
+
+python scaling.py --store-dir=latest/benchmarks/results/store
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+import detect_regressions
+
+
+RUN_TYPE_PATTERN = re.compile(r"^(\d+)-GPU$")
+# (pattern of the problem size in a benchmark name, whether it is the log2
+# of the size)
+SIZE_PATTERNS = (
+    (re.compile(r"scale[_=](\d+)"), True),
+    (re.compile(r"(?:size|rows|edges|vertices|nodes)[_=](\d+)"), False),
+)
+
+
+def gpu_count(run_type):
+    """
+    Return the number of GPUs of run_type, eg. 8 for "8-GPU", or None.
+    """
+    match = RUN_TYPE_PATTERN.match(run_type)
+    return int(match.group(1)) if match else None
+
+
+def problem_size(benchmark):
+    """
+    Return (family, size) for a benchmark name encoding its problem size,
+    where family is the name with the size replaced by "*", or
+    (benchmark, None).
+    """
+    for (pattern, is_log2) in SIZE_PATTERNS:
+        match = pattern.search(benchmark)
+        if match:
+            value = int(match.group(1))
+            family = benchmark[:match.start(1)] + "*" + benchmark[match.end(1):]
+            return family, float(2 ** value if is_log2 else value)
+    return benchmark, None
+
+
+def join_histories(histories):
+    """
+    Join run type histories into a single long DataFrame.
+
+    Parameters:
+    - histories (dict): run type to its results history, with a 'date'
+      column and one column per benchmark, with the './' prefix removed.
+      Run types not named <N>-GPU are ignored.
+
+    Returns:
+    DataFrame: one row per recorded result with date, benchmark, gpus and
+    value, FAILED/SKIPPED results and missing nights excluded.
+    """
+    frames = []
+    for (run_type, df) in histories.items():
+        gpus = gpu_count(run_type)
+        if gpus is None or df.empty:
+            continue
+        values = detect_regressions.history_to_values(df)
+        long_df = values.rename_axis("date").reset_index().melt(
+            id_vars="date", var_name="benchmark", value_name="value")
+        long_df["gpus"] = gpus
+        frames.append(long_df.dropna(subset=["value"]))
+    if not frames:
+        return pd.DataFrame(columns=["date", "benchmark", "gpus", "value"])
+    return pd.concat(frames, ignore_index=True)[["date", "benchmark", "gpus", "value"]]
+
+
+def strong_scaling(long_df):
+    """
+    Return the strong scaling of every benchmark run at more than one GPU
+    count, as one row per (date, benchmark, gpus) with the base GPU count
+    and time, speedup and efficiency. Base results are not included.
+    """
+    base_gpus = long_df.groupby("benchmark")["gpus"].min().rename("base_gpus")
+    df = long_df.join(base_gpus, on="benchmark")
+    base = df[df["gpus"] == df["base_gpus"]][["date", "benchmark", "value"]]
+    df = df[df["gpus"] > df["base_gpus"]].merge(base, on=["date", "benchmark"],
+                                                suffixes=("", "_base"))
+    df["speedup"] = df["value_base"] / df["value"]
+    df["efficiency"] = df["speedup"] * df["base_gpus"] / df["gpus"]
+    df["kind"] = "strong"
+    return df
+
+
+def weak_scaling(long_df):
+    """
+    Return the weak scaling of benchmarks encoding their problem size, as one
+    row per (date, benchmark, gpus) pairing a result with the result of the
+    same benchmark family at the base GPU count and a problem size smaller
+    by the same factor as the GPU count, with speedup and efficiency (both
+    t(base) / t(N)).
+    """
+    sizes = long_df["benchmark"].map(problem_size)
+    df = long_df.assign(family=[s[0] for s in sizes],
+                        size=np.array([s[1] for s in sizes], dtype=float))
+    df = df.dropna(subset=["size"])
+    if df.empty:
+        return pd.DataFrame(columns=list(long_df.columns) + [
+            "base_gpus", "value_base", "benchmark_base", "speedup", "efficiency", "kind"])
+    base_gpus = df.groupby("family")["gpus"].min().rename("base_gpus")
+    df = df.join(base_gpus, on="family")
+
+    base = df[df["gpus"] == df["base_gpus"]][["date", "family", "size", "value", "benchmark"]]
+    df = df[df["gpus"] > df["base_gpus"]].copy()
+    df["size"] = df["size"] * df["base_gpus"] / df["gpus"]
+    df = df.merge(base, on=["date", "family", "size"], suffixes=("", "_base"))
+    df["speedup"] = df["value_base"] / df["value"]
+    df["efficiency"] = df["speedup"]
+    df["kind"] = "weak"
+    return df.drop(columns=["family", "size"])
+
+
+def scaling_history(histories):
+    """
+    Return the strong and weak scaling of all the benchmarks in histories
+    (see join_histories()) as a single DataFrame, sorted by date.
+    """
+    long_df = join_histories(histories)
+    columns = ["date", "benchmark", "gpus", "base_gpus", "kind", "value",
+               "value_base", "speedup", "efficiency"]
+    df = pd.concat([strong_scaling(long_df), weak_scaling(long_df)], ignore_index=True)
+    if "benchmark_base" not in df.columns:
+        df["benchmark_base"] = np.nan
+    df["benchmark_base"] = df["benchmark_base"].fillna(df["benchmark"])
+    return df.reindex(columns=columns + ["benchmark_base"]).sort_values(
+        ["date", "benchmark", "gpus"], kind="stable").reset_index(drop=True)
+
+
+def _series_name(row):
+    return f"{row['benchmark']} {row['kind']} {row['gpus']}/{row['base_gpus']} GPUs"
+
+
+def find_efficiency_drops(scaling_df, **detector_options):
+    """
+    Find the scaling series whose efficiency dropped, with
+    detect_regressions.find_regressions(**detector_options) where efficiency
+    is a higher is better result.
+
+    Returns:
+    list: the regressions, whose 'benchmark' is the series name
+    "<benchmark> <strong|weak> <N>/<base> GPUs".
+    """
+    if scaling_df.empty:
+        return []
+    series = scaling_df.assign(series=scaling_df.apply(_series_name, axis=1))
+    wide = series.pivot_table(index="date", columns="series", values="efficiency",
+                              aggfunc="last").reset_index()
+    wide.columns.name = None
+    return detect_regressions.find_regressions(wide, higher_is_better=True,
+                                               **detector_options)
+
+
+def summarize(scaling_df, window=30):
+    """
+    Return the latest speedup and efficiency of each scaling series, with
+    the median efficiency of its last window nights.
+    """
+    rows = []
+    for (keys, group) in scaling_df.groupby(["benchmark", "kind", "gpus", "base_gpus"]):
+        (benchmark, kind, gpus, base_gpus) = keys
+        last = group.iloc[-1]
+        rows.append({
+            "benchmark": benchmark,
+            "kind": kind,
+            "gpus": int(gpus),
+            "base_gpus": int(base_gpus),
+            "base_benchmark": last["benchmark_base"],
+            "date": last["date"],
+            "speedup": float(last["speedup"]),
+            "efficiency": float(last["efficiency"]),
+            "median_efficiency": float(group["efficiency"].tail(window).median()),
+            "series": _series_name(last),
+        })
+    return rows
+
+
+def scaling_to_html(summary, drops, gpus=None):
+    """
+    Return a compact scaling summary table, in a single results table row,
+    for the series scaled to gpus (or all of them), with the series whose
+    efficiency dropped highlighted.
+    """
+    if gpus is not None:
+        summary = [s for s in summary if s["gpus"] == gpus]
+    if not summary:
+        return ""
+    dropped = {d["benchmark"]: d for d in drops}
+    rows = ['<tr><th>benchmark</th><th>scaling</th><th>speedup</th>'
+            '<th>efficiency</th><th>median</th></tr>']
+    for s in sorted(summary, key=lambda s: (s["series"] not in dropped, s["efficiency"])):
+        style = ' style="background-color:#f8d7da"' if s["series"] in dropped else ""
+        scaling = f'{s["kind"]}, {s["gpus"]} vs {s["base_gpus"]} GPUs'
+        if s["base_benchmark"] != s["benchmark"]:
+            scaling += f' ({s["base_benchmark"]})'
+        rows.append(f'<tr{style}><td>{s["benchmark"]}</td><td>{scaling}</td>'
+                    f'<td>{s["speedup"]:.2f}x</td><td>{s["efficiency"]:.0%}</td>'
+                    f'<td>{s["median_efficiency"]:.0%}</td></tr>')
+    title = f'<b>Scaling</b> ({sum(s["series"] in dropped for s in summary)} efficiency drop(s))'
+    return (f'<tr><td colspan="2">{title}<table border="1" cellpadding="3">'
+            + "".join(rows) + '</table></td></tr>\n')
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    import results_store
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--store-dir", required=True,
+                    help="Results store to read the run type histories from.")
+    ap.add_argument("--output-file", default=None,
+                    help="Write the summary and the efficiency drops to this "
+                    "JSON file instead of printing them.")
+    args = ap.parse_args()
+
+    histories = {}
+    for run_type in results_store.list_run_types(args.store_dir):
+        df = results_store.read_results(args.store_dir, run_type)
+        histories[run_type] = df.rename(columns=lambda c: c[2:] if c.startswith("./") else c)
+
+    scaling_df = scaling_history(histories)
+    summary = summarize(scaling_df)
+    drops = find_efficiency_drops(scaling_df)
+    if args.output_file:
+        with open(args.output_file, "w") as out_file:
+            json.dump({"summary": summary, "drops": drops}, out_file, indent=2)
+    else:
+        for s in summary:
+            flag = "  EFFICIENCY DROP" if any(d["benchmark"] == s["series"] for d in drops) else ""
+            print(f'{s["series"]}: speedup {s["speedup"]:.2f}x, efficiency '
+                  f'{s["efficiency"]:.0%} (median {s["median_efficiency"]:.0%}){flag}')
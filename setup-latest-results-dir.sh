@@ -58,10 +58,11 @@ ln -s ${results_root_dir}/${DATE} $latest_results_dir
 mkdir -p $testing_results_dir
 mkdir -p $benchmark_results_dir
 
-# copy over old regressions if they exist. otherwise, create a new directory to store them
+# carry over the results history if it exists, as hardlinks so unchanged
+# files are not copied every night. otherwise, create a new directory to store it
 previous_regressions=${previous_results}/benchmarks/results
 if [ -d $previous_regressions ]; then
-    cp -r $previous_regressions ${benchmark_results_dir}/results
+    link_tree $previous_regressions ${benchmark_results_dir}/results
 else
     mkdir -p ${benchmark_results_dir}/results
 fi
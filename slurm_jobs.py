@@ -0,0 +1,286 @@
+# Copyright (c) 2026, NVIDIA CORPORATION.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Wait for Slurm jobs to complete.
+
+All the jobs watched are queried with a single squeue call per poll, and
+the interval between polls backs off from --min-interval to --max-interval
+while no job changes state, going back to --min-interval whenever one does,
+so long waits put little load on the Slurm controller while a job leaving
+the queue is still noticed quickly. Once every job has left the queue, their
+final state and exit code are read with a single sacct call.
+
+The squeue and sacct commands can be replaced, eg. by fakes printing canned
+output to test scripts on machines without Slurm: they are run with the
+same arguments as the real commands (see SlurmCommands) and only need to
+print the same fields.
+
+Example usage, as waitForSlurmJobsToComplete in functions.sh does:
+
+python slurm_jobs.py 1234 1235 1236
+
+or from python:
+
+watcher = JobWatcher(["1234", "1235"])
+for job in watcher.wait(timeout=3600):
+    print(job.job_id, job.state, job.exit_code)
+"""
+
+from collections import namedtuple
+import os
+import shlex
+import subprocess
+import sys
+import time
+
+
+# squeue/sacct command lines get long with many job ids, which are queried
+# in batches of this many
+MAX_JOB_IDS_PER_QUERY = 500
+SACCT_RETRIES = 3
+
+JobResult = namedtuple("JobResult", ["job_id", "state", "exit_code", "signal"])
+
+
+class SlurmCommandError(RuntimeError):
+    pass
+
+
+def _batches(job_ids):
+    job_ids = list(job_ids)
+    for start in range(0, len(job_ids), MAX_JOB_IDS_PER_QUERY):
+        yield job_ids[start:start + MAX_JOB_IDS_PER_QUERY]
+
+
+class SlurmCommands:
+    """
+    Runs the squeue and sacct commands, which default to the SQUEUE_COMMAND
+    and SACCT_COMMAND env vars if set, or to squeue and sacct.
+    """
+    def __init__(self, squeue_command=None, sacct_command=None, timeout=60):
+        self.squeue_command = shlex.split(squeue_command or
+                                          os.environ.get("SQUEUE_COMMAND", "squeue"))
+        self.sacct_command = shlex.split(sacct_command or
+                                         os.environ.get("SACCT_COMMAND", "sacct"))
+        self.timeout = timeout
+
+    def _run(self, cmd):
+        try:
+            proc = subprocess.run(cmd, capture_output=True, text=True,
+                                  timeout=self.timeout)
+        except (OSError, subprocess.TimeoutExpired) as err:
+            raise SlurmCommandError(f"{cmd[0]} failed: {err}")
+        return proc
+
+    def queued(self, job_ids):
+        """
+        Return a dict of the state (PENDING, RUNNING, ...) of each of
+        job_ids still in the queue.
+        """
+        watched = set(job_ids)
+        states = {}
+        for batch in _batches(job_ids):
+            proc = self._run(self.squeue_command + [
+                "--noheader", "--format=%i %T", f"--jobs={','.join(batch)}"])
+            if proc.returncode != 0:
+                # some squeue versions reject a query with the id of a job
+                # they no longer know about, so ask about each job instead
+                if "Invalid job id" in proc.stderr:
+                    if len(batch) > 1:
+                        for job_id in batch:
+                            states.update(self.queued([job_id]))
+                    continue
+                raise SlurmCommandError(f"squeue failed: {proc.stderr.strip()}")
+            for line in proc.stdout.splitlines():
+                fields = line.split()
+                if len(fields) < 2:
+                    continue
+                # the tasks of an array job are listed as <job id>_<index>,
+                # or <job id>_[<indices>] while pending
+                job_id = fields[0]
+                if job_id not in watched:
+                    job_id = job_id.split("_")[0]
+                if job_id in watched:
+                    states[job_id] = fields[1]
+        return states
+
+    def accounting(self, job_ids):
+        """
+        Return a dict of the JobResult of each of job_ids known to sacct.
+        """
+        results = {}
+        for batch in _batches(job_ids):
+            proc = self._run(self.sacct_command + [
+                "--noheader", "--parsable2", "--format=JobID,State,ExitCode",
+                f"--jobs={','.join(batch)}"])
+            if proc.returncode != 0:
+                raise SlurmCommandError(f"sacct failed: {proc.stderr.strip()}")
+            for line in proc.stdout.splitlines():
+                fields = line.strip().split("|")
+                if len(fields) < 3 or "." in fields[0]:
+                    continue  # job steps, eg. 1234.batch
+                (job_id, state, exit_code) = fields[:3]
+                (code, _, signal) = exit_code.partition(":")
+                results[job_id] = JobResult(
+                    job_id,
+                    # eg. "CANCELLED by 1000"
+                    state.split()[0] if state else "UNKNOWN",
+                    int(code) if code.isdigit() else None,
+                    int(signal) if signal.isdigit() else None)
+        return results
+
+
+class JobWatcher:
+    """
+    Watches job_ids (strings, or ints) until they have left the queue.
+    """
+    def __init__(self, job_ids, commands=None, min_interval=2.0, max_interval=60.0,
+                 backoff=1.5, max_failures=5):
+        self.job_ids = [str(job_id) for job_id in job_ids]
+        self.commands = commands or SlurmCommands()
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.backoff = backoff
+        self.max_failures = max_failures
+        self.states = {}
+        self.num_queries = 0
+
+    def poll(self):
+        """
+        Query the queue once, returning the dict of the state of each job
+        still queued.
+        """
+        self.num_queries += 1
+        self.states = self.commands.queued(self.job_ids)
+        return self.states
+
+    def wait(self, timeout=None, on_change=None):
+        """
+        Wait until all the jobs have left the queue, then return their
+        JobResult, in the order of job_ids. Jobs unknown to sacct have an
+        UNKNOWN state.
+
+        Parameters:
+        - timeout (float): seconds to wait, or None to wait forever.
+        - on_change (callable): called with the dict of queued job states
+          every time it changes.
+
+        Raises TimeoutError if jobs are still queued after timeout seconds,
+        or SlurmCommandError if squeue fails max_failures times in a row.
+        """
+        deadline = (time.monotonic() + timeout) if timeout else None
+        interval = self.min_interval
+        previous = None
+        failures = 0
+        while True:
+            try:
+                states = self.poll()
+            except SlurmCommandError as err:
+                # eg. a busy controller timing out, try again later
+                failures += 1
+                if failures >= self.max_failures:
+                    raise
+                print(f"slurm_jobs.py - {err}, retrying", file=sys.stderr, flush=True)
+                interval = min(interval * self.backoff, self.max_interval)
+            else:
+                failures = 0
+                if states != previous:
+                    interval = self.min_interval
+                    if on_change is not None:
+                        on_change(states)
+                    previous = states
+                else:
+                    interval = min(interval * self.backoff, self.max_interval)
+                if not states:
+                    return self.results()
+            if deadline:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"{len(self.states)} job(s) still queued after "
+                                       f"{timeout} seconds")
+                interval = min(interval, remaining)
+            time.sleep(interval)
+
+    def results(self):
+        """
+        Return the JobResult of each job, as recorded by sacct.
+        """
+        # the accounting of jobs that just ended can lag behind the queue
+        for attempt in range(SACCT_RETRIES):
+            try:
+                accounting = self.commands.accounting(self.job_ids)
+            except SlurmCommandError as err:
+                print(f"slurm_jobs.py - {err}", file=sys.stderr, flush=True)
+                accounting = {}
+                break
+            if all(job_id in accounting and accounting[job_id].state not in
+                   ("PENDING", "RUNNING", "COMPLETING") for job_id in self.job_ids):
+                break
+            time.sleep(self.min_interval)
+        return [accounting.get(job_id, JobResult(job_id, "UNKNOWN", None, None))
+                for job_id in self.job_ids]
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("job_ids", nargs="+",
+                    help="Ids of the jobs to wait for, which can also be "
+                    "given as a single comma or space separated string.")
+    ap.add_argument("--timeout", type=float, default=None,
+                    help="Seconds to wait before giving up.")
+    ap.add_argument("--min-interval", type=float, default=2.0,
+                    help="Seconds between queries while jobs change state.")
+    ap.add_argument("--max-interval", type=float, default=60.0,
+                    help="Maximum seconds between queries.")
+    ap.add_argument("--squeue-command", default=None,
+                    help="Command run instead of squeue, eg. a fake for "
+                    "testing. Defaults to the SQUEUE_COMMAND env var.")
+    ap.add_argument("--sacct-command", default=None,
+                    help="Command run instead of sacct. Defaults to the "
+                    "SACCT_COMMAND env var.")
+    ap.add_argument("--json", action="store_true",
+                    help="Print the final state of the jobs as JSON.")
+    ap.add_argument("--fail-on-error", action="store_true",
+                    help="Exit with 1 if any job did not complete "
+                    "successfully.")
+    args = ap.parse_args()
+
+    job_ids = [job_id for arg in args.job_ids
+               for job_id in arg.replace(",", " ").split()]
+    watcher = JobWatcher(job_ids,
+                         SlurmCommands(args.squeue_command, args.sacct_command),
+                         min_interval=args.min_interval,
+                         max_interval=args.max_interval)
+
+    def report(states):
+        if states:
+            print(f"slurm_jobs.py - {len(states)} job(s) queued: "
+                  + " ".join(f"{job_id}={state}" for (job_id, state) in states.items()),
+                  flush=True)
+
+    try:
+        results = watcher.wait(timeout=args.timeout, on_change=report)
+    except (TimeoutError, SlurmCommandError) as err:
+        print(f"slurm_jobs.py: {err}", file=sys.stderr)
+        sys.exit(2)
+
+    if args.json:
+        print(json.dumps([job._asdict() for job in results], indent=2))
+    else:
+        for job in results:
+            print(f"{job.job_id} {job.state} exit_code={job.exit_code} signal={job.signal}")
+    failed = [job for job in results if job.state != "COMPLETED" or job.exit_code]
+    sys.exit(1 if (failed and args.fail_on_error) else 0)
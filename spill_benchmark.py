@@ -0,0 +1,490 @@
+# Copyright (c) 2026, NVIDIA CORPORATION.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Memory pressure and spilling benchmark.
+
+Runs workloads on datasets sized as a ratio of the memory of the cluster,
+from well within it to several times over, to show how the memory limits
+of the workers (--memory-limit, --device-memory-limit and the RMM pool size
+given by run-dask-process.sh) hold up under oversubscription:
+
+- persist: a synthetic dataset (see synthetic_data.py) is generated and
+  persisted, then every partition is read back by a reduction.
+- shuffle: the dataset is generated and shuffled on its first column, and
+  the result persisted.
+
+At each oversubscription ratio, the time of each round, the throughput
+(dataset bytes per second), the bytes spilled and unspilled by the workers
+and the mean latency of a spill and of an unspill are measured. Spilling is
+measured with the worker spill metrics of distributed (the "disk-write" and
+"disk-read" digests), so it is the spilling to disk in CPU mode; spilling
+from device to host memory by dask-cuda only shows in the timings.
+
+The knee of each workload is the largest ratio whose throughput stays
+within --collapse-fraction of the throughput of the smallest ratio: past
+it, performance collapses. Ratios above a round that timed out or failed
+are not run.
+
+With --device, the cluster of --scheduler-file is benchmarked with cudf
+datasets sized against the device memory limit of its workers. Otherwise a
+LocalCluster is started with --memory-limit per worker, spilling to disk,
+so the benchmark runs without GPUs.
+
+Results are written to --output-dir like the other benchmarks, as
+spill-benchmark.jsonl records for record-benchmarks.py, one per workload
+and ratio, with the per round measurements in spill-benchmark.csv and the
+knees in spill-benchmark-knees.json.
+
+Example usage, against a cluster started by run-dask-process.sh:
+
+python spill_benchmark.py --scheduler-file=$SCHEDULER_FILE --device \\
+                          --output-dir=latest/benchmarks/8-GPU
+
+or on a local CPU cluster:
+
+python spill_benchmark.py --n-workers=2 --memory-limit=512MiB --ratios=0.25,0.5,1,2
+"""
+
+from collections import defaultdict
+import json
+from pathlib import Path
+import time
+
+import numpy as np
+import pandas as pd
+
+from dask.distributed import Client, LocalCluster, wait
+from dask.utils import format_bytes, parse_bytes
+
+import synthetic_data
+import timing
+
+
+RESULTS_FILE_NAME = "spill-benchmark"
+WORKLOADS = ("persist", "shuffle")
+DEFAULT_RATIOS = (0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0)
+SCHEMA = {"key": "int64", "value": "float64", "payload": "float64"}
+# spill metrics of distributed, by their label
+SPILL_LABEL = "disk-write"
+UNSPILL_LABEL = "disk-read"
+# integer fields of the benchmark records
+COUNT_KEYS = ("rounds", "outliers", "workers_lost")
+
+
+def _spill_metrics(dask_worker):
+    """
+    Return the cumulative spill metrics of a worker, as a dict of
+    (label, unit) to value.
+    """
+    metrics = defaultdict(float)
+    for (key, value) in dask_worker.digests_total.items():
+        # eg. ("memory-monitor", "disk-write", "bytes") or
+        # ("execute", <span>, <prefix>, "disk-read", "seconds")
+        if isinstance(key, tuple) and len(key) >= 2 and key[-2] in (SPILL_LABEL, UNSPILL_LABEL):
+            metrics[f"{key[-2]}-{key[-1]}"] += value
+    return dict(metrics)
+
+
+def _worker_memory_limit(dask_worker, device=False):
+    """
+    Return the memory limit of a worker in bytes, its device memory limit
+    with device, or None if it has none.
+    """
+    if device:
+        data = dask_worker.data
+        # ProxifyHostFile, or the device buffer of DeviceHostFile
+        limit = getattr(data, "device_memory_limit", None)
+        if limit is None:
+            limit = getattr(getattr(data, "device_buffer", None), "n", None)
+        return int(limit) if limit else None
+    limit = dask_worker.memory_manager.memory_limit
+    return int(limit) if limit else None
+
+
+def cluster_memory(client, device=False):
+    """
+    Return the total memory limit of the workers of client, which is the
+    memory the oversubscription ratios are relative to.
+    """
+    limits = client.run(_worker_memory_limit, device=device)
+    if not limits or any(limit is None for limit in limits.values()):
+        raise RuntimeError("the workers have no memory limit, give one with --cluster-memory")
+    return sum(limits.values())
+
+
+def _snapshot(client):
+    # the metrics of each worker instance, which start over when a worker is
+    # restarted, eg. by its nanny after exceeding its memory limit
+    return client.run(lambda dask_worker: (dask_worker.id, _spill_metrics(dask_worker)))
+
+
+def _deltas(before, after):
+    """
+    Return the spill metrics accumulated between two snapshots, and the
+    number of workers that were restarted or lost in between.
+    """
+    totals = defaultdict(float)
+    for (address, (worker_id, metrics)) in after.items():
+        previous = before.get(address)
+        previous = previous[1] if previous and previous[0] == worker_id else {}
+        for (name, value) in metrics.items():
+            totals[name] += value - previous.get(name, 0.0)
+    after_ids = {worker_id for (worker_id, _) in after.values()}
+    lost = sum(1 for (worker_id, _) in before.values() if worker_id not in after_ids)
+    return totals, lost
+
+
+def _clear(client, timeout=60):
+    # wait for the workers to drop the data of the previous round, including
+    # what they spilled
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if not any(client.run(lambda dask_worker: len(dask_worker.data)).values()):
+            return
+        time.sleep(0.1)
+
+
+def run_workload(client, workload, n_rows, partitions_per_worker=4, backend="pandas",
+                 seed=42, timeout=None):
+    """
+    Run workload once on a dataset of n_rows rows, waiting for it to
+    complete.
+
+    Raises TimeoutError if it takes longer than timeout seconds, after
+    cancelling it.
+    """
+    ddf = synthetic_data.make_dataset(client, n_rows, schema=SCHEMA,
+                                      partitions_per_worker=partitions_per_worker,
+                                      seed=seed, backend=backend)
+    deadline = (time.monotonic() + timeout) if timeout else None
+
+    def remaining():
+        return max(deadline - time.monotonic(), 0) if deadline else None
+
+    if workload == "persist":
+        persisted = ddf.persist()
+        try:
+            wait(persisted, timeout=remaining())
+            # read every partition back, unspilling what was spilled
+            client.compute(persisted.sum()).result(timeout=remaining())
+        finally:
+            client.cancel(persisted)
+    elif workload == "shuffle":
+        shuffled = ddf.shuffle(on="key").persist()
+        try:
+            wait(shuffled, timeout=remaining())
+        finally:
+            client.cancel(shuffled)
+    else:
+        raise ValueError(f"unknown workload {workload}, expected one of {WORKLOADS}")
+
+
+def run_ratio(client, workload, ratio, memory, rounds=3, timeout=600, **workload_options):
+    """
+    Run workload for rounds on a dataset of ratio times memory bytes.
+
+    Returns:
+    list: one dict per round, with the duration, throughput, bytes spilled
+    and unspilled and their mean latencies, the number of workers lost (eg.
+    killed by their nanny for exceeding their memory limit), and the error
+    of the round if any. Stops at the first round which fails or takes longer than timeout
+    seconds.
+    """
+    target_bytes = int(ratio * memory)
+    n_rows = synthetic_data.rows_for_bytes(target_bytes, SCHEMA)
+    measurements = []
+    for round_index in range(rounds):
+        _clear(client)
+        before = _snapshot(client)
+        error = None
+        start = time.perf_counter()
+        try:
+            run_workload(client, workload, n_rows, timeout=timeout, **workload_options)
+        except Exception as err:
+            # eg. a timeout, or a worker killed for exceeding its memory limit
+            error = f"{type(err).__name__}: {err}"
+        duration = time.perf_counter() - start
+        (totals, workers_lost) = _deltas(before, _snapshot(client))
+        spills = totals[f"{SPILL_LABEL}-count"]
+        unspills = totals[f"{UNSPILL_LABEL}-count"]
+        measurements.append({
+            "workload": workload,
+            "ratio": ratio,
+            "round": round_index,
+            "dataset_bytes": target_bytes,
+            "memory_bytes": memory,
+            "duration": duration,
+            "gb_per_s": None if error else target_bytes / pow(1024, 3) / duration,
+            "spilled_bytes": totals[f"{SPILL_LABEL}-bytes"],
+            "unspilled_bytes": totals[f"{UNSPILL_LABEL}-bytes"],
+            "spill_latency": totals[f"{SPILL_LABEL}-seconds"] / spills if spills else None,
+            "unspill_latency": (totals[f"{UNSPILL_LABEL}-seconds"] / unspills
+                                if unspills else None),
+            "workers_lost": workers_lost,
+            "error": error,
+        })
+        if error is not None:
+            break
+    return measurements
+
+
+def sweep(client, workloads=WORKLOADS, ratios=DEFAULT_RATIOS, memory=None, device=False,
+          rounds=3, timeout=600, **workload_options):
+    """
+    Run each workload at each oversubscription ratio, in increasing order,
+    skipping the ratios above the first one that fails or times out.
+
+    Parameters:
+    - client (Client): client of the cluster to benchmark.
+    - workloads (list): names of WORKLOADS to run.
+    - ratios (list): dataset sizes, as ratios of memory.
+    - memory (int): bytes of memory of the cluster, defaults to the total
+      memory limit (device memory limit with device) of its workers.
+    - device (bool): use cudf datasets.
+    - rounds (int): rounds per workload and ratio.
+    - timeout (float): seconds after which a round is stopped.
+
+    Returns:
+    DataFrame: one row per round, see run_ratio().
+    """
+    memory = memory or cluster_memory(client, device)
+    workload_options.setdefault("backend", "cudf" if device else "pandas")
+    rows = []
+    for workload in workloads:
+        for ratio in sorted(ratios):
+            measurements = run_ratio(client, workload, ratio, memory, rounds, timeout,
+                                     **workload_options)
+            rows += measurements
+            if measurements[-1]["error"]:
+                print(f"{workload} at ratio {ratio}: {measurements[-1]['error']}, "
+                      "skipping larger ratios", flush=True)
+                # start the next workload on fresh workers, without what may
+                # be left of the failed round
+                try:
+                    client.restart()
+                except Exception as err:
+                    print(f"could not restart the workers: {err}", flush=True)
+                break
+    return pd.DataFrame(rows)
+
+
+def summarize(measurements):
+    """
+    Summarize the rounds of each workload and ratio.
+
+    Returns:
+    DataFrame: one row per workload and ratio with the timing statistics of
+    its rounds (see timing.summarize()), the median throughput, the median
+    bytes spilled and unspilled per round, the median spill and unspill
+    latencies, the workers lost over all rounds, and whether any round
+    failed. The medians are None, and the timing statistics missing, if no
+    round passed.
+    """
+    rows = []
+    for ((workload, ratio), group) in measurements.groupby(["workload", "ratio"], sort=True):
+        passed = group[group["error"].isna()]
+        row = {"workload": workload, "ratio": float(ratio),
+               "dataset_bytes": int(group["dataset_bytes"].iloc[0]),
+               "failed": len(passed) < len(group),
+               # failed rounds too, eg. the one whose worker was killed
+               "workers_lost": int(group["workers_lost"].sum())}
+        if not passed.empty:
+            row.update(timing.summarize(passed["duration"], reject_outliers=False))
+        for column in ("gb_per_s", "spilled_bytes", "unspilled_bytes",
+                       "spill_latency", "unspill_latency"):
+            values = pd.to_numeric(passed[column], errors="coerce").dropna()
+            row[column] = float(values.median()) if not values.empty else None
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def find_knees(summary, collapse_fraction=0.5):
+    """
+    Find where the throughput of each workload collapses.
+
+    Returns:
+    dict: workload to {"knee_ratio": the largest ratio whose throughput is
+    at least collapse_fraction of the throughput of the smallest ratio (and
+    of every smaller ratio), without failures or workers lost,
+    "collapse_ratio": the next ratio, None if there is none,
+    "baseline_gb_per_s": the throughput of the smallest ratio}.
+    """
+    knees = {}
+    for (workload, group) in summary.groupby("workload", sort=True):
+        group = group.sort_values("ratio")
+        missing = pd.Series(np.nan, index=group.index)
+        throughput = pd.to_numeric(group.get("gb_per_s", missing), errors="coerce")
+        # a ratio which failed, or killed workers, has collapsed whatever
+        # the throughput of its rounds
+        lost = pd.to_numeric(group.get("workers_lost", missing), errors="coerce").fillna(0) > 0
+        held = ((throughput >= collapse_fraction * throughput.iloc[0])
+                & ~group["failed"].astype(bool) & ~lost)
+        # the knee is before the first ratio that does not hold
+        collapsed = np.flatnonzero(~held.to_numpy())
+        first_collapse = collapsed[0] if len(collapsed) else len(group)
+        ratios = group["ratio"].tolist()
+        knees[workload] = {
+            "knee_ratio": ratios[first_collapse - 1] if first_collapse > 0 else None,
+            "collapse_ratio": ratios[first_collapse] if first_collapse < len(ratios) else None,
+            "baseline_gb_per_s": None if pd.isna(throughput.iloc[0]) else float(throughput.iloc[0]),
+        }
+    return knees
+
+
+def _to_json(value, key=None):
+    if isinstance(value, (np.integer, np.floating)):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return int(value) if key in COUNT_KEYS else value
+
+
+def to_records(summary, memory_limit_label=""):
+    """
+    Summarize the results as benchmark records for record-benchmarks.py, one
+    per workload and ratio.
+    """
+    records = []
+    suffix = f"-{memory_limit_label}" if memory_limit_label else ""
+    for row in summary.to_dict("records"):
+        name = f"spill_benchmark[{row['workload']}{suffix}-ratio={row['ratio']:g}]"
+        params = {"workload": row["workload"], "ratio": row["ratio"],
+                  "dataset_bytes": row["dataset_bytes"]}
+        if memory_limit_label:
+            params["memory_limit"] = memory_limit_label
+        if row["failed"] or pd.isna(row.get("median")):
+            records.append({"name": name, "status": "FAILED", "params": params})
+            continue
+        records.append({
+            "name": name,
+            "status": "PASSED",
+            "unit": "s",
+            "params": params,
+            "stats": {key: _to_json(row[key], key) for key in
+                      ("min", "median", "mean", "stddev", "p95", "p99",
+                       "ci_low", "ci_high", "rounds", "outliers")},
+            **{key: _to_json(row[key], key) for key in
+               ("gb_per_s", "spilled_bytes", "unspilled_bytes",
+                "spill_latency", "unspill_latency", "workers_lost")},
+        })
+    return records
+
+
+def write_results(measurements, summary, knees, output_dir, memory_limit_label=""):
+    """
+    Write the benchmark records as spill-benchmark.jsonl, the measurements
+    of every round as spill-benchmark.csv and the knees as
+    spill-benchmark-knees.json in output_dir.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with open(output_dir / (RESULTS_FILE_NAME + ".jsonl"), "w") as jsonl_file:
+        for record in to_records(summary, memory_limit_label):
+            jsonl_file.write(json.dumps(record) + "\n")
+    measurements.to_csv(output_dir / (RESULTS_FILE_NAME + ".csv"), index=False)
+    with open(output_dir / (RESULTS_FILE_NAME + "-knees.json"), "w") as knees_file:
+        json.dump(knees, knees_file, indent=2)
+
+
+def _float_list(value):
+    return [float(v) for v in value.split(",")]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scheduler-file", default=None,
+                    help="Benchmark the cluster described by this scheduler "
+                    "file. If not specified, a local CPU cluster is started.")
+    ap.add_argument("--n-workers", type=int, default=2,
+                    help="Workers in the local cluster.")
+    ap.add_argument("--memory-limit", default="1GiB",
+                    help="Memory limit of each worker of the local cluster.")
+    ap.add_argument("--device", action="store_true",
+                    help="Use cudf datasets, sized against the device memory "
+                    "limit of the workers.")
+    ap.add_argument("--cluster-memory", default=None,
+                    help="Memory the ratios are relative to, eg. 64GB, instead "
+                    "of the total memory limit of the workers.")
+    ap.add_argument("--workloads", default=",".join(WORKLOADS),
+                    help="Comma-separated workloads to run.")
+    ap.add_argument("--ratios", type=_float_list, default=list(DEFAULT_RATIOS),
+                    help="Comma-separated dataset sizes, as ratios of the "
+                    "cluster memory.")
+    ap.add_argument("--rounds", type=int, default=3,
+                    help="Rounds per workload and ratio.")
+    ap.add_argument("--partitions-per-worker", type=int, default=4,
+                    help="Partitions of the datasets per worker.")
+    ap.add_argument("--timeout", type=float, default=600,
+                    help="Seconds after which a round is stopped, and larger "
+                    "ratios skipped.")
+    ap.add_argument("--collapse-fraction", type=float, default=0.5,
+                    help="Fraction of the throughput of the smallest ratio "
+                    "below which performance has collapsed.")
+    ap.add_argument("--label", default=None,
+                    help="Label of the memory settings added to the benchmark "
+                    "names, eg. the DASK_DEVICE_MEMORY_LIMIT used. Defaults to "
+                    "--memory-limit for the local cluster.")
+    ap.add_argument("--output-dir", default=None,
+                    help="Directory to write the results files to.")
+    args = ap.parse_args()
+
+    workloads = [w for w in args.workloads.split(",") if w]
+    unknown = set(workloads) - set(WORKLOADS)
+    if unknown:
+        ap.error(f"unknown workload(s) {', '.join(sorted(unknown))}, expected {WORKLOADS}")
+
+    if args.scheduler_file:
+        cluster = None
+        client = Client(scheduler_file=args.scheduler_file)
+        label = args.label or ""
+    else:
+        if args.device:
+            ap.error("--device requires --scheduler-file")
+        cluster = LocalCluster(n_workers=args.n_workers, threads_per_worker=1,
+                               memory_limit=args.memory_limit, dashboard_address=":0")
+        client = Client(cluster)
+        label = args.label or args.memory_limit
+
+    with client:
+        memory = parse_bytes(args.cluster_memory) if args.cluster_memory else None
+        memory = memory or cluster_memory(client, args.device)
+        print(f"cluster memory {format_bytes(memory)}, ratios "
+              f"{', '.join(f'{r:g}' for r in sorted(args.ratios))}", flush=True)
+        measurements = sweep(client, workloads, args.ratios, memory, args.device,
+                             args.rounds, args.timeout,
+                             partitions_per_worker=args.partitions_per_worker)
+
+    if cluster is not None:
+        cluster.close()
+
+    summary = summarize(measurements)
+    knees = find_knees(summary, args.collapse_fraction)
+    for row in summary.to_dict("records"):
+        if row["failed"] and pd.isna(row.get("median")):
+            print(f"{row['workload']:8} ratio {row['ratio']:<5g} FAILED")
+            continue
+        latency = ("" if pd.isna(row["spill_latency"])
+                   else f", spill {row['spill_latency'] * 1e3:.1f} ms")
+        if row["workers_lost"]:
+            latency += f", {row['workers_lost']} worker(s) lost"
+        print(f"{row['workload']:8} ratio {row['ratio']:<5g} p50={row['median']:.3f} s "
+              f"{row['gb_per_s']:.3f} GB/s, spilled {format_bytes(row['spilled_bytes'])}, "
+              f"unspilled {format_bytes(row['unspilled_bytes'])}{latency}")
+    for (workload, knee) in knees.items():
+        print(f"{workload}: knee at ratio {knee['knee_ratio']}, collapses at "
+              f"{knee['collapse_ratio']}")
+
+    if args.output_dir:
+        write_results(measurements, summary, knees, args.output_dir, label)
@@ -0,0 +1,209 @@
+# Copyright (c) 2026, NVIDIA CORPORATION.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Synthetic benchmark datasets generated directly on the workers.
+
+Each partition is built by its own task from a generator seeded with
+(seed, partition id), so nothing is created on the client or on a single
+device and then moved around: datasets can be far larger than any one
+worker's memory, no rebalance is needed, and the same seed always gives the
+same data with a given backend. The cudf backend draws its partitions with
+cupy, directly on the worker's device.
+
+The schema maps column names to dtypes. Integer columns are keys drawn from
+[0, n_keys), uniformly or, with skew > 0, from a bounded power law where key
+k has a probability proportional to (k + 1) ** -skew, so low keys are "hot".
+n_keys defaults to the number of rows, capped to the values a column's dtype
+can hold. Float columns are uniform in [0, 1).
+
+Example usage:
+
+ddf = make_dataset(client, 2_000_000_000, schema={"src": "int32",
+                   "dst": "int32", "weight": "float32"},
+                   partitions_per_worker=4, skew=1.1, backend="cudf")
+ddf = ddf.persist()
+
+or from the command line, writing the dataset as Parquet:
+
+python synthetic_data.py --scheduler-file=$SCHEDULER_FILE --backend=cudf \
+                         --target-bytes=1TB --output-path=/data/synthetic
+"""
+
+import numpy as np
+import pandas as pd
+
+import dask.dataframe as dd
+from dask.utils import parse_bytes
+
+try:
+    import cudf
+except ImportError:
+    cudf = None
+
+try:
+    import cupy
+except ImportError:
+    cupy = None
+
+
+DEFAULT_SCHEMA = {"src": "int32", "dst": "int32", "eids": "int32"}
+
+
+def rows_for_bytes(target_bytes, schema=DEFAULT_SCHEMA):
+    """
+    Return the number of rows of schema that take up target_bytes, which
+    may be a string such as "100GB".
+    """
+    if isinstance(target_bytes, str):
+        target_bytes = parse_bytes(target_bytes)
+    row_bytes = sum(np.dtype(dtype).itemsize for dtype in schema.values())
+    return int(target_bytes // row_bytes)
+
+
+def partition_rows(n_rows, npartitions):
+    """
+    Return the number of rows of each of npartitions partitions of n_rows.
+    """
+    base, remainder = divmod(n_rows, npartitions)
+    return [base + (1 if i < remainder else 0) for i in range(npartitions)]
+
+
+def key_range(dtype):
+    """
+    Return the number of keys [0, n) an integer dtype can hold.
+    """
+    return int(np.iinfo(dtype).max) + 1
+
+
+def _skewed_keys(u, n_keys, skew, xp=np):
+    """
+    Map the uniform draws u to keys in [0, n_keys) from a bounded power law
+    with exponent skew, by inverting its continuous CDF. xp is the array
+    module of u, numpy or cupy.
+    """
+    if skew == 0:
+        return xp.floor(u * n_keys).astype(np.int64)
+    if skew == 1:
+        x = xp.power(n_keys + 1.0, u)
+    else:
+        exponent = 1.0 - skew
+        x = xp.power(u * (np.power(n_keys + 1.0, exponent) - 1.0) + 1.0, 1.0 / exponent)
+    return xp.minimum(xp.floor(x).astype(np.int64) - 1, n_keys - 1)
+
+
+def generate_partition(partition_info, schema, n_keys, skew, seed, backend):
+    """
+    Generate one partition. partition_info is (partition id, number of rows).
+    """
+    (partition_id, n_rows) = partition_info
+    seed_sequence = np.random.SeedSequence([seed, partition_id])
+    if backend == "cudf":
+        (xp, frame) = (cupy, cudf.DataFrame)
+        rng = cupy.random.RandomState(int(seed_sequence.generate_state(1)[0]))
+        uniform = lambda n: rng.random_sample(n, dtype=cupy.float64)
+    else:
+        (xp, frame) = (np, pd.DataFrame)
+        uniform = np.random.default_rng(seed_sequence).random
+    columns = {}
+    for (name, dtype) in schema.items():
+        dtype = np.dtype(dtype)
+        if dtype.kind in "iu":
+            # the default n_keys may exceed what the dtype can hold
+            column_keys = min(n_keys, key_range(dtype))
+            columns[name] = _skewed_keys(uniform(n_rows), column_keys, skew, xp).astype(dtype)
+        elif dtype.kind == "f":
+            columns[name] = uniform(n_rows).astype(dtype)
+        else:
+            raise ValueError(f"unsupported dtype for column {name}: {dtype}")
+    return frame(columns)
+
+
+def make_dataset(client, n_rows, schema=DEFAULT_SCHEMA, partitions_per_worker=1,
+                 n_keys=None, skew=0.0, seed=42, backend="pandas"):
+    """
+    Return a dask dataframe of n_rows rows of schema whose partitions are
+    generated on the workers when it is computed or persisted.
+
+    Parameters:
+    - client (Client): client of the cluster, used to count workers.
+    - n_rows (int): total number of rows, see rows_for_bytes().
+    - schema (dict): column name to dtype.
+    - partitions_per_worker (int): partitions to create per worker.
+    - n_keys (int): number of distinct keys in integer columns, defaults to
+      n_rows capped to what each column's dtype can hold.
+    - skew (float): power law exponent of integer keys, 0 is uniform.
+    - seed (int): seed of the per-partition generators.
+    - backend (str): "pandas" or "cudf".
+    """
+    if backend == "cudf" and (cudf is None or cupy is None):
+        raise RuntimeError("the cudf backend requires cudf and cupy")
+    for (name, dtype) in schema.items():
+        dtype = np.dtype(dtype)
+        if n_keys and dtype.kind in "iu" and n_keys > key_range(dtype):
+            raise ValueError(f"n_keys={n_keys:,} does not fit column {name} of dtype {dtype}")
+    n_workers = len(client.scheduler_info(n_workers=-1)["workers"])
+    npartitions = max(n_workers * partitions_per_worker, 1)
+    n_keys = n_keys or max(n_rows, 1)
+
+    meta = generate_partition((0, 0), schema, n_keys, skew, seed, backend)
+    partitions = list(enumerate(partition_rows(n_rows, npartitions)))
+    return dd.from_map(generate_partition, partitions, schema=schema,
+                       n_keys=n_keys, skew=skew, seed=seed, backend=backend,
+                       meta=meta, label="synthetic-data", enforce_metadata=False)
+
+
+def _parse_schema(value):
+    return dict(column.split(":") for column in value.split(","))
+
+
+if __name__ == "__main__":
+    import argparse
+    from dask.distributed import Client, LocalCluster
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scheduler-file", default=None,
+                    help="Generate on the cluster described by this "
+                    "scheduler file. If not specified, a local CPU cluster "
+                    "is started.")
+    ap.add_argument("--backend", choices=("pandas", "cudf"), default="pandas")
+    size = ap.add_mutually_exclusive_group(required=True)
+    size.add_argument("--rows", type=int, help="Number of rows.")
+    size.add_argument("--target-bytes",
+                      help="Dataset size, eg. 500GB, instead of --rows.")
+    ap.add_argument("--schema", type=_parse_schema,
+                    default=DEFAULT_SCHEMA,
+                    help="Comma-separated name:dtype columns, eg. "
+                    "src:int32,dst:int32,weight:float32.")
+    ap.add_argument("--partitions-per-worker", type=int, default=1)
+    ap.add_argument("--n-keys", type=int, default=None,
+                    help="Distinct keys in integer columns, defaults to the "
+                    "number of rows.")
+    ap.add_argument("--skew", type=float, default=0.0,
+                    help="Power law exponent of integer keys, 0 is uniform.")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--output-path", required=True,
+                    help="Directory to write the dataset to as Parquet.")
+    args = ap.parse_args()
+
+    if args.scheduler_file:
+        client = Client(scheduler_file=args.scheduler_file)
+    else:
+        client = Client(LocalCluster(dashboard_address=":0"))
+
+    with client:
+        n_rows = args.rows or rows_for_bytes(args.target_bytes, args.schema)
+        ddf = make_dataset(client, n_rows, args.schema, args.partitions_per_worker,
+                           args.n_keys, args.skew, args.seed, args.backend)
+        ddf.to_parquet(args.output_path, write_index=False)
+        print(f"wrote {n_rows:,} rows in {ddf.npartitions} partitions to "
+              f"{args.output_path}")
@@ -0,0 +1,365 @@
+# Copyright (c) 2026, NVIDIA CORPORATION.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Cluster telemetry sampler.
+
+Records per-worker resource metrics while benchmarks run, so a change in a
+nightly number can be traced to memory pressure, spilling or communication.
+
+Samples come from the metrics each worker already sends the scheduler with
+its heartbeat, read with a single scheduler_info() call per interval: the
+workers do no extra work, and a worker row is only written when its
+heartbeat is newer than the last one recorded, which keeps the time series
+compact. Each row has:
+
+time, worker, cpu, host_memory, managed_bytes, spilled_bytes, device_memory,
+tasks_executing, tasks_ready, tasks_waiting, tasks_flight, tasks_memory,
+incoming_bytes, outgoing_bytes, incoming_transfers, outgoing_transfers,
+net_read_bps, net_write_bps
+
+where spilled_bytes is data spilled to disk, device_memory is only set on
+workers reporting GPU metrics, incoming/outgoing_bytes are the bytes in
+flight between workers, *_transfers are the cumulative number of transfers
+and net_*_bps is the host network throughput (which does not include RDMA
+traffic over UCX).
+
+Benchmark windows are recorded as (name, start, end) marks, so each
+benchmark can be linked to the part of the time series it covers. Both are
+written to the benchmark run directory, eg. latest/benchmarks/8-GPU:
+
+- telemetry.csv: the time series.
+- telemetry-marks.csv: the benchmark windows.
+
+Example usage, alongside a benchmark run:
+
+python telemetry.py --scheduler-file=$SCHEDULER_FILE \
+                    --output-dir=latest/benchmarks/8-GPU --interval=1 &
+pytest -p telemetry --telemetry-dir=latest/benchmarks/8-GPU ...
+kill %1
+
+or from Python:
+
+with telemetry.TelemetrySampler(client, output_dir) as sampler:
+    with sampler.mark("bench_bfs[scale_20]"):
+        run_bfs()
+"""
+
+from contextlib import contextmanager
+import csv
+from pathlib import Path
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+
+TELEMETRY_FILE_NAME = "telemetry.csv"
+MARKS_FILE_NAME = "telemetry-marks.csv"
+
+COLUMNS = (
+    "time", "worker", "cpu", "host_memory", "managed_bytes", "spilled_bytes",
+    "device_memory", "tasks_executing", "tasks_ready", "tasks_waiting",
+    "tasks_flight", "tasks_memory", "incoming_bytes", "outgoing_bytes",
+    "incoming_transfers", "outgoing_transfers", "net_read_bps", "net_write_bps",
+)
+MARK_COLUMNS = ("name", "start", "end")
+
+
+def _metrics_to_row(address, worker_info):
+    """
+    Flatten the heartbeat metrics of a worker, as returned by
+    scheduler_info(), to a row of COLUMNS.
+    """
+    metrics = worker_info.get("metrics", {})
+    tasks = metrics.get("task_counts", {})
+    transfer = metrics.get("transfer", {})
+    net = metrics.get("host_net_io", {})
+    gpu = metrics.get("gpu") or {}
+    return (
+        round(metrics.get("time", time.time()), 3),
+        worker_info.get("name", address),
+        metrics.get("cpu"),
+        metrics.get("memory"),
+        metrics.get("managed_bytes"),
+        metrics.get("spilled_bytes", {}).get("disk"),
+        gpu.get("memory-used"),
+        tasks.get("executing", 0) + tasks.get("long-running", 0),
+        tasks.get("ready", 0) + tasks.get("constrained", 0),
+        tasks.get("waiting", 0),
+        tasks.get("flight", 0),
+        tasks.get("memory", 0),
+        transfer.get("incoming_bytes"),
+        transfer.get("outgoing_bytes"),
+        transfer.get("incoming_count_total"),
+        transfer.get("outgoing_count_total"),
+        int(net.get("read_bps", 0)),
+        int(net.get("write_bps", 0)),
+    )
+
+
+def _append_rows(path, columns, rows):
+    """
+    Append rows to the CSV file at path, writing the header first if the
+    file is new.
+    """
+    path = Path(path)
+    is_new = not path.exists()
+    with open(path, "a", newline="") as csv_file:
+        writer = csv.writer(csv_file)
+        if is_new:
+            writer.writerow(columns)
+        writer.writerows(rows)
+
+
+def append_mark(output_dir, name, start, end):
+    """
+    Record that benchmark name ran from start to end (time.time() values)
+    in the marks file of output_dir.
+    """
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    _append_rows(Path(output_dir) / MARKS_FILE_NAME, MARK_COLUMNS,
+                 [(name, round(start, 3), round(end, 3))])
+
+
+@contextmanager
+def benchmark_window(output_dir, name):
+    """
+    Context manager recording the time spent in its body as a mark for
+    benchmark name, for processes that do not run the sampler themselves.
+    """
+    start = time.time()
+    try:
+        yield
+    finally:
+        append_mark(output_dir, name, start, time.time())
+
+
+class TelemetrySampler:
+    """
+    Samples the worker metrics of the cluster of client every interval
+    seconds in a background thread, appending them to telemetry.csv in
+    output_dir.
+    """
+    def __init__(self, client, output_dir, interval=1.0):
+        self.client = client
+        self.output_dir = Path(output_dir)
+        self.interval = interval
+        self._last_seen = {}
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def sample(self):
+        """
+        Take a single sample, returning the number of worker rows written.
+        """
+        workers = self.client.scheduler_info(n_workers=-1)["workers"]
+        rows = []
+        for (address, info) in workers.items():
+            heartbeat = info.get("metrics", {}).get("time")
+            if heartbeat is not None and self._last_seen.get(address) == heartbeat:
+                continue  # no new heartbeat since the last sample
+            self._last_seen[address] = heartbeat
+            rows.append(_metrics_to_row(address, info))
+        if rows:
+            _append_rows(self.output_dir / TELEMETRY_FILE_NAME, COLUMNS, rows)
+        return len(rows)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            started = time.perf_counter()
+            try:
+                self.sample()
+            except Exception as err:
+                # a missed sample must never fail the benchmark being observed
+                print(f"telemetry.py - sample failed: {err}", flush=True)
+            self._stop_event.wait(max(self.interval - (time.perf_counter() - started), 0))
+
+    def start(self):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="telemetry-sampler",
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def mark(self, name):
+        """
+        Context manager recording its body as the window of benchmark name.
+        """
+        return benchmark_window(self.output_dir, name)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+
+def read_telemetry(output_dir):
+    """
+    Return the time series and marks in output_dir as two DataFrames, either
+    of which is None if its file does not exist.
+    """
+    output_dir = Path(output_dir)
+    telemetry_file = output_dir / TELEMETRY_FILE_NAME
+    marks_file = output_dir / MARKS_FILE_NAME
+    telemetry_df = pd.read_csv(telemetry_file) if telemetry_file.exists() else None
+    marks_df = pd.read_csv(marks_file) if marks_file.exists() else None
+    return telemetry_df, marks_df
+
+
+def summarize_window(telemetry_df, start, end):
+    """
+    Summarize the resource usage of the cluster between start and end.
+
+    Returns:
+    dict: the number of samples, the peak host, device, managed and spilled
+    memory of any single worker, the transfers between workers and the host
+    network bytes read and written by all workers (estimated from the
+    sampled throughput) during the window. Values that were not reported
+    are None.
+    """
+    window = telemetry_df[(telemetry_df["time"] >= start) & (telemetry_df["time"] <= end)]
+    summary = {"samples": len(window), "workers": int(window["worker"].nunique())}
+
+    def peak(column):
+        value = window[column].max()
+        return None if pd.isna(value) else int(value)
+
+    for column in ("host_memory", "device_memory", "managed_bytes", "spilled_bytes"):
+        summary["peak_" + column] = peak(column)
+
+    transfers = window.groupby("worker")["incoming_transfers"].agg(["min", "max"])
+    summary["transfers"] = int((transfers["max"] - transfers["min"]).sum()) if len(window) else 0
+
+    # integrate each worker's throughput over the time between its samples
+    for (column, key) in (("net_read_bps", "net_read_bytes"),
+                          ("net_write_bps", "net_write_bytes")):
+        total = 0.0
+        for (_, samples) in window.groupby("worker"):
+            times = samples["time"].to_numpy()
+            rates = samples[column].to_numpy(dtype=float)
+            total += float(np.sum(rates[1:] * np.diff(times)))
+        summary[key] = int(total)
+    return summary
+
+
+def write_profiles(run_dir, dest, name_prefix="./"):
+    """
+    Write the part of the time series in run_dir covered by each benchmark
+    mark to dest/<benchmark>.csv, replacing the profiles of a previous run.
+
+    Parameters:
+    - run_dir (str): the benchmark run directory containing telemetry.csv
+      and telemetry-marks.csv.
+    - dest (str): the directory to write the per-benchmark profiles in.
+    - name_prefix (str): removed from the start of mark names, to match the
+      benchmark names shown in the reports.
+
+    Returns:
+    dict: benchmark name to the summarize_window() of its latest mark, empty
+    if run_dir has no telemetry.
+    """
+    telemetry_df, marks_df = read_telemetry(run_dir)
+    dest = Path(dest)
+    if dest.exists():
+        for old_profile in dest.glob("*.csv"):
+            old_profile.unlink()
+    if telemetry_df is None or marks_df is None:
+        return {}
+
+    dest.mkdir(parents=True, exist_ok=True)
+    summaries = {}
+    for mark in marks_df.itertuples(index=False):
+        name = mark.name
+        if name_prefix and name.startswith(name_prefix):
+            name = name[len(name_prefix):]
+        window = telemetry_df[(telemetry_df["time"] >= mark.start) &
+                              (telemetry_df["time"] <= mark.end)]
+        window.to_csv(dest / (name + ".csv"), index=False)
+        summaries[name] = summarize_window(telemetry_df, mark.start, mark.end)
+    return summaries
+
+
+################################################################################
+# pytest plugin, enabled with: pytest -p telemetry --telemetry-dir=<run dir>
+
+def pytest_addoption(parser):
+    parser.addoption("--telemetry-dir", default=None,
+                     help="Record the window of each test as a telemetry "
+                     "mark in this directory.")
+
+
+def pytest_runtest_call(item):
+    output_dir = item.config.getoption("--telemetry-dir")
+    if output_dir:
+        item._telemetry_start = time.time()
+
+
+def pytest_runtest_teardown(item):
+    start = getattr(item, "_telemetry_start", None)
+    if start is not None:
+        append_mark(item.config.getoption("--telemetry-dir"), item.name, start, time.time())
+
+
+################################################################################
+
+if __name__ == "__main__":
+    import argparse
+    import signal
+
+    from dask.distributed import Client
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--output-dir", required=True,
+                    help="Benchmark run directory to write the telemetry to, "
+                    "or to read it from with --summary.")
+    ap.add_argument("--scheduler-file", default=None,
+                    help="Sample the cluster described by this scheduler file.")
+    ap.add_argument("--interval", type=float, default=1.0,
+                    help="Seconds between samples.")
+    ap.add_argument("--duration", type=float, default=None,
+                    help="Stop after this many seconds instead of when "
+                    "interrupted.")
+    ap.add_argument("--summary", action="store_true",
+                    help="Print the resource usage of each recorded "
+                    "benchmark window instead of sampling.")
+    args = ap.parse_args()
+
+    if args.summary:
+        telemetry_df, marks_df = read_telemetry(args.output_dir)
+        if telemetry_df is None or marks_df is None:
+            raise SystemExit(f"no telemetry in {args.output_dir}")
+        for mark in marks_df.itertuples(index=False):
+            print(mark.name, summarize_window(telemetry_df, mark.start, mark.end))
+        raise SystemExit(0)
+
+    if not args.scheduler_file:
+        ap.error("--scheduler-file is required to sample")
+
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stop_event.set())
+
+    with Client(scheduler_file=args.scheduler_file) as client, \
+         TelemetrySampler(client, args.output_dir, args.interval):
+        print(f"telemetry.py - sampling every {args.interval} seconds to "
+              f"{Path(args.output_dir) / TELEMETRY_FILE_NAME}", flush=True)
+        stop_event.wait(args.duration)
@@ -0,0 +1,182 @@
+# Copyright (c) 2026, NVIDIA CORPORATION.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Checks that the bash parsers generated by getopt.py --compile, and the
+getopt_parse function of functions.sh, give the same output and exit code
+as running getopt.py.
+
+Run with: python -m pytest test_getopt.py
+"""
+
+import os
+from pathlib import Path
+import subprocess
+import sys
+
+import pytest
+
+import getopt
+
+
+TOOLS_DIR = Path(__file__).resolve().parent
+GETOPT_PY = str(TOOLS_DIR / "getopt.py")
+
+SPEC = "packages:str,from-conda,from-pip,baz::int,level:int,foo-bar::"
+
+ARGS = [
+    [],
+    ["--packages=a,b", "--level=3"],
+    ["--packages", "a", "--level", "3"],
+    ["--packages", "a", "--level", "3", "--from-conda"],
+    ["--packages", "a", "--level", "3", "--from-conda", "--from-pip"],
+    ["--packages", "a", "--level", "3", "--from-conda", "--from-conda"],
+    ["--packages", "a", "--packages", "b", "--level", "3"],
+    # unambiguous prefixes, and ambiguous ones
+    ["--pack=a", "--lev", "3", "--from-c"],
+    ["--packages", "a", "--level", "3", "--from"],
+    ["--packages", "a", "--level", "3", "--f", "x"],
+    ["--packages", "a", "--level", "3", "--fo", "x"],
+    # values that may look like options
+    ["--packages=-x", "--level=3"],
+    ["--packages", "-x", "--level", "3"],
+    ["--packages", "-5", "--level", "-3"],
+    ["--packages", "-.5", "--level", "3"],
+    ["--packages", "-x y", "--level", "3"],
+    ["--packages", "--level y", "--level", "3"],
+    ["--packages", "-", "--level", "3"],
+    ["--packages", "", "--level", "3"],
+    ["--packages=", "--level", "3"],
+    ["--packages", "a=b", "--level", "3"],
+    ["--packages", "--level", "3"],
+    ["--packages", "-h", "--level", "3"],
+    ["--packages", "a", "--level"],
+    # int validation and normalization
+    ["--packages", "a", "--level", "0x10"],
+    ["--packages", "a", "--level", "1.0"],
+    ["--packages", "a", "--level", ""],
+    ["--packages", "a", "--level", " 1_000 "],
+    ["--packages", "a", "--level", "1__0"],
+    ["--packages", "a", "--level", "_1"],
+    ["--packages", "a", "--level", "+007"],
+    ["--packages", "a", "--level", "-0"],
+    ["--packages", "a", "--level", "000"],
+    ["--packages", "a", "--level", "123456789012345678901234567890"],
+    ["--packages", "a", "--level", "3", "--baz", "x"],
+    ["--packages", "a", "--level", "3", "--baz", "-12"],
+    # optional arguments
+    ["--packages", "a", "--level", "3", "--foo-bar", "spaces in value"],
+    ["--packages", "a", "--level", "3", "--foo-bar="],
+    # flags with values, positionals, "--" and unknown options
+    ["--packages", "a", "--level", "3", "--from-conda=1"],
+    ["--packages", "a", "--level", "3", "extra"],
+    ["--packages", "a", "--level", "3", "--"],
+    ["--", "--packages", "a", "--level", "3"],
+    ["--packages", "a", "--level", "3", "--nope"],
+    ["--packages", "a", "--level", "3", "-x"],
+    ["--packages", "a", "--level", "3", "-5"],
+    # help
+    ["-h"],
+    ["--help"],
+    ["--he"],
+    ["--packages", "a", "--level", "3", "--help=1"],
+    ["-hx"],
+]
+
+
+def run_getopt_py(prog_name, spec, args):
+    result = subprocess.run([sys.executable, GETOPT_PY, prog_name, spec] + args,
+                            capture_output=True, text=True)
+    return result.stdout, result.returncode
+
+
+def run_compiled(parser_file, prog_name, args):
+    result = subprocess.run(["bash", "-c", 'source "$1"; shift; getopt_compiled "$@"',
+                             "bash", str(parser_file), prog_name] + args,
+                            capture_output=True, text=True)
+    return result.stdout, result.returncode
+
+
+@pytest.fixture(scope="module")
+def parser_file(tmp_path_factory):
+    path = tmp_path_factory.mktemp("getopt") / "parser.sh"
+    path.write_text(getopt.compile_to_bash(SPEC))
+    return path
+
+
+@pytest.mark.parametrize("args", ARGS, ids=[" ".join(a) or "<none>" for a in ARGS])
+def test_compiled_parser_matches_getopt_py(parser_file, args):
+    assert run_compiled(parser_file, "prog", args) == run_getopt_py("prog", SPEC, args)
+
+
+@pytest.mark.parametrize("spec,args", [
+    ("a", []),
+    ("a", ["--a"]),
+    ("a,ab", ["--a"]),
+    ("a,ab", ["--ab"]),
+    ("name::", []),
+    ("name::", ["--n", "x"]),
+    ("count::int", ["--count", "7"]),
+])
+def test_other_specs(tmp_path, spec, args):
+    path = tmp_path / "parser.sh"
+    path.write_text(getopt.compile_to_bash(spec))
+    assert run_compiled(path, "prog", args) == run_getopt_py("prog", spec, args)
+
+
+def test_failures_only_write_to_stderr(parser_file):
+    result = subprocess.run(["bash", "-c", 'source "$1"; getopt_compiled prog --nope',
+                             "bash", str(parser_file)], capture_output=True, text=True)
+    assert result.returncode == 1
+    assert result.stdout == ""
+    assert "prog: error: unrecognized arguments: --nope" in result.stderr
+
+
+def test_uncompilable_types():
+    with pytest.raises(RuntimeError):
+        getopt.compile_to_bash("ratio:float")
+    with pytest.raises(RuntimeError):
+        getopt.compile_to_bash("a,,b")
+
+
+def _getopt_parse(tmp_path, spec, args, path=None):
+    env = dict(os.environ, RAPIDS_MG_TOOLS_DIR=str(TOOLS_DIR),
+               GETOPT_CACHE_DIR=str(tmp_path / "cache"))
+    if path is not None:
+        env["PATH"] = path
+    result = subprocess.run(["bash", "-c", 'source "$1/functions.sh"; shift; getopt_parse "$@"',
+                             "bash", str(TOOLS_DIR), "prog", spec] + args,
+                            capture_output=True, text=True, env=env)
+    return result.stdout, result.returncode
+
+
+def test_getopt_parse_caches_parsers(tmp_path):
+    args = ["--packages", "a", "--level", "3", "--from-pip"]
+    expected = run_getopt_py("prog", SPEC, args)
+    assert _getopt_parse(tmp_path, SPEC, args) == expected
+    assert len(list((tmp_path / "cache").glob("*.sh"))) == 1
+
+    # later calls must not start python at all
+    fake_bin = tmp_path / "bin"
+    fake_bin.mkdir()
+    fake_python = fake_bin / "python3"
+    fake_python.write_text("#!/bin/sh\nexit 99\n")
+    fake_python.chmod(0o755)
+    path = f"{fake_bin}:{os.environ['PATH']}"
+    assert _getopt_parse(tmp_path, SPEC, args, path=path) == expected
+    assert _getopt_parse(tmp_path, SPEC, ["--nope"], path=path) == ("", 1)
+
+
+def test_getopt_parse_falls_back_to_getopt_py(tmp_path):
+    spec = "ratio:float"
+    args = ["--ratio", "0.5"]
+    assert _getopt_parse(tmp_path, spec, args) == run_getopt_py("prog", spec, args)
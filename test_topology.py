@@ -0,0 +1,179 @@
+# Copyright (c) 2026, NVIDIA CORPORATION.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Checks the topology discovery and worker placement of topology.py, and the
+worker commands ClusterLauncher derives from them, on a hand made two
+socket node:
+
+- socket 0 (NUMA node 0, CPUs 0-15): GPUs 0 and 1 and the Infiniband NIC
+  ib0 behind the same PCIe switch, and eth0 on the same root complex.
+- socket 1 (NUMA node 1, CPUs 16-31): GPUs 2 and 3 behind a switch, and
+  the RoCE NIC eth1 on another root complex of the same NUMA node.
+
+Run with: python -m pytest test_topology.py
+"""
+
+import pytest
+
+import topology
+from cluster_launcher import ClusterLauncher
+
+
+SWITCH0 = "pci0000:00/0000:00:01.0/0000:01:00.0"
+SWITCH1 = "pci0000:80/0000:80:01.0/0000:81:00.0"
+# (PCI path below /sys/devices, NUMA node, vendor, class)
+DEVICES = [
+    (f"{SWITCH0}/0000:02:00.0/0000:03:00.0", 0, "0x10de", "0x030200"),
+    (f"{SWITCH0}/0000:02:01.0/0000:04:00.0", 0, "0x10de", "0x030200"),
+    (f"{SWITCH0}/0000:02:02.0/0000:05:00.0", 0, "0x15b3", "0x020700"),
+    ("pci0000:00/0000:00:1c.0/0000:06:00.0", 0, "0x8086", "0x020000"),
+    (f"{SWITCH1}/0000:82:00.0/0000:83:00.0", 1, "0x10de", "0x030200"),
+    (f"{SWITCH1}/0000:82:01.0/0000:84:00.0", 1, "0x10de", "0x030200"),
+    ("pci0000:c0/0000:c0:01.0/0000:c1:00.0", 1, "0x8086", "0x020000"),
+]
+# (name, index of its device, ARPHRD type, RDMA capable, speed)
+INTERFACES = [
+    ("ib0", 2, "32", True, 200000),
+    ("eth0", 3, "1", False, 10000),
+    ("eth1", 6, "1", True, 100000),
+]
+NUMA_CPUS = {0: "0-15", 1: "16-31"}
+UUIDS = {"0000:03:00.0": "GPU-aaaa0000", "0000:04:00.0": "GPU-aaaa1111",
+         "0000:83:00.0": "GPU-bbbb0000", "0000:84:00.0": "GPU-bbbb1111"}
+
+
+@pytest.fixture(scope="module")
+def node(tmp_path_factory):
+    """
+    Return the (sysfs root, procfs root) of the node.
+    """
+    root = tmp_path_factory.mktemp("node")
+    (sys_dir, proc_dir) = (root / "sys", root / "proc")
+    for (numa_node, cpulist) in NUMA_CPUS.items():
+        node_dir = sys_dir / "devices" / "system" / "node" / f"node{numa_node}"
+        node_dir.mkdir(parents=True)
+        (node_dir / "cpulist").write_text(cpulist + "\n")
+    (sys_dir / "bus" / "pci" / "devices").mkdir(parents=True)
+    device_dirs = []
+    for (path, numa_node, vendor, pci_class) in DEVICES:
+        device_dir = sys_dir / "devices" / path
+        device_dir.mkdir(parents=True)
+        (device_dir / "numa_node").write_text(f"{numa_node}\n")
+        (device_dir / "local_cpulist").write_text(NUMA_CPUS[numa_node] + "\n")
+        (device_dir / "vendor").write_text(vendor + "\n")
+        (device_dir / "class").write_text(pci_class + "\n")
+        (sys_dir / "bus" / "pci" / "devices" / device_dir.name).symlink_to(device_dir)
+        device_dirs.append(device_dir)
+    for (name, device, arphrd_type, rdma, speed) in INTERFACES:
+        net_dir = sys_dir / "class" / "net" / name
+        net_dir.mkdir(parents=True)
+        (net_dir / "device").symlink_to(device_dirs[device])
+        (net_dir / "type").write_text(arphrd_type + "\n")
+        (net_dir / "operstate").write_text("up\n")
+        (net_dir / "speed").write_text(f"{speed}\n")
+        if rdma:
+            (device_dirs[device] / "infiniband" / f"mlx5_{name}").mkdir(parents=True)
+    # a virtual interface, which is never placed
+    (sys_dir / "devices" / "virtual" / "net" / "lo").mkdir(parents=True)
+    (sys_dir / "class" / "net" / "lo").symlink_to(sys_dir / "devices" / "virtual" / "net" / "lo")
+    for (pci, uuid) in UUIDS.items():
+        gpu_dir = proc_dir / "driver" / "nvidia" / "gpus" / pci
+        gpu_dir.mkdir(parents=True)
+        (gpu_dir / "information").write_text(f"Model: \t\t Fake GPU\nGPU UUID: \t {uuid}\n")
+    return (str(sys_dir), str(proc_dir))
+
+
+def placed(node, protocol="tcp", visible_devices=None):
+    placement = topology.place_workers(topology.discover(*node), protocol, visible_devices)
+    return placement["interface"], [(w["gpu"], w["device"], w["interface"], w["distance"], w["cpus"])
+                                    for w in placement["workers"]]
+
+
+def test_cpulists():
+    assert topology.parse_cpulist("0-3,8,10-11\n") == [0, 1, 2, 3, 8, 10, 11]
+    assert topology.parse_cpulist("") == []
+    assert topology.format_cpulist([11, 0, 1, 2, 3, 8, 10, 2]) == "0-3,8,10-11"
+    assert topology.format_cpulist([]) == ""
+
+
+def test_discover(node):
+    discovered = topology.discover(*node)
+    assert discovered["numa_nodes"] == {0: list(range(16)), 1: list(range(16, 32))}
+    assert [(g["index"], g["pci"], g["uuid"], g["numa_node"]) for g in discovered["gpus"]] == [
+        (0, "0000:03:00.0", "GPU-aaaa0000", 0), (1, "0000:04:00.0", "GPU-aaaa1111", 0),
+        (2, "0000:83:00.0", "GPU-bbbb0000", 1), (3, "0000:84:00.0", "GPU-bbbb1111", 1)]
+    assert [(i["name"], i["rdma"], i["infiniband"]) for i in discovered["interfaces"]] == [
+        ("eth0", False, False), ("eth1", True, False), ("ib0", True, True)]
+
+
+def test_distances(node):
+    discovered = topology.discover(*node)
+    interfaces = {i["name"]: i for i in discovered["interfaces"]}
+    distances = [{name: topology.distance(gpu, interface)
+                  for (name, interface) in interfaces.items()} for gpu in discovered["gpus"]]
+    assert distances[0] == {"ib0": "PIX", "eth0": "PHB", "eth1": "SYS"}
+    assert distances[3] == {"ib0": "SYS", "eth0": "SYS", "eth1": "NODE"}
+
+
+def test_place_tcp(node):
+    assert placed(node) == ("ib0", [(0, "0", "ib0", "PIX", "0-15"), (1, "1", "ib0", "PIX", "0-15"),
+                                    (2, "2", "eth1", "NODE", "16-31"),
+                                    (3, "3", "eth1", "NODE", "16-31")])
+
+
+def test_place_ucxib(node):
+    # only RDMA capable interfaces
+    assert placed(node, "ucxib")[1] == [(0, "0", "ib0", "PIX", "0-15"),
+                                        (1, "1", "ib0", "PIX", "0-15"),
+                                        (2, "2", "eth1", "NODE", "16-31"),
+                                        (3, "3", "eth1", "NODE", "16-31")]
+
+
+def test_place_sys(node):
+    discovered = topology.discover(*node)
+    discovered["interfaces"] = [i for i in discovered["interfaces"] if i["name"] != "eth1"]
+    # across the sockets, the fastest interface
+    workers = topology.place_workers(discovered, "tcp")["workers"]
+    assert [(w["interface"], w["distance"], w["cpus"]) for w in workers[2:]] == [
+        ("ib0", "SYS", "16-31"), ("ib0", "SYS", "16-31")]
+
+
+@pytest.mark.parametrize("visible_devices, expected", [
+    ("3,1", [(3, "3"), (1, "1")]),
+    ("GPU-bbbb1111, GPU-aaaa0", [(3, "GPU-bbbb1111"), (0, "GPU-aaaa0")]),
+    # from the first invalid entry on, GPUs are not visible
+    ("2,7,0", [(2, "2")]),
+    ("2,GPU-bbbb,0", [(2, "2")]),
+    ("1,1", [(1, "1")]),
+    ("", []),
+])
+def test_place_visible_devices(node, visible_devices, expected):
+    (_, workers) = placed(node, visible_devices=visible_devices)
+    assert [(gpu, device) for (gpu, device, *_) in workers] == expected
+
+
+def test_placement_interface_of_visible_gpus(node):
+    assert placed(node, visible_devices="2,3")[0] == "eth1"
+
+
+def test_launcher_worker_commands(node, tmp_path):
+    launcher = ClusterLauncher("UCXIB", scheduler_file=str(tmp_path / "scheduler.json"),
+                               logs_dir=tmp_path, env={"CUDA_VISIBLE_DEVICES": "GPU-bbbb0000,0"},
+                               settings={"interface": "auto"}, worker_command=("worker",),
+                               sysfs_root=node[0], procfs_root=node[1])
+    commands = launcher._placed_worker_commands()
+    assert [(env["CUDA_VISIBLE_DEVICES"], [a for a in cmd if a.startswith("--interface")])
+            for (cmd, env) in commands] == [("GPU-bbbb0000", ["--interface=eth1"]),
+                                            ("0", ["--interface=ib0"])]
+    if commands[0][0][0] != "worker":
+        assert commands[0][0][1:3] == ["-c", "16-31"]
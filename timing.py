@@ -0,0 +1,229 @@
+# Copyright (c) 2026, NVIDIA CORPORATION.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Timing harness for MG benchmarks.
+
+time_function() runs a function for a number of warmup rounds, then repeats
+it until the confidence interval of the median is narrow enough, or until
+max_rounds or the max_time budget is reached. Outliers are rejected with
+Tukey's fences before computing statistics, and a sync callback can be given
+so asynchronous work (CUDA streams, dask futures) is included in each
+round's time.
+
+Example usage:
+
+import timing
+
+result = timing.time_function(ddf.sum().compute, warmup=2, max_time=30,
+                              sync=timing.sync_cupy)
+print(result.stats())       # min/median/mean/stddev/p95/p99/ci_low/ci_high...
+print(result.to_record())   # compact per-round record for results files
+
+or as a decorator, returning (last return value, TimingResult):
+
+@timing.benchmark(rel_ci_width=0.02)
+def get_n_rows(ddf, n):
+    return ddf.head(n)
+"""
+
+from functools import wraps
+from statistics import NormalDist
+from time import perf_counter_ns
+
+import numpy as np
+
+
+def sync_cupy(result=None):
+    """
+    Sync callback waiting for all work on the current CUDA stream.
+    """
+    import cupy
+    cupy.cuda.get_current_stream().synchronize()
+
+
+def sync_dask(result):
+    """
+    Sync callback waiting for the dask collection(s) or future(s) returned
+    by the timed function to finish computing, eg. after persist().
+    """
+    from distributed import wait
+    wait(result)
+
+
+def chain_syncs(*syncs):
+    """
+    Return a sync callback calling each of syncs in order.
+    """
+    def sync(result):
+        for s in syncs:
+            s(result)
+    return sync
+
+
+def outlier_mask(durations, k=1.5):
+    """
+    Return a boolean mask of the durations outside Tukey's fences, ie. more
+    than k interquartile ranges outside the quartiles.
+    """
+    durations = np.asarray(durations, dtype=float)
+    if len(durations) < 4:
+        return np.zeros(len(durations), dtype=bool)
+    q1, q3 = np.percentile(durations, [25, 75])
+    iqr = q3 - q1
+    return (durations < q1 - k * iqr) | (durations > q3 + k * iqr)
+
+
+def median_ci(durations, confidence=0.95):
+    """
+    Return the distribution-free (order statistic) confidence interval of
+    the median of durations, as (low, high).
+    """
+    values = np.sort(np.asarray(durations, dtype=float))
+    n = len(values)
+    if n == 0:
+        return (np.nan, np.nan)
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    half_width = z * np.sqrt(n) / 2
+    low = int(max(np.floor(n / 2 - half_width), 0))
+    high = int(min(np.ceil(n / 2 + half_width), n - 1))
+    return (float(values[low]), float(values[high]))
+
+
+def summarize(durations, reject_outliers=True, confidence=0.95):
+    """
+    Return the statistics of durations (in seconds) as a dict with min,
+    median, mean, stddev, p95, p99, the confidence interval of the median
+    (ci_low, ci_high), the number of rounds and of rejected outliers.
+    """
+    durations = np.asarray(durations, dtype=float)
+    mask = outlier_mask(durations) if reject_outliers else np.zeros(len(durations), bool)
+    kept = durations[~mask]
+    p50, p95, p99 = np.percentile(kept, [50, 95, 99])
+    ci_low, ci_high = median_ci(kept, confidence)
+    return {
+        "min": float(kept.min()),
+        "median": float(p50),
+        "mean": float(kept.mean()),
+        "stddev": float(kept.std(ddof=1)) if len(kept) > 1 else 0.0,
+        "p95": float(p95),
+        "p99": float(p99),
+        "ci_low": ci_low,
+        "ci_high": ci_high,
+        "rounds": int(len(durations)),
+        "outliers": int(mask.sum()),
+    }
+
+
+class TimingResult:
+    """
+    The timings of a function run by time_function().
+
+    durations and warmup_durations are in seconds. result is the return
+    value of the last round.
+    """
+    def __init__(self, durations, warmup_durations, result, stop_reason,
+                 reject_outliers=True, confidence=0.95):
+        self.durations = np.asarray(durations, dtype=float)
+        self.warmup_durations = np.asarray(warmup_durations, dtype=float)
+        self.result = result
+        self.stop_reason = stop_reason
+        self.reject_outliers = reject_outliers
+        self.confidence = confidence
+
+    def stats(self):
+        return summarize(self.durations, self.reject_outliers, self.confidence)
+
+    def to_record(self):
+        """
+        Return a compact, JSON-serializable record of every round: integer
+        nanosecond durations and the indices of the rejected outliers, along
+        with the statistics.
+        """
+        mask = (outlier_mask(self.durations) if self.reject_outliers
+                else np.zeros(len(self.durations), bool))
+        return {
+            "stats": self.stats(),
+            "durations_ns": [int(d * 1e9) for d in self.durations],
+            "warmup_ns": [int(d * 1e9) for d in self.warmup_durations],
+            "outliers": np.flatnonzero(mask).tolist(),
+            "stop_reason": self.stop_reason,
+        }
+
+
+def time_function(func, *args, warmup=1, min_rounds=5, max_rounds=100,
+                  max_time=10.0, rel_ci_width=0.05, confidence=0.95,
+                  sync=None, reject_outliers=True, **kwargs):
+    """
+    Time func(*args, **kwargs) until its median is known precisely enough.
+
+    Parameters:
+    - warmup (int): untimed rounds run first, eg. to JIT compile or fill
+      caches and memory pools.
+    - min_rounds, max_rounds (int): bounds on the number of timed rounds.
+    - max_time (float): time budget in seconds for the timed rounds. At least
+      min_rounds rounds are always run.
+    - rel_ci_width (float): stop once the width of the confidence interval
+      of the median, relative to the median, is at most this.
+    - confidence (float): confidence level of the interval.
+    - sync (callable): called with func's return value inside each timed
+      round, to wait for asynchronous work to finish.
+    - reject_outliers (bool): exclude outliers from the statistics and the
+      stopping criterion.
+
+    Returns:
+    TimingResult: the timings, and the last value returned by func.
+    """
+    def run_once():
+        start = perf_counter_ns()
+        result = func(*args, **kwargs)
+        if sync is not None:
+            sync(result)
+        return (perf_counter_ns() - start) * 1e-9, result
+
+    warmup_durations = []
+    result = None
+    for _ in range(warmup):
+        duration, result = run_once()
+        warmup_durations.append(duration)
+
+    durations = []
+    stop_reason = "max_rounds"
+    while len(durations) < max_rounds:
+        duration, result = run_once()
+        durations.append(duration)
+        if len(durations) < min_rounds:
+            continue
+        stats = summarize(durations, reject_outliers, confidence)
+        if (stats["ci_high"] - stats["ci_low"]) <= rel_ci_width * stats["median"]:
+            stop_reason = "converged"
+            break
+        if sum(durations) >= max_time:
+            stop_reason = "max_time"
+            break
+
+    return TimingResult(durations, warmup_durations, result, stop_reason,
+                        reject_outliers, confidence)
+
+
+def benchmark(**options):
+    """
+    Decorator timing the decorated function with time_function(**options)
+    on every call, which then returns (last return value, TimingResult).
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrap_func(*args, **kwargs):
+            timing_result = time_function(func, *args, **options, **kwargs)
+            return timing_result.result, timing_result
+        return wrap_func
+    return decorator
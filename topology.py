@@ -0,0 +1,347 @@
+# Copyright (c) 2026, NVIDIA CORPORATION.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Node topology discovery and worker placement.
+
+Reads the NUMA nodes, GPUs and network interfaces of a node from sysfs, and
+places one worker per GPU: each worker gets the CPUs local to its GPU and
+the network interface closest to it on the PCIe tree. This is what
+ClusterLauncher does when DASK_CUDA_INTERFACE is "auto", instead of relying
+on an interface name that differs from node to node.
+
+The distance between a GPU and a NIC is ranked like nvidia-smi topo does:
+
+- PIX: behind the same PCIe switch.
+- PXB: behind a chain of PCIe switches, without crossing a host bridge.
+- PHB: through the PCIe host bridge of their root complex.
+- NODE: on different root complexes of the same NUMA node.
+- SYS: on different NUMA nodes, crossing the CPU interconnect.
+
+Only interfaces backed by a PCI device are considered (not lo, bridges,
+...), interfaces that are up are preferred, and for UCX with Infiniband only
+interfaces of an RDMA capable device are. Ties are broken by link speed.
+
+Discovery reads everything from sysfs_root, and the GPU UUIDs from the
+NVIDIA driver in procfs_root, so recorded (or hand made) topologies can be
+used in place of /sys and /proc, eg. to test placements. GPUs are numbered
+in PCI bus order, like CUDA does with CUDA_DEVICE_ORDER=PCI_BUS_ID.
+
+Only the GPUs visible with CUDA_VISIBLE_DEVICES, eg. those of a Slurm
+allocation, are placed. Its entries are indices in PCI bus order or UUIDs
+and, like CUDA does, entries from the first one that matches no GPU are
+ignored.
+
+Example usage, which also writes the placement report of the node:
+
+python topology.py --protocol=ucxib --report-file=$LOGS_DIR/topology-$(hostname).json
+"""
+
+from collections import Counter
+import json
+import os
+from pathlib import Path
+import re
+import socket
+
+
+GPU_VENDOR_IDS = ("0x10de",)
+# PCI display (0x0300) and 3D (0x0302) controllers
+GPU_CLASS_PREFIXES = ("0x0300", "0x0302")
+ARPHRD_INFINIBAND = "32"
+PCI_ADDRESS = re.compile(r"^[0-9a-f]{4}:[0-9a-f]{2}:[0-9a-f]{2}\.[0-9a-f]$")
+DISTANCE_LEVELS = ("PIX", "PXB", "PHB", "NODE", "SYS")
+
+
+def parse_cpulist(cpulist):
+    """
+    Return the list of CPUs in a sysfs CPU list, eg. "0-3,8,10-11".
+    """
+    cpus = []
+    for part in cpulist.strip().split(","):
+        if not part:
+            continue
+        (first, _, last) = part.partition("-")
+        cpus.extend(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+def format_cpulist(cpus):
+    """
+    Return cpus as a CPU list, eg. "0-3,8", as taskset -c accepts.
+    """
+    ranges = []
+    for cpu in sorted(set(cpus)):
+        if ranges and cpu == ranges[-1][1] + 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+    return ",".join(str(a) if a == b else f"{a}-{b}" for (a, b) in ranges)
+
+
+def _read(path, default=None):
+    try:
+        return Path(path).read_text().strip()
+    except (OSError, UnicodeDecodeError):
+        return default
+
+
+def _pci_path(device_path):
+    """
+    Return the PCI hierarchy of a device, from its root complex (eg.
+    "pci0000:00") to the PCI function of the device, or None if the device
+    is not on PCI.
+    """
+    parts = Path(os.path.realpath(device_path)).parts
+    if "devices" not in parts:
+        return None
+    parts = parts[parts.index("devices") + 1:]
+    if not parts or not parts[0].startswith("pci"):
+        return None
+    # stop at the PCI function, eg. drop virtio3 of a virtio NIC
+    functions = [i for (i, part) in enumerate(parts) if PCI_ADDRESS.match(part)]
+    if not functions:
+        return None
+    return list(parts[:functions[-1] + 1])
+
+
+def _numa_node(device_dir):
+    numa_node = _read(Path(device_dir) / "numa_node", "-1")
+    return int(numa_node) if numa_node.lstrip("-").isdigit() and int(numa_node) >= 0 else None
+
+
+def _gpu_uuid(procfs_root, pci):
+    information = _read(Path(procfs_root) / "driver" / "nvidia" / "gpus" / pci / "information", "")
+    for line in information.splitlines():
+        (key, _, value) = line.partition(":")
+        if key.strip() == "GPU UUID":
+            return value.strip()
+    return None
+
+
+def discover(sysfs_root="/sys", procfs_root="/proc"):
+    """
+    Discover the topology of the node described by sysfs_root and
+    procfs_root.
+
+    Returns:
+    dict: {"numa_nodes": {node: [cpus]},
+           "gpus": [{"index", "pci", "uuid", "path", "numa_node", "cpus"}],
+           "interfaces": [{"name", "pci", "path", "numa_node", "cpus", "up",
+                           "rdma", "infiniband", "speed"}]}
+    with the GPUs in PCI bus order.
+    """
+    root = Path(sysfs_root)
+    numa_nodes = {}
+    for node_dir in sorted((root / "devices" / "system" / "node").glob("node[0-9]*")):
+        cpulist = _read(node_dir / "cpulist")
+        if cpulist is not None:
+            numa_nodes[int(node_dir.name[4:])] = parse_cpulist(cpulist)
+
+    def local_cpus(device_dir, numa_node):
+        cpulist = _read(Path(device_dir) / "local_cpulist")
+        if cpulist:
+            return parse_cpulist(cpulist)
+        return numa_nodes.get(numa_node, [])
+
+    gpus = []
+    for device_dir in sorted((root / "bus" / "pci" / "devices").glob("*")):
+        if (_read(device_dir / "vendor") not in GPU_VENDOR_IDS or
+                not (_read(device_dir / "class") or "").startswith(GPU_CLASS_PREFIXES)):
+            continue
+        numa_node = _numa_node(device_dir)
+        gpus.append({
+            "index": len(gpus),
+            "pci": device_dir.name,
+            "uuid": _gpu_uuid(procfs_root, device_dir.name),
+            "path": _pci_path(device_dir),
+            "numa_node": numa_node,
+            "cpus": local_cpus(device_dir, numa_node),
+        })
+
+    interfaces = []
+    for net_dir in sorted((root / "class" / "net").glob("*")):
+        device_dir = net_dir / "device"
+        path = _pci_path(device_dir) if device_dir.exists() else None
+        if path is None:
+            continue  # virtual interfaces
+        device_dir = Path(os.path.realpath(device_dir))
+        while not PCI_ADDRESS.match(device_dir.name):
+            device_dir = device_dir.parent
+        numa_node = _numa_node(device_dir)
+        speed = _read(net_dir / "speed", "0")
+        interfaces.append({
+            "name": net_dir.name,
+            "pci": path[-1],
+            "path": path,
+            "numa_node": numa_node,
+            "cpus": local_cpus(device_dir, numa_node),
+            "up": _read(net_dir / "operstate") == "up",
+            "rdma": (device_dir / "infiniband").is_dir(),
+            "infiniband": _read(net_dir / "type") == ARPHRD_INFINIBAND,
+            "speed": int(speed) if speed.lstrip("-").isdigit() else 0,
+        })
+    return {"numa_nodes": numa_nodes, "gpus": gpus, "interfaces": interfaces}
+
+
+def distance(gpu, interface):
+    """
+    Return the distance between a GPU and an interface, as one of
+    DISTANCE_LEVELS.
+    """
+    (a, b) = (gpu["path"], interface["path"])
+    if a[0] == b[0]:
+        common = 0
+        while common < min(len(a), len(b)) and a[common] == b[common]:
+            common += 1
+        if common == 1:
+            return "PHB"
+        # a single switch is its upstream and downstream ports, so the
+        # devices are then 2 levels below their common ancestor
+        return "PIX" if len(a) - common <= 2 and len(b) - common <= 2 else "PXB"
+    if gpu["numa_node"] is not None and gpu["numa_node"] == interface["numa_node"]:
+        return "NODE"
+    if gpu["numa_node"] is None and set(gpu["cpus"]) == set(interface["cpus"]):
+        return "NODE"
+    return "SYS"
+
+
+def candidate_interfaces(topology, protocol="tcp"):
+    """
+    Return the interfaces usable by protocol (tcp, ucx or ucxib), up ones
+    only unless none is.
+    """
+    interfaces = topology["interfaces"]
+    if protocol.lower().replace("-", "") == "ucxib":
+        interfaces = [i for i in interfaces if i["rdma"] or i["infiniband"]]
+    up = [i for i in interfaces if i["up"]]
+    return up or interfaces
+
+
+def visible_gpus(topology, visible_devices=None):
+    """
+    Return the (device, GPU) of the GPUs of topology visible with
+    visible_devices, a CUDA_VISIBLE_DEVICES value, in its order. device is
+    the entry of the GPU, to set CUDA_VISIBLE_DEVICES of its worker to. All
+    GPUs are visible if visible_devices is None.
+    """
+    gpus = topology["gpus"]
+    if visible_devices is None:
+        return [(str(gpu["index"]), gpu) for gpu in gpus]
+    visible = []
+    for entry in visible_devices.split(","):
+        entry = entry.strip()
+        if entry.isdigit():
+            matches = gpus[int(entry):int(entry) + 1]
+        else:
+            # a UUID, or a unique prefix of one
+            matches = [gpu for gpu in gpus if entry and (gpu["uuid"] or "").startswith(entry)]
+        if len(matches) != 1 or any(gpu is matches[0] for (_, gpu) in visible):
+            break
+        visible.append((entry, matches[0]))
+    return visible
+
+
+def place_workers(topology, protocol="tcp", visible_devices=None):
+    """
+    Place one worker per visible GPU of topology.
+
+    Parameters:
+    - topology (dict): as returned by discover().
+    - protocol (str): tcp, ucx or ucxib, which restricts the interfaces
+      used to RDMA capable ones.
+    - visible_devices (str): CUDA_VISIBLE_DEVICES, or None if not set.
+
+    Returns:
+    dict: {"host", "protocol", "interface": the interface closest to most
+    GPUs, for the scheduler and workers started with a single command,
+    "workers": [{"gpu", "device" (its CUDA_VISIBLE_DEVICES), "pci",
+    "numa_node", "cpus" (a CPU list), "interface", "distance"}]}.
+    Interfaces are None if there is none.
+    """
+    interfaces = candidate_interfaces(topology, protocol)
+    workers = []
+    for (device, gpu) in visible_gpus(topology, visible_devices):
+        best = None
+        if interfaces and gpu["path"] is not None:
+            best = min(interfaces, key=lambda i: (DISTANCE_LEVELS.index(distance(gpu, i)),
+                                                  -i["speed"], i["name"]))
+        workers.append({
+            "gpu": gpu["index"],
+            "device": device,
+            "pci": gpu["pci"],
+            "numa_node": gpu["numa_node"],
+            "cpus": format_cpulist(gpu["cpus"]),
+            "interface": best["name"] if best else None,
+            "distance": distance(gpu, best) if best else None,
+        })
+
+    counts = Counter(w["interface"] for w in workers if w["interface"])
+    if counts:
+        interface = counts.most_common(1)[0][0]
+    elif interfaces:
+        # no GPUs, eg. the node of a CPU-only scheduler
+        interface = max(interfaces, key=lambda i: (i["speed"], i["name"]))["name"]
+    else:
+        interface = None
+    return {
+        "host": socket.gethostname(),
+        "protocol": protocol,
+        "interface": interface,
+        "workers": workers,
+    }
+
+
+def write_report(report_file, topology, placement):
+    """
+    Write the placement report of the node, with the topology it was
+    derived from, to report_file as JSON.
+    """
+    Path(report_file).parent.mkdir(parents=True, exist_ok=True)
+    with open(report_file, "w") as f:
+        json.dump({**placement, "topology": topology}, f, indent=2)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sysfs-root", default="/sys",
+                    help="Read the topology from this directory instead of "
+                    "/sys, eg. a recorded topology.")
+    ap.add_argument("--procfs-root", default="/proc",
+                    help="Read the GPU UUIDs from this directory instead of "
+                    "/proc.")
+    ap.add_argument("--visible-devices", default=os.environ.get("CUDA_VISIBLE_DEVICES"),
+                    help="Only place the workers of these GPUs, defaults to "
+                    "CUDA_VISIBLE_DEVICES.")
+    ap.add_argument("--protocol", default="tcp", choices=("tcp", "ucx", "ucxib", "ucx-ib"),
+                    help="Protocol the interfaces are chosen for.")
+    ap.add_argument("--report-file", default=None,
+                    help="Write the placement report of the node to this file.")
+    ap.add_argument("--interface", action="store_true",
+                    help="Only print the interface chosen for the node, eg. "
+                    "to set DASK_CUDA_INTERFACE in a script.")
+    args = ap.parse_args()
+
+    topology = discover(args.sysfs_root, args.procfs_root)
+    placement = place_workers(topology, args.protocol, args.visible_devices)
+    if args.report_file:
+        write_report(args.report_file, topology, placement)
+    if args.interface:
+        print(placement["interface"] or "")
+    else:
+        print(f"{placement['host']}: interface {placement['interface']}")
+        for worker in placement["workers"]:
+            print(f"  GPU {worker['gpu']} ({worker['pci']}, NUMA node "
+                  f"{worker['numa_node']}): interface {worker['interface']} "
+                  f"({worker['distance']}), CPUs {worker['cpus']}")
@@ -0,0 +1,319 @@
+# Copyright (c) 2026, NVIDIA CORPORATION.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Transport tuning sweep.
+
+Searches the environment settings of the cluster transport (UCX_* and
+DASK_DISTRIBUTED__COMM__* variables, WORKER_RMM_POOL_SIZE, ...) for the
+ones giving the highest all-to-all bandwidth, measured with
+worker_bandwidth.all_to_all() on a short-lived cluster per configuration:
+
+- "local" mode starts a distributed.LocalCluster, so the sweep can run on
+  any machine with plain TCP. DASK_* variables are applied as dask config
+  and the others are set in the environment of the worker processes.
+- "launcher" mode starts the scheduler and workers of this node with
+  cluster_launcher.ClusterLauncher, like run-dask-process.sh does, so every
+  variable applies to every process.
+
+Each setting is searched over a list of candidate values, the first being
+the current default, either over the full grid or by coordinate search,
+which tunes one setting at a time with the others at their best values
+so far, until a pass over all the settings changes nothing. A setting
+named "A+B" sets the variables A and B to the same value.
+
+The winning configuration, or the defaults if it is not better by at least
+--min-improvement, is written as a config.sh fragment:
+
+export UCX_TCP_TX_SEG_SIZE=${UCX_TCP_TX_SEG_SIZE:-2M}
+
+which default-config.sh reads when TUNED_CONFIG_FILE points to it. Values
+set by the project config.sh still take precedence.
+
+Example usage:
+
+python transport_tuning.py --n-workers=4 --output-file=tuned-config.sh
+python transport_tuning.py --mode=launcher --cluster-config-type=UCX \\
+    --n-workers=8 --param=UCX_MAX_RNDV_RAILS=1,2 --output-file=tuned-config.sh
+"""
+
+from datetime import datetime, timezone
+import itertools
+import shlex
+import tempfile
+
+import dask
+from dask.distributed import Client, LocalCluster
+
+from cluster_launcher import ClusterLauncher
+import worker_bandwidth
+
+
+# candidate values of each setting, the current default first
+DEFAULT_SPACES = {
+    "tcp": {
+        "DASK_DISTRIBUTED__COMM__SHARD": ["64MiB", "16MiB", "256MiB"],
+        "DASK_DISTRIBUTED__COMM__OFFLOAD": ["10MiB", "1MiB", "100MiB"],
+    },
+    "ucx": {
+        "UCX_TCP_TX_SEG_SIZE+UCX_TCP_RX_SEG_SIZE": ["8M", "512K", "2M", "32M"],
+        "UCX_MAX_RNDV_RAILS": ["1", "2"],
+        "UCX_RNDV_THRESH": ["auto", "8192", "1M"],
+    },
+}
+DEFAULT_SIZES = (1024 ** 2, 16 * 1024 ** 2)
+
+
+def parse_param(spec):
+    """
+    Parse a "NAME=value1,value2,..." search space entry into (name, values).
+    """
+    name, sep, values = spec.partition("=")
+    if not (sep and name and values):
+        raise ValueError(f"invalid parameter {spec!r}, expected NAME=value1,value2,...")
+    return name, values.split(",")
+
+
+def expand(config):
+    """
+    Return the environment variables of a configuration, a dict of setting
+    name to value, where a setting named "A+B" sets both A and B.
+    """
+    return {var: value for (name, value) in config.items() for var in name.split("+")}
+
+
+def measure(client, n_workers, sizes=DEFAULT_SIZES, rounds=5, timeout=120):
+    """
+    Measure the all-to-all bandwidth of the cluster of client once n_workers
+    have connected.
+
+    Returns:
+    dict: the GB/s of each message size, and the score, the GB/s of the
+    largest size.
+    """
+    client.wait_for_workers(n_workers, timeout=timeout)
+    workers = worker_bandwidth.select_workers(client)
+    a2a_df = worker_bandwidth.all_to_all(client, workers, sizes, rounds)
+    gb_per_s = {int(row["nbytes"]): float(row["gb_per_s"])
+                for row in a2a_df.to_dict("records")}
+    return {"score": gb_per_s[max(gb_per_s)], "gb_per_s": gb_per_s}
+
+
+def run_local_trial(env, protocol="tcp", n_workers=2, **measure_options):
+    """
+    Measure a configuration on a LocalCluster, with the DASK_* variables of
+    env as dask config and the other ones in the worker environment.
+    """
+    dask_config = {}
+    for (var, value) in env.items():
+        if var.startswith("DASK_"):
+            # dotted keys, a nested dict would replace whole config sections
+            key = var[len("DASK_"):].lower().replace("__", ".")
+            dask_config[key] = dask.config.get(key, config=dask.config.collect_env({var: value}))
+    worker_env = {k: v for (k, v) in env.items() if not k.startswith("DASK_")}
+    with dask.config.set(dask_config):
+        with LocalCluster(n_workers=n_workers, threads_per_worker=1, protocol=protocol,
+                          dashboard_address=":0", env=worker_env) as cluster:
+            with Client(cluster) as client:
+                return measure(client, n_workers, **measure_options)
+
+
+def run_launcher_trial(env, cluster_config_type="TCP", n_workers=2, work_dir=None,
+                       worker_command=("dask-cuda-worker",), timeout=120,
+                       **measure_options):
+    """
+    Measure a configuration on a cluster of this node started by
+    ClusterLauncher, with env in the environment of every process.
+    """
+    work_dir = tempfile.mkdtemp(prefix="transport-tuning-", dir=work_dir)
+    launcher = ClusterLauncher(cluster_config_type,
+                               scheduler_file=f"{work_dir}/scheduler.json",
+                               logs_dir=f"{work_dir}/logs", env=env,
+                               worker_command=worker_command)
+    try:
+        launcher.start_scheduler(timeout=timeout)
+        launcher.start_workers(timeout=timeout)
+        with Client(scheduler_file=launcher.scheduler_file, timeout=f"{timeout}s") as client:
+            return measure(client, n_workers, timeout=timeout, **measure_options)
+    finally:
+        launcher.stop()
+
+
+class Tuner:
+    """
+    Runs trials of configurations of a search space, each measured once.
+
+    Parameters:
+    - space (dict): setting name to its candidate values, default first.
+    - run_trial (callable): run_trial(env) returns a dict with a "score",
+      higher is better. Exceptions fail the trial.
+    """
+    def __init__(self, space, run_trial):
+        self.space = {name: list(values) for (name, values) in space.items()}
+        self.run_trial = run_trial
+        self.trials = []
+        self._scores = {}
+
+    def baseline(self):
+        return {name: values[0] for (name, values) in self.space.items()}
+
+    def evaluate(self, config):
+        """
+        Return the score of config, running its trial unless it already ran.
+        Failed trials score None.
+        """
+        key = tuple(sorted(config.items()))
+        if key not in self._scores:
+            trial = {"config": dict(config), "score": None}
+            try:
+                trial.update(self.run_trial(expand(config)))
+            except Exception as e:
+                trial["error"] = f"{type(e).__name__}: {e}"
+            self.trials.append(trial)
+            self._scores[key] = trial["score"]
+            score = "failed" if trial["score"] is None else f"{trial['score']:.3f}"
+            print(f"trial {len(self.trials)}: {config} -> {score}", flush=True)
+        return self._scores[key]
+
+    def grid_search(self):
+        names = list(self.space)
+        for values in itertools.product(*self.space.values()):
+            self.evaluate(dict(zip(names, values)))
+
+    def coordinate_search(self, max_passes=3):
+        best = self.baseline()
+        best_score = self.evaluate(best)
+        for _ in range(max_passes):
+            changed = False
+            for (name, values) in self.space.items():
+                for value in values:
+                    config = {**best, name: value}
+                    score = self.evaluate(config)
+                    if (score is not None) and ((best_score is None) or (score > best_score)):
+                        (best, best_score, changed) = (config, score, True)
+            if not changed:
+                break
+
+    def best(self, min_improvement=0.0):
+        """
+        Return the trial of the best configuration, or of the baseline if
+        the best one does not beat it by min_improvement (a fraction).
+        """
+        scored = [t for t in self.trials if t["score"] is not None]
+        if not scored:
+            return None
+        best = max(scored, key=lambda t: t["score"])
+        baseline = next((t for t in scored if t["config"] == self.baseline()), None)
+        if baseline and best["score"] < baseline["score"] * (1 + min_improvement):
+            return baseline
+        return best
+
+
+def config_fragment(trial, description=""):
+    """
+    Return the config.sh fragment of a trial's configuration, setting each
+    variable only if it is not already set.
+    """
+    lines = [f"# Written by transport_tuning.py on "
+             f"{datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')}"]
+    if description:
+        lines.append(f"# {description}")
+    gb_per_s = ", ".join(f"{nbytes} bytes: {gbps:.3f} GB/s"
+                         for (nbytes, gbps) in trial.get("gb_per_s", {}).items())
+    lines.append(f"# all-to-all {gb_per_s}")
+    for (var, value) in expand(trial["config"]).items():
+        lines.append(f"export {var}=${{{var}:-{shlex.quote(value)}}}")
+    return "\n".join(lines) + "\n"
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(",")]
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import sys
+
+    from cluster_launcher import CLUSTER_CONFIG_TYPES
+    import results_store
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mode", choices=("local", "launcher"), default="local",
+                    help="Run each trial on a LocalCluster, or on this node's "
+                    "scheduler and workers started by cluster_launcher.py.")
+    ap.add_argument("--protocol", default="tcp",
+                    help="Protocol of the local clusters.")
+    ap.add_argument("--cluster-config-type", default="TCP", choices=CLUSTER_CONFIG_TYPES,
+                    help="Cluster configuration of the launcher clusters.")
+    ap.add_argument("--worker-command", default="dask-cuda-worker",
+                    help="Command used to start the launcher workers.")
+    ap.add_argument("--n-workers", type=int, default=2,
+                    help="Number of workers, started in local mode, waited "
+                    "for in launcher mode.")
+    ap.add_argument("--param", action="append", default=[],
+                    help="Setting to search, as NAME=value1,value2,... with the "
+                    "default first. Can be given more than once, replacing the "
+                    "default search space.")
+    ap.add_argument("--search", choices=("coordinate", "grid"), default="coordinate",
+                    help="Search strategy.")
+    ap.add_argument("--sizes", type=_int_list, default=list(DEFAULT_SIZES),
+                    help="Comma-separated all-to-all message sizes in bytes, the "
+                    "largest one is scored.")
+    ap.add_argument("--rounds", type=int, default=5,
+                    help="Timed all-to-all rounds per message size.")
+    ap.add_argument("--timeout", type=int, default=120,
+                    help="Seconds to wait for the cluster of a trial to start.")
+    ap.add_argument("--min-improvement", type=float, default=0.02,
+                    help="Fraction by which the best configuration must beat "
+                    "the defaults to be chosen.")
+    ap.add_argument("--output-file", default=None,
+                    help="config.sh fragment to write, printed if not specified.")
+    ap.add_argument("--results-file", default=None,
+                    help="JSON file to write every trial to.")
+    args = ap.parse_args()
+
+    if args.mode == "local":
+        transport = "ucx" if "ucx" in args.protocol else "tcp"
+        description = f"local {args.protocol} cluster, {args.n_workers} workers"
+        def run_trial(env):
+            return run_local_trial(env, args.protocol, args.n_workers, sizes=args.sizes,
+                                   rounds=args.rounds, timeout=args.timeout)
+    else:
+        transport = "tcp" if args.cluster_config_type == "TCP" else "ucx"
+        description = f"{args.cluster_config_type} cluster, {args.n_workers} workers"
+        def run_trial(env):
+            return run_launcher_trial(env, args.cluster_config_type, args.n_workers,
+                                      worker_command=args.worker_command.split(),
+                                      timeout=args.timeout, sizes=args.sizes,
+                                      rounds=args.rounds)
+
+    space = dict(parse_param(p) for p in args.param) or DEFAULT_SPACES[transport]
+    tuner = Tuner(space, run_trial)
+    if args.search == "grid":
+        tuner.grid_search()
+    else:
+        tuner.coordinate_search()
+
+    if args.results_file:
+        results_store.atomic_write(args.results_file, json.dumps(tuner.trials, indent=2))
+    best = tuner.best(args.min_improvement)
+    if best is None:
+        print("every trial failed", file=sys.stderr)
+        sys.exit(1)
+    print(f"best: {best['config']} -> {best['score']:.3f} GB/s")
+    fragment = config_fragment(best, description)
+    if args.output_file:
+        results_store.atomic_write(args.output_file, fragment)
+        print(f"wrote {args.output_file}, use it with TUNED_CONFIG_FILE={args.output_file}")
+    else:
+        print(fragment, end="")
@@ -11,8 +11,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
 import os
+import random
+import socket
 import sys
+import threading
 import time
 import yaml
 
@@ -20,24 +24,64 @@ from dask.distributed import Client
 
 
 def initialize_dask_cuda(communication_type):
+    # defaults only, so settings from the environment (eg. a config.sh
+    # fragment written by transport_tuning.py) are kept
     communication_type = communication_type.lower()
     if "ucx" in communication_type:
-        os.environ["UCX_MAX_RNDV_RAILS"] = "1"
+        os.environ.setdefault("UCX_MAX_RNDV_RAILS", "1")
 
     if communication_type == "ucx-ib":
-        os.environ["UCX_MEMTYPE_REG_WHOLE_ALLOC_TYPES"]="cuda"
-        os.environ["DASK_RMM__POOL_SIZE"]="0.5GB"
-        os.environ["DASK_DISTRIBUTED__COMM__UCX__CREATE_CUDA_CONTEXT"]="True"
+        os.environ.setdefault("UCX_MEMTYPE_REG_WHOLE_ALLOC_TYPES", "cuda")
+        os.environ.setdefault("DASK_RMM__POOL_SIZE", "0.5GB")
+        os.environ.setdefault("DASK_DISTRIBUTED__COMM__UCX__CREATE_CUDA_CONTEXT", "True")
+
+
+def _connect(scheduler_file_path, deadline):
+    """
+    Connect a single client to the scheduler described by
+    scheduler_file_path, backing off between failed attempts so a scheduler
+    that is still starting up is not flooded with connections. Returns None
+    if deadline (a time.time() value, or None for no deadline) passes first.
+    """
+    delay = 0.1
+    while True:
+        try:
+            return Client(scheduler_file=scheduler_file_path, timeout="10s")
+        except (OSError, TimeoutError) as err:
+            if deadline and (time.time() + delay) >= deadline:
+                return None
+            print(f"wait_for_workers.py - could not connect ({err}), "
+                  f"retrying in {delay:.1f} seconds...")
+            sys.stdout.flush()
+            time.sleep(delay * random.uniform(0.5, 1.5))
+            delay = min(delay * 2, 10)
+
+
+def _worker_placement():
+    """
+    Runs on each worker to report where it is running.
+    """
+    visible_devices = os.environ.get("CUDA_VISIBLE_DEVICES", "")
+    return {
+        "host": socket.gethostname(),
+        "gpu": visible_devices.split(",")[0] or None,
+    }
 
 
 def wait_for_workers(
-    num_expected_workers, scheduler_file_path, communication_type, timeout_after=0
+    num_expected_workers, scheduler_file_path, communication_type,
+    timeout_after=0, timeline_file_path=None
 ):
     """
     Waits until num_expected_workers workers are available based on
     the workers managed by scheduler_file_path, then returns 0. If
     timeout_after is specified, will return 1 if num_expected_workers
     workers are not available before the timeout.
+
+    A single client is used for the whole wait, and worker registrations are
+    pushed to it by the scheduler as they happen instead of being polled
+    for. If timeline_file_path is specified, the registration time, host and
+    GPU of every worker is written there as JSON.
     """
     # FIXME: use scheduler file path from global environment if none
     # supplied in configuration yaml
@@ -45,36 +89,95 @@ def wait_for_workers(
     print("wait_for_workers.py - initializing client...", end="")
     sys.stdout.flush()
     initialize_dask_cuda(communication_type)
+    start_time = time.time()
+    deadline = (start_time + timeout_after) if timeout_after else None
+    client = _connect(scheduler_file_path, deadline)
+    if client is None:
+        print(
+            f"wait_for_workers.py timed out after {timeout_after} seconds before connecting to the scheduler."
+        )
+        sys.stdout.flush()
+        return 1
     print("done.")
     sys.stdout.flush()
 
-    ready = False
-    start_time = time.time()
-    while not ready:
-        if timeout_after and ((time.time() - start_time) >= timeout_after):
-            print(
-                f"wait_for_workers.py timed out after {timeout_after} seconds before finding {num_expected_workers} workers."
-            )
-            sys.stdout.flush()
-            break
-        with Client(scheduler_file=scheduler_file_path) as client:
-            num_workers = len(client.scheduler_info()["workers"])
-            if num_workers < num_expected_workers:
+    # Maps worker address to the time the scheduler registered it.
+    registered = {}
+    ready = threading.Event()
+
+    def handle_event(event):
+        (timestamp, msg) = event
+        if not isinstance(msg, dict):
+            return
+        if msg.get("action") == "add-worker":
+            registered.setdefault(msg["worker"], timestamp)
+        elif msg.get("action") == "remove-worker":
+            registered.pop(msg["worker"], None)
+        if len(registered) >= num_expected_workers:
+            ready.set()
+
+    with client:
+        # Subscribe before reading the event history so no registration can
+        # fall between the two.
+        client.subscribe_topic("all", handle_event)
+        for event in client.get_events("all"):
+            handle_event(event)
+
+        num_reported = -1
+        while not ready.is_set():
+            if deadline and time.time() >= deadline:
                 print(
-                    f"wait_for_workers.py expected {num_expected_workers} but got {num_workers}, waiting..."
+                    f"wait_for_workers.py timed out after {timeout_after} seconds before finding {num_expected_workers} workers."
                 )
                 sys.stdout.flush()
-                time.sleep(5)
-            else:
-                print(f"wait_for_workers.py got {num_workers} workers, done.")
+                break
+            if len(registered) != num_reported:
+                num_reported = len(registered)
+                print(
+                    f"wait_for_workers.py expected {num_expected_workers} but got {num_reported}, waiting..."
+                )
                 sys.stdout.flush()
-                ready = True
+            # Only bounds how long a timeout or progress message can be late,
+            # the wait ends as soon as the last worker registers.
+            ready.wait(timeout=5)
 
-    if ready is False:
+        client.unsubscribe_topic("all")
+
+        if ready.is_set():
+            print(f"wait_for_workers.py got {len(registered)} workers, done.")
+            sys.stdout.flush()
+
+        if timeline_file_path:
+            _write_timeline(client, dict(registered), start_time, timeline_file_path)
+
+    if ready.is_set() is False:
         return 1
     return 0
 
 
+def _write_timeline(client, registered, start_time, timeline_file_path):
+    """
+    Write the registration timeline of the workers in registered, ordered by
+    registration time, to timeline_file_path as JSON.
+    """
+    placement = client.run(_worker_placement, workers=list(registered),
+                           on_error="return")
+    timeline = []
+    for (address, timestamp) in sorted(registered.items(), key=lambda item: item[1]):
+        info = placement.get(address)
+        if not isinstance(info, dict):
+            info = {"host": None, "gpu": None}
+        timeline.append({
+            "worker": address,
+            "host": info["host"],
+            "gpu": info["gpu"],
+            "timestamp": timestamp,
+            "seconds_after_start": round(timestamp - start_time, 3),
+        })
+    with open(timeline_file_path, "w") as timeline_file:
+        json.dump(timeline, timeline_file, indent=2)
+
+
 if __name__ == "__main__":
     import argparse
 
@@ -109,16 +212,25 @@ if __name__ == "__main__":
         help="Number of seconds to wait for workers. "
         "Default is 0 which means wait forever.",
     )
+    ap.add_argument(
+        "--timeline-file-path",
+        type=str,
+        default=None,
+        required=False,
+        help="Write the registration time, host and GPU of each worker "
+        "to this file as JSON.",
+    )
     args = ap.parse_args()
 
     if args.num_expected_workers is None:
-        args.num_expected_workers = os.environ.get("NUM_WORKERS", 16)
+        args.num_expected_workers = int(os.environ.get("NUM_WORKERS", 16))
 
     exitcode = wait_for_workers(
         num_expected_workers=args.num_expected_workers,
         scheduler_file_path=args.scheduler_file_path,
         communication_type=args.communication_type,
         timeout_after=args.timeout_after,
+        timeline_file_path=args.timeline_file_path,
     )
 
     sys.exit(exitcode)
@@ -0,0 +1,315 @@
+# Copyright (c) 2026, NVIDIA CORPORATION.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Worker-to-worker network benchmarks.
+
+- point-to-point: for every ordered pair of workers (src, dst), dst
+  repeatedly fetches a payload held by src over the cluster's comm layer,
+  the same get_data request the workers use to gather task dependencies.
+  The smallest message size gives the round-trip latency, the larger ones
+  the bandwidth of each link, which is reported as a src x dst matrix so a
+  slow link, NIC or node stands out.
+- all-to-all: every worker fetches a payload from every other worker at
+  the same time, measuring aggregate shuffle throughput.
+
+No scheduler or task overhead is included in the timings: the transfers are
+timed on the receiving worker. Payloads are numpy arrays, or cupy arrays
+with --device so transfers go through the GPU paths (NVLink, IB) of UCX.
+
+Example usage, against a cluster started by run-dask-process.sh:
+
+python worker_bandwidth.py --scheduler-file=$SCHEDULER_FILE \
+                           --output-dir=latest/benchmarks/8-GPU
+
+or on a local CPU cluster over TCP:
+
+python worker_bandwidth.py --n-workers=4 --sizes=8,1048576
+"""
+
+import asyncio
+import itertools
+import json
+from pathlib import Path
+import time
+
+import numpy as np
+import pandas as pd
+
+from dask.distributed import Client, LocalCluster, wait
+from distributed.worker import get_data_from_worker
+
+import timing
+
+
+RESULTS_FILE_NAME = "worker-bandwidth"
+DEFAULT_SIZES = (8, 64 * 1024, 1024 ** 2, 16 * 1024 ** 2)
+
+
+def _make_payload(nbytes, device=False):
+    if device:
+        import cupy
+        return cupy.ones(nbytes, dtype="u1")
+    return np.ones(nbytes, dtype="u1")
+
+
+async def _fetch(dask_worker, key, source):
+    """
+    Fetch key from the worker at address source, returning the elapsed time
+    in seconds. Retries while source reports it is too busy to serve it.
+    """
+    start = time.perf_counter()
+    while True:
+        response = await get_data_from_worker(dask_worker.rpc, [key], source,
+                                              who=dask_worker.address)
+        if response["status"] == "OK":
+            return time.perf_counter() - start
+        await asyncio.sleep(0.01)
+
+
+async def _fetch_repeatedly(key, source, rounds, dask_worker=None):
+    return [await _fetch(dask_worker, key, source) for _ in range(rounds)]
+
+
+async def _fetch_all(keys, rounds, dask_worker=None):
+    """
+    Fetch the key held by every other worker in keys ({address: key})
+    concurrently, rounds times, returning the elapsed time of each round.
+    """
+    sources = {src: key for (src, key) in keys.items() if src != dask_worker.address}
+    durations = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await asyncio.gather(*[_fetch(dask_worker, key, source)
+                               for (source, key) in sources.items()])
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def select_workers(client, hosts_only=False):
+    """
+    Return the sorted addresses of the workers to benchmark. With hosts_only,
+    a single worker per host is used so only links between nodes are
+    measured.
+    """
+    workers = client.scheduler_info(n_workers=-1)["workers"]
+    if not hosts_only:
+        return sorted(workers)
+    by_host = {}
+    for address in sorted(workers):
+        by_host.setdefault(workers[address]["host"], address)
+    return sorted(by_host.values())
+
+
+def _place_payloads(client, workers, nbytes, device):
+    futures = {
+        address: client.submit(_make_payload, nbytes, device, workers=[address],
+                               allow_other_workers=False, pure=False)
+        for address in workers
+    }
+    wait(list(futures.values()))
+    return futures
+
+
+def point_to_point(client, workers, sizes=DEFAULT_SIZES, rounds=10, warmup=1,
+                   device=False):
+    """
+    Measure fetching a payload of each size from every worker by every other
+    worker in workers, one pair at a time.
+
+    Returns:
+    DataFrame: one row per (src, dst, nbytes) with the timing statistics in
+    seconds and the bandwidth in GB/s based on the median time.
+    """
+    rows = []
+    for nbytes in sizes:
+        futures = _place_payloads(client, workers, nbytes, device)
+        for (src, dst) in itertools.permutations(workers, 2):
+            key = futures[src].key
+            durations = client.run(_fetch_repeatedly, key, src, warmup + rounds,
+                                   workers=[dst])[dst][warmup:]
+            stats = timing.summarize(durations)
+            rows.append({"src": src, "dst": dst, "nbytes": nbytes, **stats,
+                         "gb_per_s": nbytes / pow(1024, 3) / stats["median"]})
+        del futures
+    return pd.DataFrame(rows)
+
+
+def all_to_all(client, workers, sizes=DEFAULT_SIZES, rounds=10, warmup=1,
+               device=False):
+    """
+    Measure every worker in workers fetching a payload of each size from
+    every other worker at once.
+
+    Returns:
+    DataFrame: one row per nbytes with the timing statistics of the slowest
+    worker in each round, in seconds, and the aggregate throughput in GB/s
+    based on the median time.
+    """
+    rows = []
+    for nbytes in sizes:
+        futures = _place_payloads(client, workers, nbytes, device)
+        keys = {address: future.key for (address, future) in futures.items()}
+        per_worker = client.run(_fetch_all, keys, warmup + rounds, workers=workers)
+        # a round is only finished when its slowest worker is
+        durations = np.max([d[warmup:] for d in per_worker.values()], axis=0)
+        stats = timing.summarize(durations)
+        total_bytes = nbytes * len(workers) * (len(workers) - 1)
+        rows.append({"nbytes": nbytes, "workers": len(workers), **stats,
+                     "gb_per_s": total_bytes / pow(1024, 3) / stats["median"]})
+        del futures
+    return pd.DataFrame(rows)
+
+
+def bandwidth_matrix(p2p_df, nbytes=None):
+    """
+    Return the src x dst matrix of GB/s for message size nbytes, which
+    defaults to the largest size measured.
+    """
+    if nbytes is None:
+        nbytes = p2p_df["nbytes"].max()
+    df = p2p_df[p2p_df["nbytes"] == nbytes]
+    return df.pivot(index="src", columns="dst", values="gb_per_s")
+
+
+def find_slow_links(matrix, slow_fraction=0.5):
+    """
+    Return the (src, dst, GB/s) links slower than slow_fraction of the median
+    link of matrix.
+    """
+    links = matrix.stack()
+    threshold = slow_fraction * links.median()
+    slow = links[links < threshold]
+    return [(src, dst, float(gbps)) for ((src, dst), gbps) in slow.items()]
+
+
+def to_records(p2p_df, a2a_df, protocol):
+    """
+    Summarize the results as benchmark records for record-benchmarks.py,
+    one per message size and benchmark. Per-pair results do not have stable
+    names from run to run, so point-to-point records aggregate all pairs:
+    their stats are those of the per-pair median times.
+    """
+    records = []
+    for (nbytes, group) in p2p_df.groupby("nbytes"):
+        records.append({
+            "name": f"worker_bandwidth[p2p-{protocol}-bytes={nbytes}]",
+            "status": "PASSED",
+            "unit": "s",
+            "params": {"benchmark": "p2p", "protocol": protocol,
+                       "nbytes": int(nbytes), "pairs": len(group)},
+            "stats": timing.summarize(group["median"], reject_outliers=False),
+            "gb_per_s": float(group["gb_per_s"].median()),
+        })
+    for row in a2a_df.to_dict("records"):
+        records.append({
+            "name": f"worker_bandwidth[alltoall-{protocol}-bytes={row['nbytes']}]",
+            "status": "PASSED",
+            "unit": "s",
+            "params": {"benchmark": "alltoall", "protocol": protocol,
+                       "nbytes": int(row["nbytes"]), "workers": int(row["workers"])},
+            "stats": {key: row[key] for key in
+                      ("min", "median", "mean", "stddev", "p95", "p99",
+                       "ci_low", "ci_high", "rounds", "outliers")},
+            "gb_per_s": float(row["gb_per_s"]),
+        })
+    return records
+
+
+def write_results(p2p_df, a2a_df, protocol, output_dir):
+    """
+    Write the benchmark records as worker-bandwidth.jsonl, the per-pair
+    results as worker-bandwidth-p2p.csv and the bandwidth matrix of the
+    largest message size as worker-bandwidth-matrix.csv in output_dir.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with open(output_dir / (RESULTS_FILE_NAME + ".jsonl"), "w") as jsonl_file:
+        for record in to_records(p2p_df, a2a_df, protocol):
+            jsonl_file.write(json.dumps(record) + "\n")
+    p2p_df.to_csv(output_dir / (RESULTS_FILE_NAME + "-p2p.csv"), index=False)
+    if not p2p_df.empty:
+        bandwidth_matrix(p2p_df).to_csv(output_dir / (RESULTS_FILE_NAME + "-matrix.csv"))
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(",")]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scheduler-file", default=None,
+                    help="Benchmark the cluster described by this scheduler "
+                    "file. If not specified, a local CPU cluster is started.")
+    ap.add_argument("--n-workers", type=int, default=2,
+                    help="Workers in the local cluster.")
+    ap.add_argument("--protocol", default="tcp",
+                    help="Protocol of the local cluster, also used to label "
+                    "the results.")
+    ap.add_argument("--sizes", type=_int_list, default=list(DEFAULT_SIZES),
+                    help="Comma-separated message sizes in bytes.")
+    ap.add_argument("--rounds", type=int, default=10,
+                    help="Timed repetitions per measurement.")
+    ap.add_argument("--device", action="store_true",
+                    help="Use cupy payloads in device memory.")
+    ap.add_argument("--hosts-only", action="store_true",
+                    help="Use one worker per host, to only measure links "
+                    "between nodes.")
+    ap.add_argument("--skip-p2p", action="store_true",
+                    help="Only run the all-to-all benchmark.")
+    ap.add_argument("--slow-fraction", type=float, default=0.5,
+                    help="Report links slower than this fraction of the "
+                    "median link.")
+    ap.add_argument("--output-dir", default=None,
+                    help="Directory to write the results files to.")
+    args = ap.parse_args()
+
+    if args.scheduler_file:
+        cluster = None
+        client = Client(scheduler_file=args.scheduler_file)
+    else:
+        cluster = LocalCluster(n_workers=args.n_workers, threads_per_worker=1,
+                               protocol=args.protocol, dashboard_address=":0")
+        client = Client(cluster)
+
+    with client:
+        workers = select_workers(client, hosts_only=args.hosts_only)
+        if len(workers) < 2:
+            raise RuntimeError("at least 2 workers are required")
+
+        p2p_df = pd.DataFrame(columns=["src", "dst", "nbytes", "median", "gb_per_s"])
+        if not args.skip_p2p:
+            p2p_df = point_to_point(client, workers, args.sizes, args.rounds,
+                                    device=args.device)
+            matrix = bandwidth_matrix(p2p_df)
+            print(f"point-to-point GB/s for {matrix.columns.size} workers, "
+                  f"{p2p_df['nbytes'].max()} byte messages (rows: src, columns: dst):")
+            print(matrix.round(3).to_string())
+            latency = p2p_df[p2p_df["nbytes"] == p2p_df["nbytes"].min()]["median"]
+            print(f"round-trip latency ({p2p_df['nbytes'].min()} bytes): "
+                  f"median {latency.median() * 1e6:.1f} us, max {latency.max() * 1e6:.1f} us")
+            for (src, dst, gbps) in find_slow_links(matrix, args.slow_fraction):
+                print(f"SLOW LINK: {src} -> {dst}: {gbps:.3f} GB/s")
+
+        a2a_df = all_to_all(client, workers, args.sizes, args.rounds,
+                            device=args.device)
+        for row in a2a_df.to_dict("records"):
+            print(f"all-to-all {row['workers']} workers, {row['nbytes']} bytes per "
+                  f"pair: p50={row['median'] * 1e3:.3f} ms, {row['gb_per_s']:.3f} GB/s")
+
+        if args.output_dir:
+            write_results(p2p_df, a2a_df, args.protocol, args.output_dir)
+
+    if cluster is not None:
+        cluster.close()